@@ -1,20 +1,24 @@
 import click
-import subprocess
 import sys
-from pathlib import Path
-from .scanner import scan_files
-from .installer import install_hook, uninstall_hook
+from collections import Counter
+from .installer import install_hook, install_pre_receive_hook, uninstall_hook
+
+# Every other module is imported inside the commands that need it: a pre-commit
+# hook with nothing relevant staged, or one answered by the daemon, never pays
+# for the detectors, and `--help` loads nothing else. Option choices and
+# defaults are therefore spelled out here; tests check them against
+# lexer.CANDIDATE_MODES, report.FORMATS and prereceive.DEFAULT_BUDGET.
+CANDIDATE_MODES = ("assignments", "tokens", "both")
+ASSIGNMENTS = "assignments"
+FORMATS = ("text", "ndjson", "json", "sarif")
+DEFAULT_BUDGET = 30.0
 
 
 def get_staged_files():
-    """Return list of staged files' paths."""
-    res = subprocess.run(["git", "diff", "--cached", "--name-only"], capture_output=True, text=True)
-    if res.returncode != 0:
-        return []
-    out = res.stdout.strip()
-    if not out:
-        return []
-    return [p for p in out.splitlines() if p.strip()]
+    """Return list of staged files' paths (deletions and submodules excluded)."""
+    from .git_objects import staged_entries
+
+    return [entry.path for entry in staged_entries()]
 
 
 @click.group()
@@ -25,75 +29,460 @@ def cli():
 
 @cli.command()
 @click.argument("paths", nargs=-1, type=click.Path(exists=False))
-def scan(paths):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes to scan with (0 = one per available CPU).",
+)
+@click.option(
+    "--readers",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Read this many files concurrently while scanning (0 = read one at a time).",
+)
+@click.option(
+    "--file-timeout",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Seconds a worker may spend on one file before it is abandoned "
+    "(with --jobs; default 60, 0 = no limit).",
+)
+@click.option(
+    "--max-file-size",
+    type=click.IntRange(min=1),
+    default=None,
+    metavar="MB",
+    help="Skip files larger than this many megabytes.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    show_default=True,
+    help="Reuse results for content scanned before with the same rules.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Cache location (default: $SHIELDCOMMIT_CACHE_DIR, .shieldcommit/cache or ~/.cache).",
+)
+@click.option(
+    "--diff",
+    "diff_only",
+    is_flag=True,
+    default=False,
+    help="Scan only the lines added by the staged changes (ignored when paths are given).",
+)
+@click.option(
+    "--no-ignore",
+    is_flag=True,
+    default=False,
+    help="Also scan files excluded by .gitignore and .shieldcommitignore.",
+)
+@click.option(
+    "--candidates",
+    type=click.Choice(CANDIDATE_MODES),
+    default=ASSIGNMENTS,
+    show_default=True,
+    help="Check assigned values, high-entropy tokens anywhere in a line, or both.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(FORMATS),
+    default="text",
+    show_default=True,
+    help="Report format; ndjson, json and sarif stream each result as it is found.",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.File("w", encoding="utf-8"),
+    default="-",
+    help="Write the report to this file instead of stdout.",
+)
+@click.option(
+    "--history",
+    "history",
+    is_flag=False,
+    flag_value="--all",
+    default=None,
+    metavar="[REV-RANGE]",
+    help="Scan every blob in the git history of REV-RANGE (default: all refs).",
+)
+@click.option(
+    "--no-daemon",
+    is_flag=True,
+    default=False,
+    help="Scan staged content in this process even if `shieldcommit daemon` is running.",
+)
+def scan(
+    paths,
+    jobs,
+    readers,
+    file_timeout,
+    max_file_size,
+    cache,
+    cache_dir,
+    diff_only,
+    no_ignore,
+    candidates,
+    output_format,
+    output,
+    history,
+    no_daemon,
+):
     """
     Scan staged files (default) or provided files/directories.
     Usage:
-      shieldcommit scan            # scans staged files
+      shieldcommit scan            # scans staged content (what will be committed)
       shieldcommit scan file1.py   # scans specific file(s)
       shieldcommit scan dir/       # scans all files in dir (if SCAN_ALL=1 or path provided)
+      shieldcommit scan -j 0 dir/  # scans dir/ with one worker process per CPU
+      shieldcommit scan --diff     # scans only the lines the staged changes add
+      shieldcommit scan --history  # scans every blob in the history of all refs
+      shieldcommit scan --candidates both dir/  # also checks tokens outside assignments
     """
-    # if paths provided, scan them; else scan staged files
-    if paths:
-        # expand directories to files
-        to_scan = []
-        for p in paths:
-            pth = Path(p)
-            if pth.is_dir():
-                for f in pth.rglob("*"):
-                    if f.is_file():
-                        to_scan.append(str(f))
-            else:
-                to_scan.append(str(pth))
+    from .cache import default_cache_dir
+    from .report import get_reporter
+
+    max_bytes = max_file_size * 1024 * 1024 if max_file_size else None
+    cache_dir = (cache_dir or default_cache_dir()) if cache else None
+
+    if history and paths:
+        raise click.UsageError("--history cannot be combined with paths.")
+
+    reporter = get_reporter(output_format, output)
+
+    if candidates != ASSIGNMENTS:
+        from .intelligent_detector import IntelligentDetector
+
+        IntelligentDetector.set_candidates(candidates)
+
+    # if paths provided, scan them; else scan the staged blobs
+    if history:
+        from .history import HistoryError, scan_history
+
+        try:
+            result = scan_history(history.split(), max_file_size=max_bytes, cache_dir=cache_dir)
+        except HistoryError as exc:
+            raise click.ClickException(str(exc))
+        reporter.notice(f"Scanned {result['blobs']} unique blob(s) from history.")
+        memo = result.get("verdicts")
+        if memo and memo["hits"] + memo["misses"]:
+            reporter.notice(
+                f"Verdict memo: {memo['hits']} hit(s), {memo['misses']} miss(es), "
+                f"{memo['entries']}/{memo['maxsize']} entries."
+            )
+    elif paths:
+        from .scanner import iter_scan, scan_files
+        from .walker import walk_files
+
+        # expand directories to files lazily, so scanning starts with the first file
+        to_scan = walk_files(paths, ignore_files=not no_ignore)
+        if jobs == 1 and not readers:
+            # Serial scans stream: results are reported while the scan is still running
+            _stream_report(
+                iter_scan(to_scan, max_file_size=max_bytes, cache_dir=cache_dir), reporter
+            )
+            return
+        result = scan_files(
+            to_scan,
+            jobs=jobs,
+            readers=readers,
+            file_timeout=file_timeout,
+            max_file_size=max_bytes,
+            cache_dir=cache_dir,
+        )
     else:
-        to_scan = get_staged_files()
-        if not to_scan:
-            click.echo(
+        from .classifier import classify_name
+        from .daemon import scan_staged_remote
+        from .git_objects import staged_entries
+
+        entries = staged_entries()
+        if not entries:
+            reporter.notice(
                 "No staged files. Use `shieldcommit scan <paths>` to scan files or set staged files."
             )
             sys.exit(0)
+        # Lockfiles and binaries are skipped by name alone, without loading a detector
+        skipped = Counter()
+        for entry in entries:
+            classification = classify_name(entry.path)
+            if classification is not None:
+                skipped[classification.reason] += 1
+        if sum(skipped.values()) == len(entries):
+            sys.exit(reporter.finish(dict(skipped), 0))
+
+        # A running daemon has everything loaded already; otherwise scan here.
+        # The daemon only checks assignments, so other candidates are scanned here.
+        result = None
+        if not no_daemon and candidates == ASSIGNMENTS:
+            result = scan_staged_remote(
+                entries, diff_only=diff_only, max_file_size=max_bytes, cache_dir=cache_dir
+            )
+        if result is None and diff_only:
+            from .diffscan import scan_staged_diff
+
+            result = scan_staged_diff()
+        elif result is None:
+            from .scanner import scan_staged
+
+            result = scan_staged(max_file_size=max_bytes, cache_dir=cache_dir, entries=entries)
 
-    result = scan_files(to_scan)
-    findings = result["findings"]
-    warnings = result["warnings"]
-
-    # Display warnings (non-blocking)
-    if warnings:
-        click.echo("⚠️  VERSION WARNINGS (Info only - no block):\n")
-        for w in warnings:
-            click.echo(f"File: {w['file']} (line {w['line']})")
-            click.echo(f"  {w['message']}")
-            click.echo(f"  Snippet: {w['snippet']}")
-            click.echo("")
-
-    # Display findings (blocking)
-    if not findings:
-        click.echo("✓ No secrets found.")
-        sys.exit(0)
-
-    click.echo("❌ Secrets detected!\n")
-    for f in findings:
-        click.echo(f"File: {f['file']} (line {f['line']})")
-        click.echo(f"  Detection: {f.get('detection_method', f.get('pattern', 'Unknown'))}")
-        click.echo(f"  Confidence: {f.get('confidence', 'N/A'):.2%}")
-        click.echo(f"  Snippet: {f['snippet']}")
-        click.echo("")
-    click.echo(
-        "Your commit or action has been blocked. Remove or rotate secrets before proceeding."
+    if result.get("interrupted"):
+        reporter.notice("⚠️  Scan interrupted - showing partial results.\n")
+    for path in result.get("timed_out", []):
+        reporter.notice(f"⚠️  Gave up on {path}: scan exceeded the per-file time limit.")
+
+    for w in result["warnings"]:
+        reporter.warning(w)
+    for f in result["findings"]:
+        reporter.finding(f)
+    sys.exit(
+        reporter.finish(
+            result.get("skipped", {}), result.get("sampled", 0), result.get("interrupted")
+        )
     )
-    sys.exit(1)
+
+
+def _stream_report(events, reporter):
+    """Report results from iter_scan as they are produced, then exit."""
+    from .classifier import SAMPLE, SKIP
+    from .scanner import FINDING, WARNING
+
+    skipped = Counter()
+    sampled = 0
+    for kind, record in events:
+        if kind == FINDING:
+            reporter.finding(record)
+        elif kind == WARNING:
+            reporter.warning(record)
+        elif record["verdict"] == SKIP:
+            skipped[record["reason"]] += 1
+        elif record["verdict"] == SAMPLE:
+            sampled += 1
+    sys.exit(reporter.finish(dict(skipped), sampled))
+
+
+@cli.command("pre-receive")
+@click.option(
+    "--budget",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_BUDGET,
+    show_default=True,
+    help="Seconds to spend scanning one push (0 = no limit).",
+)
+@click.option(
+    "--on-timeout",
+    type=click.Choice(["reject", "allow"]),
+    default="reject",
+    show_default=True,
+    help="Whether a push that could not be fully scanned within the budget is accepted.",
+)
+@click.option(
+    "--max-file-size",
+    type=click.IntRange(min=1),
+    default=None,
+    metavar="MB",
+    help="Skip files larger than this many megabytes.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    show_default=True,
+    help="Reuse results for content scanned before with the same rules.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Cache location (default: $SHIELDCOMMIT_CACHE_DIR, .shieldcommit/cache or ~/.cache).",
+)
+def pre_receive(budget, on_timeout, max_file_size, cache, cache_dir):
+    """
+    Server-side hook: scan everything a push introduces.
+    Reads `<old> <new> <ref>` lines from stdin, as git passes them to pre-receive.
+    Install with `shieldcommit install --server` in the server-side repository.
+    """
+    from .cache import default_cache_dir
+    from .history import HistoryError
+    from .prereceive import parse_updates, scan_push
+    from .report import get_reporter
+
+    reporter = get_reporter("text", click.get_text_stream("stdout"))
+    updates = parse_updates(click.get_text_stream("stdin"))
+    try:
+        result = scan_push(
+            updates,
+            max_file_size=max_file_size * 1024 * 1024 if max_file_size else None,
+            cache_dir=(cache_dir or default_cache_dir()) if cache else None,
+            budget=budget or None,
+        )
+    except HistoryError as exc:
+        # What could not be read could not be checked: never accept it
+        reporter.notice(f"⚠️  {exc}")
+        reporter.notice("Push rejected: it could not be scanned.")
+        sys.exit(1)
+
+    for w in result["warnings"]:
+        reporter.warning(w)
+    for f in result["findings"]:
+        reporter.finding(f)
+
+    if result["unscanned"]:
+        reporter.notice(
+            f"⚠️  Scan budget of {budget:g}s ran out with {result['unscanned']} blob(s) unscanned."
+        )
+        if on_timeout == "reject" and not reporter.findings:
+            reporter.notice("Push rejected: it could not be fully scanned.")
+            sys.exit(1)
+    sys.exit(reporter.finish(result["skipped"], result["sampled"]))
 
 
 @cli.command()
-def install():
+@click.option(
+    "--server",
+    is_flag=True,
+    default=False,
+    help="Install the pre-receive hook (for a server-side or bare repository).",
+)
+@click.option(
+    "--diff",
+    "diff_only",
+    is_flag=True,
+    default=False,
+    help="Make the pre-commit hook scan only the lines the staged changes add.",
+)
+def install(server, diff_only):
     """Install pre-commit hook in current repo."""
-    ok = install_hook(".")
+    ok = install_pre_receive_hook(".") if server else install_hook(".", diff=diff_only)
     if ok:
         click.echo("✅ ShieldCommit hook installed.")
     else:
         click.echo("❌ Failed to install hook.")
 
 
+@cli.command()
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0.05),
+    default=1.0,
+    show_default=True,
+    help="Seconds between checks when polling.",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=0.3,
+    show_default=True,
+    help="Seconds to wait for a burst of saves to finish before rescanning.",
+)
+@click.option(
+    "--poll", is_flag=True, default=False, help="Poll for changes even where inotify is available."
+)
+@click.option(
+    "--max-file-size",
+    type=click.IntRange(min=1),
+    default=None,
+    metavar="MB",
+    help="Skip files larger than this many megabytes.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    show_default=True,
+    help="Reuse results for content scanned before with the same rules.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Cache location (default: $SHIELDCOMMIT_CACHE_DIR, .shieldcommit/cache or ~/.cache).",
+)
+@click.option(
+    "--no-ignore",
+    is_flag=True,
+    default=False,
+    help="Also watch files excluded by .gitignore and .shieldcommitignore.",
+)
+def watch(paths, interval, debounce, poll, max_file_size, cache, cache_dir, no_ignore):
+    """
+    Rescan files as they change and print new or resolved findings.
+    Watches the current directory if no paths are given. Stop with Ctrl-C.
+    """
+    from .cache import default_cache_dir
+    from .watch import Watcher, format_change, open_waiter, PollWaiter
+
+    waiter = open_waiter(use_inotify=not poll)
+    watcher = Watcher(
+        paths or (".",),
+        max_file_size=max_file_size * 1024 * 1024 if max_file_size else None,
+        cache_dir=(cache_dir or default_cache_dir()) if cache else None,
+        ignore_files=not no_ignore,
+        interval=interval,
+        debounce=debounce,
+        waiter=waiter,
+    )
+    started = False
+
+    def on_changes(changes):
+        nonlocal started
+        for change in changes:
+            click.echo(format_change(change))
+        if not started:
+            started = True
+            mode = "polling" if isinstance(waiter, PollWaiter) else "inotify"
+            click.echo(
+                f"👀 Watching {len(watcher.states)} file(s) ({mode}); "
+                f"{watcher.findings} secret(s) present. Press Ctrl-C to stop."
+            )
+        elif changes:
+            click.echo(f"   {watcher.findings} secret(s) present.")
+
+    try:
+        watcher.run(on_changes)
+    except KeyboardInterrupt:
+        click.echo("Stopped watching.")
+
+
+@cli.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Socket to listen on (default: $SHIELDCOMMIT_SOCKET or a per-user runtime path).",
+)
+@click.option("--stop", is_flag=True, default=False, help="Stop a running daemon.")
+def daemon(socket_path, stop):
+    """
+    Serve staged scans from a long-running process.
+    While it runs, `shieldcommit scan` (and so the pre-commit hook) hands its
+    work to the daemon instead of loading the detectors on every commit.
+    """
+    from .daemon import default_socket_path, request, serve
+
+    socket_path = socket_path or default_socket_path()
+    if stop:
+        if request({"op": "shutdown"}, socket_path=socket_path) is None:
+            click.echo("No daemon is running.")
+            sys.exit(1)
+        click.echo("🛑 ShieldCommit daemon stopped.")
+        return
+    click.echo(f"ShieldCommit daemon listening on {socket_path}")
+    try:
+        serve(socket_path)
+    except RuntimeError as exc:
+        click.echo(f"❌ {exc}", err=True)
+        sys.exit(1)
+
+
 @cli.command()
 def uninstall():
     ok = uninstall_hook(".")
@@ -6,7 +6,9 @@ Supports Azure SQL Database, MySQL, and PostgreSQL.
 
 import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Union
+
+from .content import FileContent, TERRAFORM_SUFFIXES, as_lines
 
 # Azure database version support timeline
 # https://learn.microsoft.com/en-us/azure/mysql/
@@ -48,7 +50,7 @@ AZURE_DB_ENGINES = {
 }
 
 
-def parse_terraform_azure_db_versions(content: str) -> List[Dict[str, Any]]:
+def parse_terraform_azure_db_versions(content: Union[str, Sequence[str]]) -> List[Dict[str, Any]]:
     """
     Parse Terraform file content for Azure database versions.
     Looks for:
@@ -57,7 +59,7 @@ def parse_terraform_azure_db_versions(content: str) -> List[Dict[str, Any]]:
     - azurerm_postgresql_server with version
     """
     findings = []
-    lines = content.splitlines()
+    lines = as_lines(content)
 
     # Pattern for SQL Server
     sql_pattern = r'sku_name\s*=\s*["\']([A-Z0-9]+)["\']'
@@ -160,18 +162,32 @@ def scan_azure_db_versions(file_path: Path) -> List[Dict[str, Any]]:
     Scan a Terraform file for Azure database version warnings.
     Returns list of warnings.
     """
-    warnings = []
-
     # Only scan Terraform files
-    if file_path.suffix not in {".tf", ".json"}:
-        return warnings
+    if file_path.suffix not in TERRAFORM_SUFFIXES:
+        return []
+
+    content = FileContent.from_path(file_path)
+    if content is None:
+        return []
+
+    return scan_azure_db_content(content)
+
+
+def scan_azure_db_content(content: FileContent) -> List[Dict[str, Any]]:
+    """
+    Check already-read file content for Azure database version warnings.
+    Returns list of warnings.
+    """
+    warnings = []
 
-    try:
-        content = file_path.read_text(errors="ignore")
-    except Exception:
+    # Skip non-Terraform files and files that never mention a versioned resource
+    if not content.is_terraform or not content.mentions(
+        "azurerm_mssql_server", "azurerm_mysql", "azurerm_postgresql"
+    ):
         return warnings
 
-    findings = parse_terraform_azure_db_versions(content)
+    file_path = content.path
+    findings = parse_terraform_azure_db_versions(content.lines)
 
     for finding in findings:
         engine = finding["engine"]
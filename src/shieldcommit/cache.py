@@ -0,0 +1,351 @@
+"""
+Persistent, content-addressed scan result cache.
+Results are keyed by the git blob id of a file plus a fingerprint of the active
+ruleset, so unchanged content is never rescanned with the same rules.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from . import __version__
+from .finding import Finding
+
+# Default size cap for the whole cache directory
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Pruning stops once the cache is back under this share of the cap
+_PRUNE_TARGET = 0.8
+
+# Files modified this recently may change again within the mtime granularity,
+# so their stat entry is not recorded (same idea as git's "racy" index check)
+_RACY_SECONDS = 2.0
+
+# File (in the cache directory) holding the approximate size of the cache
+_USAGE = "usage"
+
+# Finding keys that hold (or are derived from) the secret or its line
+_SECRET_KEYS = ("file", "snippet", "matched_value", "pattern")
+
+
+def default_cache_dir() -> Path:
+    """
+    Pick the cache directory.
+    SHIELDCOMMIT_CACHE_DIR wins, then a repo-local .shieldcommit/ directory,
+    then the user cache directory ($XDG_CACHE_HOME or ~/.cache).
+    """
+    env = os.environ.get("SHIELDCOMMIT_CACHE_DIR")
+    if env:
+        return Path(env)
+    if Path(".shieldcommit").is_dir():
+        return Path(".shieldcommit") / "cache"
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "shieldcommit"
+
+
+@functools.lru_cache(maxsize=None)
+def ruleset_fingerprint(min_confidence: float) -> str:
+    """
+    Hash everything that decides what a scan reports: detector rules, keyword
+    sets, candidate sources, version catalogs, classification limits and the
+    confidence threshold.
+    The rules are fixed for the life of a process, so this is computed once per
+    threshold (which keeps repeated scans in a long-running daemon cheap).
+    """
+    from . import classifier, lexer
+    from .intelligent_detector import IntelligentDetector
+    from .eks_detector import EKS_VERSIONS
+    from .aks_detector import AKS_VERSIONS
+    from .gcp_detector import GCP_VERSIONS
+    from .rds_detector import RDS_ENGINES
+    from .azure_db_detector import AZURE_DB_ENGINES
+    from .gcp_db_detector import GCP_CLOUDSQL_ENGINES
+
+    ruleset = {
+        "version": __version__,
+        "min_confidence": min_confidence,
+        "secret_structures": IntelligentDetector.SECRET_STRUCTURES,
+        "secret_keywords": sorted(IntelligentDetector.SECRET_KEYWORDS),
+        "context_keywords": sorted(IntelligentDetector.CONTEXT_KEYWORDS),
+        "exclude_keywords": sorted(IntelligentDetector.EXCLUDE_KEYWORDS),
+        "exclusion_rules": [
+            (*rule[:4], rule.check and rule.check.__qualname__)
+            for rule in IntelligentDetector.EXCLUSION_RULES
+        ],
+        "candidates": [IntelligentDetector.CANDIDATES, lexer.TOKEN_WINDOW, lexer.TOKEN_MIN_ENTROPY],
+        "catalogs": [
+            EKS_VERSIONS,
+            AKS_VERSIONS,
+            GCP_VERSIONS,
+            RDS_ENGINES,
+            AZURE_DB_ENGINES,
+            GCP_CLOUDSQL_ENGINES,
+        ],
+        "classifier": [
+            classifier.SNIFF_BYTES,
+            classifier.SAMPLE_CHARS,
+            classifier.MINIFIED_LINE_LENGTH,
+            sorted(classifier.LOCKFILE_NAMES),
+            sorted(classifier.BINARY_SUFFIXES),
+        ],
+    }
+    encoded = json.dumps(ruleset, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _strip_file(records):
+    """Copy records without their 'file' key (the same blob can live at many paths)."""
+    return [{k: v for k, v in record.items() if k != "file"} for record in records]
+
+
+def _with_file(records, file_name: str):
+    return [dict(record, file=file_name) for record in records]
+
+
+def _line_values(line: str) -> List[str]:
+    """Every value the detector could have reported on a line."""
+    from .lexer import assignment_candidates, token_candidates
+
+    # Any whole token may have been reported for its format
+    tokens = token_candidates(line, known=lambda token: True)
+    return [c.value for c in assignment_candidates(line) + tokens]
+
+
+class ResultCache:
+    """
+    On-disk cache of per-file scan results.
+
+    Layout under the cache directory:
+        results/<2 hex>/<rest>  scan result for (ruleset, result key)
+        stat/<2 hex>/<rest>     result key (or skip verdict) for (path, stat)
+
+    A result key is a git blob id, optionally followed by ':'-separated
+    qualifiers that also change the result (see scanner._result_key).
+
+    Findings are stored without the secret: the matched value is kept only as
+    a keyed digest, and the value and snippet are recovered from the file's
+    line when the entry is read back.
+
+    Writes go to a temporary file followed by an atomic rename, so concurrent
+    scans (e.g. several worktrees) never see partial entries. Hits refresh the
+    entry's mtime, and prune() evicts least-recently-used entries over the cap.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        fingerprint: str = "",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.fingerprint = fingerprint
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        # Bytes written since the usage file was last updated
+        self.written = 0
+
+    # ---------- keys ----------
+
+    def _entry_path(self, kind: str, key: str) -> Path:
+        digest = hashlib.sha256(f"{self.fingerprint}\0{key}".encode("utf-8")).hexdigest()
+        return self.directory / kind / digest[:2] / digest[2:]
+
+    def _value_digest(self, key: str, value: str) -> str:
+        """What is stored in place of a matched value: a digest keyed by its entry."""
+        data = f"{self.fingerprint}\0{key}\0{value}".encode("utf-8", errors="surrogatepass")
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def _stat_key(path: Path, st: os.stat_result) -> str:
+        return f"{os.path.abspath(path)}\0{st.st_size}\0{st.st_mtime_ns}\0{st.st_ino}"
+
+    # ---------- low-level I/O ----------
+
+    def _read(self, entry: Path) -> Optional[bytes]:
+        try:
+            data = entry.read_bytes()
+        except OSError:
+            return None
+        try:
+            # Refresh mtime so LRU eviction sees this entry as recently used
+            os.utime(entry)
+        except OSError:
+            pass
+        return data
+
+    @staticmethod
+    def _replace(entry: Path, data: bytes) -> bool:
+        """Atomically write data to entry; False if the cache cannot be written."""
+        import tempfile  # only writers need it; keeps hook startup lean
+
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=entry.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp, entry)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            # A read-only or full cache directory must never fail a scan
+            return False
+        return True
+
+    def _write(self, entry: Path, data: bytes):
+        if self._replace(entry, data):
+            self.writes += 1
+            self.written += len(data)
+
+    # ---------- stat index ----------
+
+    def lookup_stat(self, path: Path, st: os.stat_result) -> Optional[str]:
+        """Return the result key (or 'skip:<reason>') recorded for this exact file state."""
+        data = self._read(self._entry_path("stat", self._stat_key(path, st)))
+        return data.decode("ascii", errors="ignore") if data else None
+
+    def record_stat(self, path: Path, st: os.stat_result, value: str):
+        """Remember the result key (or 'skip:<reason>') for this exact file state."""
+        if time.time() - st.st_mtime < _RACY_SECONDS:
+            return
+        self._write(self._entry_path("stat", self._stat_key(path, st)), value.encode("ascii"))
+
+    # ---------- results ----------
+
+    def get(
+        self,
+        key: str,
+        file_name: str,
+        lines: Optional[Callable[[], Optional[Sequence[str]]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached scan_one-style result for a key, with 'file' filled in.
+        lines returns the lines of the content the key stands for; it is only
+        called for results with findings, whose values and snippets are read
+        back from their lines. A result whose values cannot be found there
+        (no lines, or content that changed) is a miss.
+        """
+        data = self._read(self._entry_path("results", key))
+        result = None
+        if data is not None:
+            try:
+                result = json.loads(data)
+            except ValueError:
+                pass
+        if result is not None:
+            findings = self._restore(key, result["findings"], file_name, lines)
+            if findings is None:
+                result = None
+            else:
+                result["findings"] = findings
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        result["warnings"] = _with_file(result["warnings"], file_name)
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a scan_one-style result under a key, without the secrets found."""
+        findings = []
+        for finding in result["findings"]:
+            record = {k: v for k, v in finding.items() if k not in _SECRET_KEYS}
+            record["value"] = self._value_digest(key, finding["matched_value"])
+            findings.append(record)
+        stored = dict(result, findings=findings, warnings=_strip_file(result["warnings"]))
+        self._write(self._entry_path("results", key), json.dumps(stored).encode("utf-8"))
+
+    def _restore(
+        self,
+        key: str,
+        records: List[Dict[str, Any]],
+        file_name: str,
+        lines: Optional[Callable[[], Optional[Sequence[str]]]],
+    ) -> Optional[List[Finding]]:
+        """Stored findings with their values and snippets recovered, or None."""
+        if not records:
+            return []
+        text = lines() if lines is not None else None
+        if text is None:
+            return None
+        findings = []
+        for record in records:
+            line_no = record["line"]
+            if not 0 < line_no <= len(text):
+                return None
+            line = text[line_no - 1]
+            value = next(
+                (v for v in _line_values(line) if self._value_digest(key, v) == record["value"]),
+                None,
+            )
+            if value is None:
+                return None
+            findings.append(
+                Finding.from_dict(record, file=file_name, snippet=line, matched_value=value)
+            )
+        return findings
+
+    # ---------- eviction ----------
+
+    def prune(self):
+        """
+        Evict least-recently-used entries until the cache fits under max_bytes.
+        The cache's size is kept approximately in a usage file, to which each
+        run adds the bytes it wrote, so the directory is only walked once that
+        estimate passes max_bytes (or is missing) and a run that wrote little
+        does not pay for the whole cache. Rewritten entries are counted twice,
+        which only makes the walk come sooner; updates lost to concurrent runs
+        are corrected by the next walk.
+        """
+        usage = self.directory / _USAGE
+        try:
+            estimate = int(usage.read_bytes())
+        except (OSError, ValueError):
+            estimate = None
+        written, self.written = self.written, 0
+        if estimate is not None and estimate + written <= self.max_bytes:
+            self._replace(usage, str(estimate + written).encode("ascii"))
+            return
+        total = self._evict()
+        self._replace(usage, str(total).encode("ascii"))
+
+    def _evict(self) -> int:
+        """Walk every entry, evict the oldest if over max_bytes; returns the size left."""
+        entries = []
+        total = 0
+        for kind in ("results", "stat"):
+            root = self.directory / kind
+            if not root.is_dir():
+                continue
+            for bucket in os.scandir(root):
+                if not bucket.is_dir():
+                    continue
+                for entry in os.scandir(bucket.path):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+
+        if total <= self.max_bytes:
+            return total
+
+        entries.sort()
+        target = self.max_bytes * _PRUNE_TARGET
+        for _, size, entry_path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                continue
+            total -= size
+        return total
@@ -0,0 +1,186 @@
+"""
+File classification before scanning.
+Sniffs the first block of each file to skip binaries and lockfiles, and to sample
+minified or generated files instead of scanning them in full.
+"""
+
+import codecs
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+# Verdicts
+SCAN = "scan"
+SAMPLE = "sample"
+SKIP = "skip"
+
+# Bytes read from the start of a file to classify it
+SNIFF_BYTES = 8192
+
+# Sampled files are only scanned up to this many characters
+SAMPLE_CHARS = 256 * 1024
+
+# A line this long in the first block means minified or machine-written content
+MINIFIED_LINE_LENGTH = 1000
+
+# Share of control bytes above which undecodable content is treated as binary
+BINARY_CONTROL_RATIO = 0.3
+
+BINARY_SUFFIXES = {
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".bmp",
+    ".ico",
+    ".webp",
+    ".pdf",
+    ".zip",
+    ".gz",
+    ".tgz",
+    ".bz2",
+    ".xz",
+    ".7z",
+    ".whl",
+    ".egg",
+    ".jar",
+    ".war",
+    ".class",
+    ".so",
+    ".dylib",
+    ".dll",
+    ".exe",
+    ".o",
+    ".a",
+    ".pyc",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".otf",
+    ".mp3",
+    ".mp4",
+    ".mov",
+    ".sqlite",
+}
+
+LOCKFILE_NAMES = {
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "poetry.lock",
+    "Pipfile.lock",
+    "uv.lock",
+    "Cargo.lock",
+    "composer.lock",
+    "Gemfile.lock",
+    "Podfile.lock",
+    "go.sum",
+    "mix.lock",
+    "packages.lock.json",
+    ".terraform.lock.hcl",
+}
+
+MINIFIED_SUFFIXES = (".min.js", ".min.css", ".js.map", ".css.map")
+
+GENERATED_MARKERS = (b"@generated", b"DO NOT EDIT", b"Code generated by", b"autogenerated")
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Bytes that occur in text files: tab, newline, form feed, carriage return, escape
+_TEXT_CONTROL = {0x08, 0x09, 0x0A, 0x0C, 0x0D, 0x1B}
+
+
+class Classification(NamedTuple):
+    """Verdict for one file: how to scan it, why, and which encoding to decode it with."""
+
+    verdict: str
+    reason: str
+    encoding: Optional[str] = None
+
+
+def _is_binary(head: bytes) -> bool:
+    """Heuristic binary check for a block without a BOM."""
+    if b"\x00" in head:
+        return True
+    try:
+        head.decode("utf-8")
+        return False
+    except UnicodeDecodeError as exc:
+        # A multi-byte character cut off by the end of the block is fine
+        if exc.start >= len(head) - 3:
+            return False
+    control = sum(1 for b in head if b < 0x20 and b not in _TEXT_CONTROL)
+    return control / len(head) > BINARY_CONTROL_RATIO
+
+
+def classify_name(name: str) -> Optional[Classification]:
+    """
+    Classify a file from its name alone.
+    Returns the SKIP classification for lockfiles and binary suffixes, or None
+    if the content has to be looked at.
+    """
+    path = Path(name)
+    if path.name in LOCKFILE_NAMES:
+        return Classification(SKIP, "lockfile")
+    if path.suffix.lower() in BINARY_SUFFIXES:
+        return Classification(SKIP, "binary")
+    return None
+
+
+def classify_head(
+    name: str, head: bytes, size: int, max_size: Optional[int] = None
+) -> Classification:
+    """
+    Classify a file from its name, first block and size.
+
+    Args:
+        name: File name or path (only the name and suffixes are used)
+        head: The first SNIFF_BYTES (or fewer) bytes of the file
+        size: Total file size in bytes
+        max_size: Files larger than this are skipped (None = no cap)
+    """
+    if max_size is not None and size > max_size:
+        return Classification(SKIP, "too_large")
+    by_name = classify_name(name)
+    if by_name is not None:
+        return by_name
+    lower_name = Path(name).name.lower()
+
+    # A byte-order mark tells us the encoding outright (UTF-16 text is full of NULs)
+    encoding = None
+    for bom, bom_encoding in _BOMS:
+        if head.startswith(bom):
+            encoding = bom_encoding
+            break
+    if encoding is None and _is_binary(head):
+        return Classification(SKIP, "binary")
+
+    if lower_name.endswith(MINIFIED_SUFFIXES):
+        return Classification(SAMPLE, "minified", encoding)
+    if any(marker in head for marker in GENERATED_MARKERS):
+        return Classification(SAMPLE, "generated", encoding)
+
+    # Minified bundles put kilobytes on a single line
+    if max((len(line) for line in head.split(b"\n")), default=0) >= MINIFIED_LINE_LENGTH:
+        return Classification(SAMPLE, "minified", encoding)
+
+    return Classification(SCAN, "", encoding)
+
+
+def classify_file(path: Path, max_size: Optional[int] = None) -> Classification:
+    """Classify a file on disk by sniffing its first block."""
+    try:
+        size = path.stat().st_size
+        if max_size is not None and size > max_size:
+            return Classification(SKIP, "too_large")
+        with open(path, "rb") as fh:
+            head = fh.read(SNIFF_BYTES)
+    except OSError:
+        return Classification(SKIP, "unreadable")
+    return classify_head(str(path), head, size, max_size)
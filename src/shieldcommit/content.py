@@ -0,0 +1,143 @@
+"""
+Shared file content for the secret and version detectors.
+A file is read, decoded and split into lines once, then handed to every detector.
+"""
+
+import hashlib
+import locale
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+# File types the version detectors look at
+TERRAFORM_SUFFIXES = {".tf", ".json"}
+
+# Chunk size used when reading and hashing a file in one pass
+_READ_CHUNK = 1024 * 1024
+
+
+def git_blob_hasher(size: int):
+    """Return a sha1 object primed with git's blob header, so it yields the git blob id."""
+    hasher = hashlib.sha1()
+    hasher.update(b"blob %d\0" % size)
+    return hasher
+
+
+def git_blob_id(data: bytes) -> str:
+    """Compute the git blob id (as `git hash-object` would) of some bytes."""
+    hasher = git_blob_hasher(len(data))
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+class FileContent:
+    """
+    Decoded text of one file, with cached line and lowercase views.
+
+    Attributes:
+        path: Path reported in findings and warnings
+        text: Decoded file text
+        blob_id: Git blob id of the raw bytes, when it was computed
+    """
+
+    def __init__(self, path: Union[str, Path], text: str, blob_id: Optional[str] = None):
+        self.path = Path(path)
+        self.text = text
+        self.blob_id = blob_id
+        self._lines: Optional[List[str]] = None
+        self._lower: Optional[str] = None
+
+    @classmethod
+    def from_path(
+        cls, path: Union[str, Path], encoding: Optional[str] = None, limit: Optional[int] = None
+    ) -> Optional["FileContent"]:
+        """
+        Read a file from disk. Returns None if it cannot be read.
+
+        Args:
+            path: File to read
+            encoding: Text encoding (None = platform default)
+            limit: Read at most this many characters (None = whole file)
+        """
+        try:
+            if limit is None:
+                text = Path(path).read_text(encoding=encoding, errors="ignore")
+            else:
+                with open(path, encoding=encoding, errors="ignore") as fh:
+                    text = fh.read(limit)
+        except Exception:
+            return None
+        return cls(path, text)
+
+    @classmethod
+    def from_bytes(
+        cls,
+        path: Union[str, Path],
+        data: bytes,
+        encoding: Optional[str] = None,
+        limit: Optional[int] = None,
+        blob_id: Optional[str] = None,
+    ) -> "FileContent":
+        """Decode raw bytes (e.g. a git blob) as if they had been read from path."""
+        text = data.decode(encoding or locale.getpreferredencoding(False), errors="ignore")
+        if limit is not None:
+            text = text[:limit]
+        return cls(path, text, blob_id=blob_id)
+
+    @classmethod
+    def from_path_hashed(
+        cls, path: Union[str, Path], encoding: Optional[str] = None, limit: Optional[int] = None
+    ) -> Optional["FileContent"]:
+        """
+        Read a file and compute its git blob id in the same pass.
+        Returns None if it cannot be read.
+        """
+        try:
+            with open(path, "rb") as fh:
+                size = os.fstat(fh.fileno()).st_size
+                hasher = git_blob_hasher(size)
+                chunks = []
+                for chunk in iter(lambda: fh.read(_READ_CHUNK), b""):
+                    hasher.update(chunk)
+                    chunks.append(chunk)
+        except OSError:
+            return None
+        data = b"".join(chunks)
+        # A file that changed size while we read it has no trustworthy id
+        blob_id = hasher.hexdigest() if len(data) == size else None
+        return cls.from_bytes(path, data, encoding, limit, blob_id=blob_id)
+
+    @property
+    def lines(self) -> List[str]:
+        """Lines of the file (computed once)."""
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+
+    @property
+    def lower(self) -> str:
+        """Lowercased text (computed once)."""
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def is_terraform(self) -> bool:
+        """Whether the version detectors apply to this file."""
+        return self.path.suffix in TERRAFORM_SUFFIXES
+
+    def mentions(self, *keywords: str) -> bool:
+        """
+        Cheap relevance check: does any keyword occur anywhere in the file?
+        Keywords must be lowercase; matching is case-insensitive.
+        """
+        return any(keyword in self.lower for keyword in keywords)
+
+
+def as_lines(content: Union[str, FileContent, Sequence[str]]) -> Sequence[str]:
+    """Accept raw text, a FileContent, or already-split lines and return lines."""
+    if isinstance(content, str):
+        return content.splitlines()
+    if isinstance(content, FileContent):
+        return content.lines
+    return content
@@ -0,0 +1,285 @@
+"""
+Long-running scan daemon and its client.
+The daemon keeps the detectors, version catalogs and result cache loaded and
+serves scan requests over a per-user Unix socket, so a hook invocation only pays
+for a connect and the scan itself. Clients fall back to scanning in-process
+whenever the daemon is unavailable.
+
+Protocol: one JSON request line per connection, answered by one JSON line.
+"""
+
+import json
+import os
+import socket
+import stat
+import struct
+from typing import Any, Dict, Optional
+
+from . import __version__
+
+# Seconds to wait for the daemon to accept a connection before scanning in-process
+CONNECT_TIMEOUT = 0.2
+
+# Seconds to wait for a scan result; past this the client scans in-process
+RESPONSE_TIMEOUT = 60.0
+
+# Upper bound on one request line
+_MAX_REQUEST = 16 * 1024 * 1024
+
+# Variables git sets for hooks that decide which repository and index are read
+# (a `git commit -a` hook sees a temporary GIT_INDEX_FILE, for instance)
+GIT_ENV = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_INDEX_FILE",
+    "GIT_OBJECT_DIRECTORY",
+    "GIT_ALTERNATE_OBJECT_DIRECTORIES",
+    "GIT_COMMON_DIR",
+)
+
+
+def default_socket_path() -> str:
+    """
+    The per-user socket: $SHIELDCOMMIT_SOCKET, else $XDG_RUNTIME_DIR/shieldcommit.sock,
+    else daemon.sock in a private shieldcommit-<uid> directory of the temp directory.
+    """
+    env = os.environ.get("SHIELDCOMMIT_SOCKET")
+    if env:
+        return env
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, "shieldcommit.sock")
+    return os.path.join(_private_dir(), "daemon.sock")
+
+
+def _private_dir() -> str:
+    """Directory of the fallback socket; a shared temp directory is open to every user."""
+    import tempfile
+
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return os.path.join(tempfile.gettempdir(), f"shieldcommit-{uid}")
+
+
+def _make_private_dir(directory: str):
+    """
+    Create directory with mode 0700, or check that an existing one is a
+    directory of this user's that no one else can enter.
+    Raises RuntimeError otherwise: another user may have created it first.
+    """
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{directory} is not a private directory of this user")
+
+
+def _peer_is_owner(sock: socket.socket, path: str) -> bool:
+    """
+    Whether the process listening on a connected socket runs as this user.
+    Uses the kernel's SO_PEERCRED where there is one; elsewhere the socket
+    file must be this user's, with no access for anyone else.
+    """
+    if hasattr(socket, "SO_PEERCRED"):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _pid, uid, _gid = struct.unpack("3i", creds)
+        return uid == os.getuid()
+    info = os.lstat(path)
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+
+# ---------- client ----------
+
+
+def _git_env() -> Dict[str, str]:
+    """The client's GIT_ENV variables, with relative paths made absolute."""
+    env = {}
+    for name in GIT_ENV:
+        value = os.environ.get(name)
+        if value is None:
+            continue
+        if name != "GIT_ALTERNATE_OBJECT_DIRECTORIES":
+            value = os.path.abspath(value)
+        env[name] = value
+    return env
+
+
+def request(
+    payload: Dict[str, Any],
+    socket_path: Optional[str] = None,
+    timeout: float = RESPONSE_TIMEOUT,
+) -> Optional[Dict[str, Any]]:
+    """
+    Send one request to the daemon and return its response.
+    Returns None if no daemon is listening, it runs a different version or as
+    another user, it reports an error, or it does not answer in time.
+    """
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "getuid"):
+        return None
+    payload = dict(payload, version=__version__)
+    path = socket_path or default_socket_path()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+            # Anyone could listen on a socket path; only our own daemon may
+            # see the staged content or answer for the scan
+            if not _peer_is_owner(sock, path):
+                return None
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        response = json.loads(line)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(response, dict) or "error" in response:
+        return None
+    return response
+
+
+def scan_staged_remote(
+    entries,
+    diff_only: bool = False,
+    min_confidence: float = 0.5,
+    max_file_size: Optional[int] = None,
+    cache_dir=None,
+    socket_path: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Ask the daemon to scan staged content of the current repository.
+    entries are the StagedEntry list the caller already has (so the daemon need
+    not list them again). Returns the scan_staged result, or None to fall back.
+    """
+    return request(
+        {
+            "op": "scan_staged",
+            "cwd": os.getcwd(),
+            "git_env": _git_env(),
+            "entries": [list(entry) for entry in entries],
+            "diff_only": diff_only,
+            "min_confidence": min_confidence,
+            "max_file_size": max_file_size,
+            "cache_dir": os.path.abspath(cache_dir) if cache_dir else None,
+        },
+        socket_path=socket_path,
+    )
+
+
+# ---------- server ----------
+
+
+def _handle(payload: Dict[str, Any], server) -> Dict[str, Any]:
+    """Run one request inside the daemon."""
+    if payload.get("version") != __version__:
+        # A client from another install would get results from different rules
+        return {"error": f"daemon runs version {__version__}"}
+
+    op = payload.get("op")
+    if op == "ping":
+        return {"version": __version__, "pid": os.getpid()}
+    if op == "shutdown":
+        server.stop_requested = True
+        return {"stopping": True}
+    if op == "scan_staged":
+        from .diffscan import scan_staged_diff
+        from .git_objects import StagedEntry
+        from .scanner import scan_staged
+
+        cwd = payload["cwd"]
+        min_confidence = payload.get("min_confidence", 0.5)
+        # Run git as the client would have, not with the daemon's own environment
+        env = {k: v for k, v in os.environ.items() if k not in GIT_ENV}
+        env.update(payload.get("git_env") or {})
+        if payload.get("diff_only"):
+            return scan_staged_diff(min_confidence=min_confidence, cwd=cwd, env=env)
+        entries = [StagedEntry(*entry) for entry in payload["entries"]]
+        # A relative cache directory is the client's, not the daemon's
+        cache_dir = payload.get("cache_dir")
+        return scan_staged(
+            min_confidence=min_confidence,
+            max_file_size=payload.get("max_file_size"),
+            cache_dir=os.path.join(cwd, cache_dir) if cache_dir else None,
+            cwd=cwd,
+            entries=entries,
+            env=env,
+        )
+    return {"error": f"unknown op {op!r}"}
+
+
+def _warm_up():
+    """Import every detector and compile its patterns before the first request."""
+    from .cache import ruleset_fingerprint
+    from .content import FileContent
+    from .scanner import scan_content
+
+    scan_content(FileContent("warmup.tf", 'api_key = "warmup-value-1234"\nversion = "1.27"\n'))
+    ruleset_fingerprint(0.5)
+
+
+def serve(socket_path: Optional[str] = None):
+    """
+    Run the daemon in the foreground until a shutdown request or Ctrl-C.
+    Raises RuntimeError if another daemon already listens on the socket, or
+    the default socket's private directory belongs to someone else.
+    """
+    import socketserver
+
+    from .finding import to_json
+
+    path = socket_path or default_socket_path()
+    if os.path.dirname(path) == _private_dir():
+        _make_private_dir(os.path.dirname(path))
+    if request({"op": "ping"}, socket_path=path) is not None:
+        raise RuntimeError(f"a daemon is already listening on {path}")
+    # A socket file left behind by a daemon that died
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                payload = json.loads(self.rfile.readline(_MAX_REQUEST))
+                response = _handle(payload, self.server)
+            except Exception as exc:  # a bad request must not take the daemon down
+                response = {"error": f"{type(exc).__name__}: {exc}"}
+            try:
+                self.wfile.write(json.dumps(response, default=to_json).encode("utf-8") + b"\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client hung up without waiting for the answer
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+        stop_requested = False
+
+        def service_actions(self):
+            if self.stop_requested:
+                # shutdown() waits for serve_forever, so it cannot be called from
+                # the serving thread; leaving the loop via an exception is the same
+                raise _Stop()
+
+    _warm_up()
+    # Only this user may connect
+    old_umask = os.umask(0o177)
+    try:
+        server = Server(path, Handler)
+    finally:
+        os.umask(old_umask)
+
+    try:
+        with server:
+            server.serve_forever(poll_interval=0.2)
+    except (_Stop, KeyboardInterrupt):
+        pass
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+class _Stop(Exception):
+    """Raised inside serve_forever to leave the serving loop."""
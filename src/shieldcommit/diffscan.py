@@ -0,0 +1,185 @@
+"""
+Added-lines-only scanning of the staged diff.
+Runs secret detection only on lines a commit adds, using the real neighbouring
+lines of the new file as lookback context, so hook latency scales with the
+size of the change rather than the size of the file.
+"""
+
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .classifier import classify_head, SCAN, SKIP, SNIFF_BYTES
+from .content import FileContent, TERRAFORM_SUFFIXES
+from .git_objects import CatFileBatch, staged_entries
+from .scanner import _result, scan_content_versions, summarize
+
+_HUNK_HEADER = re.compile(rb"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+# Escapes git uses in quoted paths (core.quotePath)
+_C_ESCAPES = {b"n": b"\n", b"t": b"\t", b'"': b'"', b"\\": b"\\", b"a": b"\a", b"b": b"\b"}
+
+
+class DiffLine(NamedTuple):
+    """A line of the new file that appears in a hunk: its number, text and whether it was added."""
+
+    line_no: int
+    text: str
+    added: bool
+
+
+def _unquote_path(raw: bytes) -> str:
+    """Decode a path from a diff header, undoing git's C-style quoting."""
+    if raw.startswith(b'"') and raw.endswith(b'"'):
+        raw = raw[1:-1]
+        out = bytearray()
+        i = 0
+        while i < len(raw):
+            if raw[i : i + 1] == b"\\" and i + 1 < len(raw):
+                nxt = raw[i + 1 : i + 2]
+                if nxt in _C_ESCAPES:
+                    out += _C_ESCAPES[nxt]
+                    i += 2
+                    continue
+                octal = raw[i + 1 : i + 4]
+                if len(octal) == 3 and all(48 <= c <= 55 for c in octal):
+                    out.append(int(octal, 8))
+                    i += 4
+                    continue
+            out += raw[i : i + 1]
+            i += 1
+        raw = bytes(out)
+    return raw.decode("utf-8", errors="surrogateescape")
+
+
+def parse_unified_diff(diff: bytes) -> Dict[str, List[DiffLine]]:
+    """
+    Parse unified diff output into the new-file lines of each hunk, per path.
+    Context and added lines are kept (they exist in the new file); removed lines
+    are dropped. Deleted and binary files produce no entry.
+    """
+    files: Dict[str, List[DiffLine]] = {}
+    current: Optional[List[DiffLine]] = None
+    line_no = 0
+    old_left = new_left = 0
+
+    for raw in diff.split(b"\n"):
+        # Inside a hunk every line is content, even if it looks like a header
+        if old_left > 0 or new_left > 0:
+            tag = raw[:1]
+            if tag == b"\\":  # "\ No newline at end of file"
+                continue
+            if tag in (b" ", b"-"):
+                old_left -= 1
+            if tag in (b" ", b"+"):
+                new_left -= 1
+                if current is not None:
+                    text = raw[1:].rstrip(b"\r").decode("utf-8", errors="ignore")
+                    current.append(DiffLine(line_no, text, tag == b"+"))
+                line_no += 1
+            continue
+
+        if raw.startswith(b"diff --git "):
+            current = None
+        elif raw.startswith(b"+++ "):
+            target = raw[4:].rstrip(b"\r")
+            if target == b"/dev/null":
+                current = None
+            else:
+                path = _unquote_path(target)
+                if path.startswith("b/"):
+                    path = path[2:]
+                current = files.setdefault(path, [])
+        elif raw.startswith(b"@@"):
+            match = _HUNK_HEADER.match(raw)
+            if match:
+                old_left = int(match.group(1)) if match.group(1) is not None else 1
+                line_no = int(match.group(2))
+                new_left = int(match.group(3)) if match.group(3) is not None else 1
+
+    return files
+
+
+def detect_in_diff_lines(path: str, lines: List[DiffLine], min_confidence: float = 0.5):
+    """
+    Run secret detection on the added lines of one file.
+    Lookback context is taken from the up-to-3 preceding lines of the new file,
+    but only if they are consecutive with the added line (i.e. really adjacent).
+    """
+    from .intelligent_detector import detect_secrets_in_line
+
+    findings = []
+    for index, line in enumerate(lines):
+        if not line.added:
+            continue
+        previous = []
+        for back in range(index - 1, max(-1, index - 4), -1):
+            if lines[back].line_no != line.line_no - (index - back):
+                break
+            previous.insert(0, lines[back].text)
+        for finding in detect_secrets_in_line(line.text, line.line_no, previous, min_confidence):
+            finding.file = path
+            findings.append(finding)
+    return findings
+
+
+def staged_diff(cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Return the staged diff with 3 lines of context, or b'' outside a repository.
+    The a/ and b/ prefixes are given explicitly: diff.noprefix or
+    diff.mnemonicPrefix in the user's config would otherwise change the
+    headers parse_unified_diff reads paths from. External diff drivers and
+    textconv filters are turned off so the diff shows the staged bytes.
+    """
+    cmd = ["git", "diff", "--cached", "-U3", "--no-color", "--no-ext-diff", "--no-textconv"]
+    res = subprocess.run(
+        cmd + ["--no-renames", "--src-prefix=a/", "--dst-prefix=b/"],
+        capture_output=True,
+        cwd=cwd,
+        env=env,
+    )
+    return res.stdout if res.returncode == 0 else b""
+
+
+def scan_staged_diff(
+    min_confidence: float = 0.5,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Scan only the lines added by the staged changes.
+    Version warnings are reported when they fall on an added line of a Terraform file.
+    Returns the same dict as scan_files; env is the environment git runs with.
+    """
+    files = parse_unified_diff(staged_diff(cwd=cwd, env=env))
+    results = []
+    terraform = {}
+
+    for path, lines in files.items():
+        # Classify by name and the first block of new-file lines (lockfiles, binaries)
+        head = "\n".join(line.text for line in lines[:200]).encode("utf-8")[:SNIFF_BYTES]
+        classification = classify_head(path, head, len(head))
+        if classification.verdict == SKIP:
+            results.append(_result([], [], SKIP, classification.reason))
+            continue
+        findings = detect_in_diff_lines(path, lines, min_confidence)
+        results.append(_result(findings, [], SCAN))
+        if Path(path).suffix in TERRAFORM_SUFFIXES:
+            terraform[path] = {line.line_no for line in lines if line.added}
+
+    # Version detectors need whole-file block state, so run them on the staged
+    # Terraform blobs and keep only warnings that land on added lines
+    entries = [entry for entry in staged_entries(cwd=cwd, env=env) if entry.path in terraform]
+    if entries:
+        with CatFileBatch(cwd=cwd, env=env) as cat:
+            for entry in entries:
+                obj = cat.read(entry.blob_id)
+                if obj is None:
+                    continue
+                content = FileContent.from_bytes(entry.path, obj[1], blob_id=entry.blob_id)
+                added = terraform[entry.path]
+                warnings = [w for w in scan_content_versions(content) if w["line"] in added]
+                results.append(_result([], warnings, SCAN))
+
+    return summarize(results)
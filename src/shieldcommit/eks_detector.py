@@ -5,7 +5,9 @@ Warns on deprecated and extended support versions.
 
 import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Union
+
+from .content import FileContent, TERRAFORM_SUFFIXES, as_lines
 
 # EKS version support timeline (as of 2024)
 # https://docs.aws.amazon.com/eks/latest/userguide/kubernetes-versions.html
@@ -23,7 +25,7 @@ EKS_VERSIONS = {
 }
 
 
-def parse_terraform_eks_versions(content: str) -> List[Dict[str, Any]]:
+def parse_terraform_eks_versions(content: Union[str, Sequence[str]]) -> List[Dict[str, Any]]:
     """
     Parse Terraform file content for EKS cluster versions.
     Detects versions in:
@@ -32,7 +34,7 @@ def parse_terraform_eks_versions(content: str) -> List[Dict[str, Any]]:
     Returns list of version findings with line numbers.
     """
     findings = []
-    lines = content.splitlines()
+    lines = as_lines(content)
 
     # Pattern 1: Direct resource usage: kubernetes_version = "1.27"
     pattern1 = r'kubernetes_version\s*=\s*["\']([0-9]+\.[0-9]+)["\']'
@@ -103,18 +105,30 @@ def scan_eks_versions(file_path: Path) -> List[Dict[str, Any]]:
     Scan a Terraform file for EKS version warnings.
     Returns list of warnings.
     """
-    warnings = []
-
     # Only scan Terraform files
-    if file_path.suffix not in {".tf", ".json"}:
-        return warnings
+    if file_path.suffix not in TERRAFORM_SUFFIXES:
+        return []
+
+    content = FileContent.from_path(file_path)
+    if content is None:
+        return []
+
+    return scan_eks_content(content)
+
+
+def scan_eks_content(content: FileContent) -> List[Dict[str, Any]]:
+    """
+    Check already-read file content for EKS version warnings.
+    Returns list of warnings.
+    """
+    warnings = []
 
-    try:
-        content = file_path.read_text(errors="ignore")
-    except Exception:
+    # Skip non-Terraform files and files that never mention a versioned resource
+    if not content.is_terraform or not content.mentions("kubernetes_version", "cluster_version"):
         return warnings
 
-    findings = parse_terraform_eks_versions(content)
+    file_path = content.path
+    findings = parse_terraform_eks_versions(content.lines)
 
     for finding in findings:
         version = finding["version"]
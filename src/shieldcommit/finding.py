@@ -0,0 +1,202 @@
+"""
+Compact finding records.
+A history scan can report millions of findings, so a finding is a slotted
+object rather than a dict. File paths and detection methods are interned
+(every finding with the same one shares it), the snippet is the start of the
+line (the line itself, shared, when it is short), the matched value is kept as
+offsets into the snippet when it lies there, and 'pattern' is derived from
+the detection method. A Finding is a Mapping with the keys finding dicts always
+had, so code that reads findings as dicts keeps working; to_dict() gives a
+real dict, e.g. for JSON.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+# Characters of the line reported as a finding's snippet; only these are kept,
+# so a finding never keeps a long (e.g. minified) line alive
+SNIPPET_CHARS = 200
+
+# Keys in the order finding dicts always had them; 'commit' only when it is set
+KEYS = (
+    "file",
+    "line",
+    "snippet",
+    "matched_value",
+    "variable",
+    "confidence",
+    "detection_method",
+    "pattern",
+)
+
+# Keys that are stored rather than derived, and so can be assigned
+_STORED = frozenset(KEYS) - {"pattern"} | {"commit"}
+
+
+class Finding(Mapping):
+    """A secret found on a line of a file."""
+
+    __slots__ = (
+        "_file",
+        "line",
+        "_snippet",
+        "_value",
+        "_start",
+        "_end",
+        "variable",
+        "confidence",
+        "_method",
+        "commit",
+    )
+
+    def __init__(
+        self,
+        file: str,
+        line: int,
+        source: str,
+        matched_value: str,
+        variable: str,
+        confidence: float,
+        detection_method: str,
+        commit: Optional[str] = None,
+        column: Optional[int] = None,
+    ):
+        """column is where matched_value starts in source, if the caller knows."""
+        self.file = file
+        self.line = line
+        self._snippet = source[:SNIPPET_CHARS]
+        self._set_value(matched_value, column)
+        self.variable = variable
+        self.confidence = confidence
+        self.detection_method = detection_method
+        self.commit = commit
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any], **changes) -> "Finding":
+        """A Finding from a finding dict (e.g. one read back from JSON)."""
+        record = dict(record, **changes)
+        return cls(
+            record.get("file", ""),
+            record["line"],
+            record.get("snippet", ""),
+            record.get("matched_value", ""),
+            record.get("variable", ""),
+            record.get("confidence", 0.0),
+            record.get("detection_method", ""),
+            record.get("commit"),
+        )
+
+    # ---------- stored and derived fields ----------
+
+    @property
+    def file(self) -> str:
+        return self._file
+
+    @file.setter
+    def file(self, value: str):
+        self._file = sys.intern(value)
+
+    @property
+    def detection_method(self) -> str:
+        return self._method
+
+    @detection_method.setter
+    def detection_method(self, value: str):
+        self._method = sys.intern(value)
+
+    @property
+    def snippet(self) -> str:
+        return self._snippet
+
+    @snippet.setter
+    def snippet(self, source: str):
+        value = self.matched_value
+        self._snippet = source[:SNIPPET_CHARS]
+        self._set_value(value)
+
+    @property
+    def matched_value(self) -> str:
+        if self._value is None:
+            return self._snippet[self._start : self._end]
+        return self._value
+
+    @matched_value.setter
+    def matched_value(self, value: str):
+        self._set_value(value)
+
+    def _set_value(self, value: str, column: Optional[int] = None):
+        """Keep value as offsets into the snippet if it lies there, else as a string."""
+        if column is None or self._snippet[column : column + len(value)] != value:
+            column = self._snippet.find(value) if value else -1
+        if column < 0:
+            self._value, self._start, self._end = value, 0, 0
+        else:
+            self._value, self._start, self._end = None, column, column + len(value)
+
+    @property
+    def pattern(self) -> str:
+        return f"Intelligent Detection: {self._method}"
+
+    # ---------- mapping interface ----------
+
+    def __getitem__(self, key: str) -> Any:
+        if key in KEYS or (key == "commit" and self.commit is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in _STORED:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from KEYS
+        if self.commit is not None:
+            yield "commit"
+
+    def __len__(self) -> int:
+        return len(KEYS) + (self.commit is not None)
+
+    def __contains__(self, key: object) -> bool:
+        return key in KEYS or (key == "commit" and self.commit is not None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The finding as a plain dict."""
+        return {key: getattr(self, key) for key in self}
+
+    def replace(self, **changes) -> "Finding":
+        """A copy with some fields changed (e.g. file and commit for history)."""
+        copy = Finding.__new__(Finding)
+        for slot in Finding.__slots__:
+            setattr(copy, slot, getattr(self, slot))
+        for key, value in changes.items():
+            copy[key] = value
+        return copy
+
+    def __reduce__(self):
+        # Rebuilt through __init__, so paths and methods are interned on arrival
+        return (
+            Finding,
+            (
+                self._file,
+                self.line,
+                self._snippet,
+                self.matched_value,
+                self.variable,
+                self.confidence,
+                self._method,
+                self.commit,
+                None if self._value is not None else self._start,
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return f"Finding({self.to_dict()!r})"
+
+
+def to_json(obj: Any) -> Dict[str, Any]:
+    """json.dumps default= hook that writes findings as dicts."""
+    if isinstance(obj, Finding):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
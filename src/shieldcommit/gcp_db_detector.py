@@ -6,7 +6,9 @@ Supports MySQL, PostgreSQL, and SQL Server.
 
 import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Union
+
+from .content import FileContent, TERRAFORM_SUFFIXES, as_lines
 
 # GCP Cloud SQL version support timeline
 # https://cloud.google.com/sql/docs/mysql/release-notes
@@ -47,14 +49,16 @@ GCP_CLOUDSQL_ENGINES = {
 }
 
 
-def parse_terraform_gcp_cloudsql_versions(content: str) -> List[Dict[str, Any]]:
+def parse_terraform_gcp_cloudsql_versions(
+    content: Union[str, Sequence[str]],
+) -> List[Dict[str, Any]]:
     """
     Parse Terraform file content for GCP Cloud SQL database versions.
     Looks for:
     - database_version in google_sql_database_instance
     """
     findings = []
-    lines = content.splitlines()
+    lines = as_lines(content)
 
     # Pattern to match: database_version = "MYSQL_8_0" or "POSTGRES_14" or "SQLSERVER_2019"
     db_version_pattern = r'database_version\s*=\s*["\']([A-Z_0-9]+)["\']'
@@ -143,18 +147,30 @@ def scan_gcp_cloudsql_versions(file_path: Path) -> List[Dict[str, Any]]:
     Scan a Terraform file for GCP Cloud SQL database version warnings.
     Returns list of warnings.
     """
-    warnings = []
-
     # Only scan Terraform files
-    if file_path.suffix not in {".tf", ".json"}:
-        return warnings
+    if file_path.suffix not in TERRAFORM_SUFFIXES:
+        return []
+
+    content = FileContent.from_path(file_path)
+    if content is None:
+        return []
+
+    return scan_gcp_cloudsql_content(content)
+
+
+def scan_gcp_cloudsql_content(content: FileContent) -> List[Dict[str, Any]]:
+    """
+    Check already-read file content for GCP Cloud SQL database version warnings.
+    Returns list of warnings.
+    """
+    warnings = []
 
-    try:
-        content = file_path.read_text(errors="ignore")
-    except Exception:
+    # Skip non-Terraform files and files that never mention a versioned resource
+    if not content.is_terraform or not content.mentions("google_sql_database_instance"):
         return warnings
 
-    findings = parse_terraform_gcp_cloudsql_versions(content)
+    file_path = content.path
+    findings = parse_terraform_gcp_cloudsql_versions(content.lines)
 
     for finding in findings:
         engine = finding["engine"]
@@ -5,7 +5,9 @@ Warns on deprecated and extended support versions.
 
 import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Union
+
+from .content import FileContent, TERRAFORM_SUFFIXES, as_lines
 
 # GCP GKE version support timeline (as of 2024)
 # https://cloud.google.com/kubernetes-engine/docs/release-notes-regular
@@ -21,7 +23,7 @@ GCP_VERSIONS = {
 }
 
 
-def parse_terraform_gcp_versions(content: str) -> List[Dict[str, Any]]:
+def parse_terraform_gcp_versions(content: Union[str, Sequence[str]]) -> List[Dict[str, Any]]:
     """
     Parse Terraform file content for GCP GKE cluster versions.
     Detects versions in:
@@ -30,7 +32,7 @@ def parse_terraform_gcp_versions(content: str) -> List[Dict[str, Any]]:
     Returns list of version findings with line numbers.
     """
     findings = []
-    lines = content.splitlines()
+    lines = as_lines(content)
 
     # Pattern 1: Explicit version in resources: min_master_version = "1.27"
     version_pattern = r'min_master_version\s*=\s*["\']([0-9]+\.[0-9]+)["\']'
@@ -126,18 +128,32 @@ def scan_gcp_versions(file_path: Path) -> List[Dict[str, Any]]:
     Scan a Terraform file for GCP GKE version warnings.
     Returns list of warnings.
     """
-    warnings = []
-
     # Only scan Terraform files
-    if file_path.suffix not in {".tf", ".json"}:
-        return warnings
+    if file_path.suffix not in TERRAFORM_SUFFIXES:
+        return []
+
+    content = FileContent.from_path(file_path)
+    if content is None:
+        return []
+
+    return scan_gcp_content(content)
+
+
+def scan_gcp_content(content: FileContent) -> List[Dict[str, Any]]:
+    """
+    Check already-read file content for GCP GKE version warnings.
+    Returns list of warnings.
+    """
+    warnings = []
 
-    try:
-        content = file_path.read_text(errors="ignore")
-    except Exception:
+    # Skip non-Terraform files and files that never mention a versioned resource
+    if not content.is_terraform or not content.mentions(
+        "min_master_version", "cluster_version", "channel"
+    ):
         return warnings
 
-    findings = parse_terraform_gcp_versions(content)
+    file_path = content.path
+    findings = parse_terraform_gcp_versions(content.lines)
 
     for finding in findings:
         if finding["type"] == "explicit":
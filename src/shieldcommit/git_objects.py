@@ -0,0 +1,111 @@
+"""
+Git object access for scanning staged content.
+Lists staged blobs from the index and streams their contents through one
+long-lived `git cat-file --batch` process.
+"""
+
+import subprocess
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Mode of a submodule entry (its "blob id" is a commit in another repository)
+GITLINK_MODE = "160000"
+
+# All-zero object id: no object on this side of the diff
+ZERO_OID = "0" * 40
+
+
+class StagedEntry(NamedTuple):
+    """One staged file: its path, the staged blob id, file mode and diff status."""
+
+    path: str
+    blob_id: str
+    mode: str
+    status: str
+
+
+def parse_raw_diff(output: bytes) -> List[StagedEntry]:
+    """
+    Parse `git diff --raw -z --no-abbrev --no-renames` output.
+    Deletions, submodule gitlinks and unmerged entries are left out.
+    """
+    entries = []
+    fields = output.split(b"\0")
+    i = 0
+    while i + 1 < len(fields):
+        meta = fields[i].decode("ascii", errors="ignore")
+        path = fields[i + 1].decode("utf-8", errors="surrogateescape")
+        i += 2
+        if not meta.startswith(":"):
+            continue
+        # ":<old mode> <new mode> <old oid> <new oid> <status>"
+        parts = meta[1:].split()
+        if len(parts) < 5:
+            continue
+        new_mode, new_oid, status = parts[1], parts[3], parts[4][:1]
+        if status in ("D", "U") or new_mode == GITLINK_MODE or new_oid == ZERO_OID:
+            continue
+        entries.append(StagedEntry(path, new_oid, new_mode, status))
+    return entries
+
+
+def staged_entries(
+    cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None
+) -> List[StagedEntry]:
+    """
+    Return the blobs that would be committed, with paths relative to the repo root.
+    env replaces the environment git runs with (e.g. to select GIT_INDEX_FILE).
+    """
+    res = subprocess.run(
+        ["git", "diff", "--cached", "--raw", "-z", "--no-abbrev", "--no-renames"],
+        capture_output=True,
+        cwd=cwd,
+        env=env,
+    )
+    if res.returncode != 0:
+        return []
+    return parse_raw_diff(res.stdout)
+
+
+class CatFileBatch:
+    """
+    A persistent `git cat-file --batch` process.
+    Objects are requested one at a time over its stdin and read back from stdout,
+    so any number of blobs costs a single process start.
+    """
+
+    def __init__(self, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None):
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd,
+            env=env,
+        )
+
+    def read(self, oid: str) -> Optional[Tuple[str, bytes]]:
+        """Return (object type, contents), or None if the object does not exist."""
+        self.process.stdin.write(oid.encode("ascii") + b"\n")
+        self.process.stdin.flush()
+
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            # "<oid> missing" (or the process went away)
+            return None
+        obj_type, size = header[1].decode("ascii"), int(header[2])
+
+        data = self.process.stdout.read(size)
+        self.process.stdout.read(1)  # trailing newline after each object
+        return obj_type, data
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
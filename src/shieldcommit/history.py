@@ -0,0 +1,206 @@
+"""
+Whole-history scanning.
+Every blob reachable from the given revisions is scanned exactly once, and its
+findings are attributed to each commit and path that introduced it.
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from .classifier import classify_head, SNIFF_BYTES
+from .content import TERRAFORM_SUFFIXES
+from .finding import Finding
+from .git_objects import CatFileBatch, GITLINK_MODE, ZERO_OID
+from .scanner import open_cache, scan_blob, summarize
+
+# Bytes read from `git log` per chunk
+_LOG_CHUNK = 64 * 1024
+
+
+class HistoryError(RuntimeError):
+    """History could not be listed or read, so it cannot be vouched for."""
+
+
+class Introduction(NamedTuple):
+    """A commit that put a blob at a path."""
+
+    commit: str
+    path: str
+
+
+def _iter_fields(stream) -> Iterator[bytes]:
+    """Yield NUL-separated fields from a binary stream without reading it whole."""
+    pending = b""
+    for chunk in iter(lambda: stream.read(_LOG_CHUNK), b""):
+        fields = (pending + chunk).split(b"\0")
+        pending = fields.pop()
+        yield from fields
+    if pending:
+        yield pending
+
+
+def parse_log_raw(fields) -> Iterator[tuple]:
+    """
+    Parse the fields of `git log --format=%x00commit %H --raw -c -z --no-abbrev`.
+    Yields (commit, path, blob id) for every blob a commit adds or changes.
+    Merges only list files that differ from all parents (-c), i.e. what the
+    merge itself introduced. Deletions and submodule gitlinks are left out.
+    """
+    commit = None
+    meta = None
+    for field in fields:
+        field = field.lstrip(b"\n")
+        if meta is not None:
+            # Path of the preceding ":<modes> <oids> <status>" record
+            parts = meta.split()
+            parents = len(meta) - len(meta.lstrip(":"))
+            meta = None
+            if len(parts) < 2 * parents + 3 or commit is None:
+                continue
+            new_mode, new_oid = parts[parents], parts[2 * parents + 1]
+            if new_mode == GITLINK_MODE or new_oid == ZERO_OID:
+                continue
+            yield commit, field.decode("utf-8", errors="surrogateescape"), new_oid
+        elif field.startswith(b"commit "):
+            commit = field[len("commit ") :].decode("ascii", errors="ignore")
+        elif field.startswith(b":"):
+            meta = field.decode("ascii", errors="ignore")
+
+
+def blob_introductions(
+    revisions: Sequence[str] = ("--all",), cwd: Optional[str] = None
+) -> Dict[str, List[Introduction]]:
+    """
+    Map every blob id introduced within the given revisions to the commits and
+    paths that introduced it (in `git log` order, newest first).
+    Raises HistoryError if git cannot list them (e.g. an unknown revision):
+    an empty map must mean there is nothing to scan.
+    """
+    cmd = [
+        "git",
+        "log",
+        "--format=%x00commit %H",
+        "--raw",
+        "-c",
+        "-z",
+        "--no-abbrev",
+        "--no-renames",
+        *revisions,
+        "--",
+    ]
+    introductions: Dict[str, List[Introduction]] = {}
+    # stderr goes to a file: a pipe could fill up while stdout is being read
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors, cwd=cwd)
+        try:
+            for commit, path, oid in parse_log_raw(_iter_fields(process.stdout)):
+                # The same few paths recur across thousands of commits
+                introductions.setdefault(oid, []).append(
+                    Introduction(sys.intern(commit), sys.intern(path))
+                )
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        if returncode != 0:
+            errors.seek(0)
+            message = errors.read().decode("utf-8", errors="replace").strip()
+            raise HistoryError(f"git log failed ({returncode}): {message}")
+    return introductions
+
+
+def _attribute(records, introductions: List[Introduction]) -> list:
+    """Copy each finding or warning once per commit and path that introduced its blob."""
+    return [
+        (
+            record.replace(file=intro.path, commit=intro.commit)
+            if isinstance(record, Finding)
+            else dict(record, file=intro.path, commit=intro.commit)
+        )
+        for intro in introductions
+        for record in records
+    ]
+
+
+def scan_history(
+    revisions: Sequence[str] = ("--all",),
+    min_confidence: float = 0.5,
+    max_file_size: Optional[int] = None,
+    cache_dir=None,
+    cwd: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Scan every blob introduced within the given revisions (default: all refs).
+    Returns the same dict as scan_files, plus 'blobs' (distinct blobs scanned)
+    and 'commit' on every finding and warning. Raises HistoryError if the
+    history cannot be listed or read.
+    """
+    introductions = blob_introductions(revisions, cwd=cwd)
+    return scan_introductions(introductions, min_confidence, max_file_size, cache_dir, cwd)
+
+
+def scan_introductions(
+    introductions: Dict[str, List[Introduction]],
+    min_confidence: float = 0.5,
+    max_file_size: Optional[int] = None,
+    cache_dir=None,
+    cwd: Optional[str] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Scan the blobs of a blob_introductions() map.
+    Returns the same dict as scan_history, plus 'unscanned': the number of blobs
+    left when the deadline (a time.monotonic() value) passed. Raises
+    HistoryError if a blob cannot be read.
+
+    Each distinct blob is read once through `git cat-file --batch`. It is scanned
+    once per distinct way its paths classify it (usually once), so a file that
+    is unchanged across many commits costs a single scan.
+    """
+    cache = open_cache(cache_dir, min_confidence)
+    results = []
+    scanned = 0
+
+    with CatFileBatch(cwd=cwd) as cat:
+        for oid, intros in introductions.items():
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            scanned += 1
+            obj = cat.read(oid)
+            if obj is None or obj[0] != "blob":
+                # git listed it as introduced, so it must exist; never pass it unscanned
+                raise HistoryError(f"introduced blob {oid} could not be read")
+            data = obj[1]
+
+            # Paths only matter for classification and the Terraform detectors
+            by_profile: Dict[tuple, List[Introduction]] = {}
+            for intro in intros:
+                classification = classify_head(
+                    intro.path, data[:SNIFF_BYTES], len(data), max_size=max_file_size
+                )
+                terraform = Path(intro.path).suffix in TERRAFORM_SUFFIXES
+                by_profile.setdefault((classification, terraform), []).append(intro)
+
+            for group in by_profile.values():
+                result = scan_blob(group[0].path, oid, data, min_confidence, max_file_size, cache)
+                results.append(
+                    dict(
+                        result,
+                        findings=_attribute(result["findings"], group),
+                        warnings=_attribute(result["warnings"], group),
+                    )
+                )
+
+    if cache is not None and cache.writes:
+        cache.prune()
+    summary = summarize(results)
+    summary["blobs"] = scanned
+    summary["unscanned"] = len(introductions) - scanned
+    detector = sys.modules.get(f"{__package__}.intelligent_detector")
+    if detector is not None:
+        # Verdict memo counters (for this process), to size it for scans like this one
+        summary["verdicts"] = detector.IntelligentDetector.VERDICTS.stats()
+    return summary
@@ -2,8 +2,8 @@ from pathlib import Path
 
 HOOK_TEMPLATE = """#!/bin/bash
 # ShieldCommit pre-commit hook
-# This calls the shieldcommit CLI to scan staged files
-shieldcommit scan
+# This calls the shieldcommit CLI to scan {scope}
+{command}
 RESULT=$?
 if [ $RESULT -ne 0 ]; then
   echo "ShieldCommit: commit blocked due to detected secrets."
@@ -12,12 +12,36 @@ fi
 exit 0
 """
 
+PRE_RECEIVE_TEMPLATE = """#!/bin/bash
+# ShieldCommit pre-receive hook
+# Scans every blob a push introduces; a non-zero exit rejects the whole push
+exec shieldcommit pre-receive
+"""
+
 
-def install_hook(repo_path="."):
+def install_hook(repo_path=".", diff=False):
+    """Install the pre-commit hook; with diff, it scans only the lines the staged changes add."""
     git_hooks = Path(repo_path) / ".git" / "hooks"
     git_hooks.mkdir(parents=True, exist_ok=True)
     hook_file = git_hooks / "pre-commit"
-    hook_file.write_text(HOOK_TEMPLATE)
+    if diff:
+        hook = HOOK_TEMPLATE.format(
+            scope="the lines added by the staged changes", command="shieldcommit scan --diff"
+        )
+    else:
+        hook = HOOK_TEMPLATE.format(scope="staged files", command="shieldcommit scan")
+    hook_file.write_text(hook)
+    hook_file.chmod(0o755)
+    return True
+
+
+def install_pre_receive_hook(repo_path="."):
+    """Install the server-side hook (works for bare and non-bare repositories)."""
+    repo = Path(repo_path)
+    git_hooks = (repo / ".git" / "hooks") if (repo / ".git").is_dir() else (repo / "hooks")
+    git_hooks.mkdir(parents=True, exist_ok=True)
+    hook_file = git_hooks / "pre-receive"
+    hook_file.write_text(PRE_RECEIVE_TEMPLATE)
     hook_file.chmod(0o755)
     return True
 
@@ -6,9 +6,68 @@ Uses entropy analysis, semantic analysis, context understanding, and heuristics.
 Calculates confidence scores to minimize false positives.
 """
 
+import functools
 import re
 import math
-from typing import List, Dict, Tuple
+from collections import Counter, deque
+from itertools import groupby
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .finding import Finding
+from .lexer import ASSIGNMENTS, CANDIDATE_MODES, Candidate, has_candidates, line_candidates
+from .matchers import CASE_PREFIX, CHECK, CONTAINS, LINE, MATCH, MATCH_LOWER, PREFIX
+from .matchers import ExclusionMatcher, ExclusionRule, FormatMatcher, KeywordAutomaton
+from .memo import VerdictMemo
+
+# Keyword classes, as bits of a KeywordAutomaton.scan() result; the line words
+# of EXCLUSION_RULES take the bits from LINE_WORDS up
+SECRET_KEYWORD = 1
+CONTEXT_KEYWORD = 2
+EXCLUDE_KEYWORD = 4
+LINE_WORDS = 8
+
+
+class LineKeywords(NamedTuple):
+    """What the keyword sets say about one line (with its context)."""
+
+    variable: str  # first assigned variable name, lowercased ("" if none)
+    secret_variable: bool  # variable contains a SECRET_KEYWORD
+    context: bool  # a CONTEXT_KEYWORD occurs in the line
+    exclude: bool  # an EXCLUDE_KEYWORD occurs in the line
+    words: int = 0  # bits of the EXCLUSION_RULES line words occurring in the line
+
+
+class Verdict(NamedTuple):
+    """Everything IntelligentDetector.analyze found out about a value in a line."""
+
+    confidence: float  # 0.0 to 1.0
+    method: str  # detection method reported with a finding
+    entropy: float  # Shannon entropy of the value, in bits per character
+    format: str  # name of the SECRET_STRUCTURES format the value matches ("" if none)
+    variable: str  # the line's variable if it names a secret ("" if not)
+    context: bool  # a CONTEXT_KEYWORD occurs in the line
+    exclusion: str  # the exclusion rule that ruled the value out ("" if none; confidence is 0)
+
+
+def _is_port(value: str) -> bool:
+    # Same digits as \d, and int() reads them all
+    return len(value) <= 5 and value.isdecimal() and int(value) <= 65535
+
+
+def _mostly_digits(value: str) -> bool:
+    return len(value) > 5 and sum(c.isdigit() for c in value) / len(value) > 0.7
 
 
 class IntelligentDetector:
@@ -172,6 +231,128 @@ class IntelligentDetector:
         "resource_id",
     }
 
+    # Legitimate identifiers (naming, IDs, URLs, paths ...) that are not secrets,
+    # as (kind, text, name[, line words the rule needs]). See matchers.ExclusionRule
+    # for the kinds; the table is compiled into _EXCLUSIONS.
+    EXCLUSION_RULES = [
+        # ============ INFRASTRUCTURE AS CODE PATTERNS ============
+        # Terraform/CloudFormation interpolations
+        ExclusionRule(CONTAINS, "${", "Interpolation"),
+        ExclusionRule(CONTAINS, "}", "Interpolation"),
+        ExclusionRule(CONTAINS, "{%", "Template tag"),
+        # Variable references (Terraform, CloudFormation, etc.)
+        ExclusionRule(CONTAINS, "var.", "Variable reference"),
+        ExclusionRule(CONTAINS, "local.", "Variable reference"),
+        ExclusionRule(CONTAINS, "data.", "Variable reference"),
+        ExclusionRule(CONTAINS, "data:", "Variable reference"),
+        ExclusionRule(CONTAINS, "module.", "Variable reference"),
+        # Terraform resource references: aws_vpc.main.id, aws_db_instance.postgres.endpoint
+        ExclusionRule(
+            MATCH_LOWER,
+            r"^(?=.*(?:aws_|google_|azurerm_|kubernetes_))[a-z_]+\.[a-z_]+(\.[a-z_]+)*$",
+            "Terraform resource reference",
+        ),
+        # Kubernetes patterns
+        ExclusionRule(CONTAINS, "kind:", "Kubernetes manifest"),
+        ExclusionRule(CONTAINS, "apiversion:", "Kubernetes manifest"),
+        ExclusionRule(PREFIX, "k8s-", "Kubernetes name"),
+        ExclusionRule(PREFIX, "kube-", "Kubernetes name"),
+        # ============ AWS IDENTIFIERS ============
+        ExclusionRule(PREFIX, "arn:", "AWS ARN"),
+        ExclusionRule(LINE, "arn:", "AWS ARN in line"),
+        ExclusionRule(MATCH, r"^[iI]-.{17}$", "EC2 instance ID"),
+        ExclusionRule(PREFIX, "ami-", "AMI ID"),
+        ExclusionRule(PREFIX, "ami_", "AMI ID"),
+        ExclusionRule(PREFIX, "sg-", "Security group ID"),
+        ExclusionRule(PREFIX, "subnet-", "Subnet ID"),
+        ExclusionRule(PREFIX, "vpc-", "VPC ID"),
+        ExclusionRule(PREFIX, "vol-", "Volume ID"),
+        ExclusionRule(PREFIX, "snap-", "Snapshot ID"),
+        ExclusionRule(PREFIX, "rtb-", "Route table ID"),
+        ExclusionRule(PREFIX, "acl-", "Network ACL ID"),
+        ExclusionRule(PREFIX, "eni-", "Network interface ID"),
+        ExclusionRule(PREFIX, "nat-", "NAT gateway ID"),
+        ExclusionRule(PREFIX, "igw-", "Internet gateway ID"),
+        ExclusionRule(PREFIX, "eip-", "Elastic IP ID"),
+        ExclusionRule(PREFIX, "dopt-", "DHCP options set ID"),
+        # ============ GCP IDENTIFIERS ============
+        ExclusionRule(CASE_PREFIX, "projects/", "GCP resource"),
+        ExclusionRule(PREFIX, "gke-", "GKE cluster"),
+        # GCP project numbers and Unix timestamps
+        ExclusionRule(MATCH, r"^\d{10,}$", "Long number"),
+        # ============ AZURE IDENTIFIERS ============
+        ExclusionRule(PREFIX, "/subscriptions/", "Azure resource path"),
+        ExclusionRule(PREFIX, "guid-", "Azure ID"),
+        ExclusionRule(PREFIX, "id-", "Azure ID"),
+        # ============ STANDARD IDENTIFIERS ============
+        ExclusionRule(
+            MATCH_LOWER, r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", "UUID"
+        ),
+        # MD5, SHA1, SHA256, SHA512
+        ExclusionRule(
+            MATCH_LOWER, r"^[a-f0-9]{32}$|^[a-f0-9]{40}$|^[a-f0-9]{64}$|^[a-f0-9]{128}$", "Hash"
+        ),
+        ExclusionRule(MATCH_LOWER, r"^[0-9a-f]{7,40}$", "Git hash", line=("git",)),
+        ExclusionRule(PREFIX, "sha256:", "Docker digest"),
+        ExclusionRule(PREFIX, "sha512:", "Docker digest"),
+        # ============ NETWORKING & DNS ============
+        ExclusionRule(PREFIX, "http://", "URL"),
+        ExclusionRule(PREFIX, "https://", "URL"),
+        ExclusionRule(PREFIX, "ws://", "URL"),
+        ExclusionRule(PREFIX, "wss://", "URL"),
+        ExclusionRule(PREFIX, "grpc://", "URL"),
+        ExclusionRule(PREFIX, "file://", "URL"),
+        ExclusionRule(PREFIX, "ftp://", "URL"),
+        ExclusionRule(
+            MATCH_LOWER, r"^([a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,}$", "Domain name"
+        ),
+        ExclusionRule(MATCH, r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", "Email address"),
+        ExclusionRule(MATCH, r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$", "IPv4 address"),
+        ExclusionRule(MATCH_LOWER, r"^(?=(?:[^:]*:){2})[0-9a-f:]+$", "IPv6 address"),
+        ExclusionRule(CHECK, "", "Port number", check=_is_port),
+        # ============ CONTAINER & IMAGE IDENTIFIERS ============
+        # Docker image names (repo/name:tag)
+        ExclusionRule(MATCH_LOWER, r"^[a-z0-9\-._/]+:[a-z0-9\-._]+$", "Container image"),
+        ExclusionRule(MATCH_LOWER, r"^[a-z0-9\-._/]+@sha256:[a-f0-9]{64}$", "Container image"),
+        ExclusionRule(CONTAINS, "docker.io", "Container registry"),
+        ExclusionRule(CONTAINS, "gcr.io", "Container registry"),
+        ExclusionRule(CONTAINS, "azurecr.io", "Container registry"),
+        ExclusionRule(CONTAINS, "ecr.aws", "Container registry"),
+        # ============ PACKAGE & MODULE REFERENCES ============
+        ExclusionRule(CONTAINS, "github.com/", "Go import path"),
+        ExclusionRule(CONTAINS, "gitlab.com/", "Go import path"),
+        ExclusionRule(CONTAINS, "pypi.org", "Python package"),
+        ExclusionRule(CONTAINS, "python.org", "Python package"),
+        ExclusionRule(
+            MATCH_LOWER, r"^[a-z]+(\.[a-z0-9]+)+$", "Java package", line=("java", "package")
+        ),
+        # ============ FILE PATHS & DIRECTORIES ============
+        ExclusionRule(
+            MATCH_LOWER, r"^(?=.*[/\\]).*\.(?:tf|yaml|yml|json|xml|py|js|go)", "File path"
+        ),
+        ExclusionRule(CASE_PREFIX, "/var/run/secrets", "System path"),
+        ExclusionRule(CASE_PREFIX, "/etc/", "System path"),
+        # ============ VERSION & BUILD INFO ============
+        ExclusionRule(MATCH_LOWER, r"^\d+\.\d+(\.\d+)?(\-[a-z0-9]+)?$", "Version"),
+        ExclusionRule(MATCH, r"^\d{4}-\d{2}-\d{2}", "Date"),
+        ExclusionRule(MATCH_LOWER, r"^[0-9a-f]{7,}$", "Commit SHA", line=("commit",)),
+        # ============ NAMING PATTERNS ============
+        # Lowercase hyphenated resource names (word-word-123), shorter than 24 characters
+        ExclusionRule(MATCH, r"^(?=.{0,23}$)[a-z0-9]+(-[a-z0-9]+)*(-\d+)?$", "Resource name"),
+        ExclusionRule(MATCH, r"^[A-Z][a-z]+([A-Z][a-z]+)*$", "Camel case name"),
+        # ============ CONTEXT-BASED EXCLUSIONS ============
+        # IDs and counts
+        ExclusionRule(CHECK, "", "Mostly digits", check=_mostly_digits),
+        # ============ RESOURCE NAMING PATTERNS ============
+        # env-region-number
+        ExclusionRule(MATCH_LOWER, r"^[a-z]+-[a-z]+-\d+$", "Resource name"),
+        # subdomain.service.namespace
+        ExclusionRule(MATCH_LOWER, r"^[a-z0-9]+\.[a-z0-9]+(\.[a-z0-9]+)*$", "Service name"),
+    ]
+
+    # EXCLUSION_RULES compiled for single-pass matching (see register_exclusion)
+    _EXCLUSIONS = ExclusionMatcher(EXCLUSION_RULES, first_bit=LINE_WORDS)
+
     # Common secret structures (formats likely to be secrets)
     SECRET_STRUCTURES = [
         # Base64-like with specific prefixes
@@ -192,6 +373,86 @@ class IntelligentDetector:
         (r"^Bearer\s+[A-Za-z0-9\-._~+/]+=*$", "Bearer Token"),  # Bearer tokens
     ]
 
+    # SECRET_STRUCTURES compiled for single-pass matching (see register_secret_format)
+    _FORMATS = FormatMatcher(SECRET_STRUCTURES)
+
+    # All three keyword sets and the exclusion line words in one automaton, so a
+    # line is scanned once for all of them
+    _KEYWORDS = KeywordAutomaton(
+        {
+            SECRET_KEYWORD: SECRET_KEYWORDS,
+            CONTEXT_KEYWORD: CONTEXT_KEYWORDS,
+            EXCLUDE_KEYWORD: EXCLUDE_KEYWORDS,
+            **_EXCLUSIONS.line_words,
+        }
+    )
+
+    # Assignment whose variable name is checked for secret keywords
+    _ASSIGNMENT = re.compile(r'([a-zA-Z_][a-zA-Z0-9_\-]*)\s*[:=]\s*["\']?([^"\';\s]+)')
+
+    # Where detect_in_line takes candidate values from (see set_candidates)
+    CANDIDATES = ASSIGNMENTS
+
+    # Verdicts of recently scored candidates (see verdict); VERDICTS.resize() sizes it
+    VERDICTS = VerdictMemo()
+
+    @classmethod
+    def register_secret_format(cls, pattern: str, name: str):
+        """
+        Add a known secret format (an anchored regex) to SECRET_STRUCTURES.
+        The matcher is rebuilt once here, so checking a value costs the same
+        however many formats are registered.
+        """
+        cls.SECRET_STRUCTURES.append((pattern, name))
+        cls._FORMATS = FormatMatcher(cls.SECRET_STRUCTURES)
+        cls.VERDICTS.clear()
+
+        # Cached results were produced without the new format
+        from .cache import ruleset_fingerprint
+
+        ruleset_fingerprint.cache_clear()
+
+    @classmethod
+    def register_exclusion(cls, rule: ExclusionRule):
+        """
+        Add a rule to EXCLUSION_RULES, e.g.
+        ExclusionRule(PREFIX, "acme-", "Acme resource ID") with PREFIX from matchers.
+        """
+        cls.EXCLUSION_RULES.append(rule)
+        cls._EXCLUSIONS = ExclusionMatcher(cls.EXCLUSION_RULES, first_bit=LINE_WORDS)
+        cls._KEYWORDS = KeywordAutomaton(
+            {
+                SECRET_KEYWORD: cls.SECRET_KEYWORDS,
+                CONTEXT_KEYWORD: cls.CONTEXT_KEYWORDS,
+                EXCLUDE_KEYWORD: cls.EXCLUDE_KEYWORDS,
+                **cls._EXCLUSIONS.line_words,
+            }
+        )
+        # Line words may have changed, and with them what is remembered per line
+        _line_keywords.cache_clear()
+        _context_signature.cache_clear()
+        cls.VERDICTS.clear()
+
+        # Cached results were produced without the new rule
+        from .cache import ruleset_fingerprint
+
+        ruleset_fingerprint.cache_clear()
+
+    @classmethod
+    def set_candidates(cls, mode: str):
+        """
+        Choose where values are taken from: "assignments" (variable = value),
+        "tokens" (high-entropy runs anywhere in a line) or "both".
+        """
+        if mode not in CANDIDATE_MODES:
+            raise ValueError(f"candidates must be one of {', '.join(CANDIDATE_MODES)}")
+        cls.CANDIDATES = mode
+
+        # Cached results were produced from other candidates
+        from .cache import ruleset_fingerprint
+
+        ruleset_fingerprint.cache_clear()
+
     @staticmethod
     def calculate_entropy(s: str) -> float:
         """
@@ -202,13 +463,11 @@ class IntelligentDetector:
         if not s or len(s) < 1:
             return 0.0
 
-        # Count unique characters
-        unique_chars = len(set(s))
-
-        # Calculate probabilities and entropy
+        # One pass to count every character, then one term per distinct character
+        length = len(s)
         entropy = 0.0
-        for char in set(s):
-            probability = s.count(char) / len(s)
+        for count in Counter(s).values():
+            probability = count / length
             entropy -= probability * math.log2(probability)
 
         return entropy
@@ -229,15 +488,8 @@ class IntelligentDetector:
         if entropy < min_entropy:
             return False
 
-        # Check character variety (should have different types)
-        has_alpha = bool(re.search(r"[a-zA-Z]", value))
-        has_digit = bool(re.search(r"\d", value))
-        has_special = bool(re.search(r"[^a-zA-Z0-9]", value))
-
         # Need at least 2 of 3 character types for high entropy to be meaningful
-        variety = sum([has_alpha, has_digit, has_special])
-
-        return variety >= 2
+        return character_variety(value) >= 2
 
     @staticmethod
     def is_likely_secret_format(value: str) -> Tuple[bool, str]:
@@ -245,11 +497,10 @@ class IntelligentDetector:
         Check if value matches known secret formats.
         Returns (is_secret, format_name)
         """
-        for pattern, name in IntelligentDetector.SECRET_STRUCTURES:
-            if re.match(pattern, value):
-                return True, name
-
-        return False, ""
+        name = IntelligentDetector._FORMATS.match(value)
+        if name is None:
+            return False, ""
+        return True, name
 
     @staticmethod
     def extract_secret_indicator(line: str) -> Tuple[str, float]:
@@ -257,27 +508,25 @@ class IntelligentDetector:
         Extract secret indicator from line (variable name).
         Returns (indicator, confidence_boost)
         """
-        # Look for assignment patterns: var = value, var: value, etc.
-        match = re.search(r'([a-zA-Z_][a-zA-Z0-9_\-]*)\s*[:=]\s*["\']?([^"\';\s]+)', line)
-        if not match:
-            return "", 0.0
-
-        var_name = match.group(1).lower()
-
-        # Check if variable name suggests a secret
-        for keyword in IntelligentDetector.SECRET_KEYWORDS:
-            if keyword in var_name:
-                return var_name, 0.3  # Boost confidence
-
-        return var_name, 0.0
+        keywords = IntelligentDetector.line_keywords(line)
+        # Boost confidence if the variable name suggests a secret
+        return keywords.variable, 0.3 if keywords.secret_variable else 0.0
 
     @staticmethod
     def has_secret_context(line: str) -> bool:
         """
         Check if line has context keywords suggesting it contains a secret.
         """
-        line_lower = line.lower()
-        return any(keyword in line_lower for keyword in IntelligentDetector.CONTEXT_KEYWORDS)
+        return IntelligentDetector.line_keywords(line).context
+
+    @staticmethod
+    def line_keywords(line: str) -> LineKeywords:
+        """
+        Check a line against SECRET_KEYWORDS, CONTEXT_KEYWORDS and EXCLUDE_KEYWORDS at once.
+        Every candidate on a line is scored against the same line, so the result
+        is remembered for recently seen lines.
+        """
+        return _line_keywords(line)
 
     @staticmethod
     def is_excluded(value: str, line: str) -> bool:
@@ -285,288 +534,104 @@ class IntelligentDetector:
         Check if value should be excluded (legitimate identifier, not a secret).
         Handles all common production patterns: naming, IDs, URLs, paths, etc.
         """
-        value_lower = value.lower()
-        line_lower = line.lower()
-
-        # ============ INFRASTRUCTURE AS CODE PATTERNS ============
-
-        # Terraform/CloudFormation interpolations
-        if "${" in value or "}" in value or "{%" in value:
-            return True
-
-        # Variable references (Terraform, CloudFormation, etc.)
-        if "var." in value_lower or "local." in value_lower or "data." in value_lower:
-            return True
-        if "data:" in value_lower or "module." in value_lower:
-            return True
-
-        # Terraform resource references (resource_type.resource_name.attribute)
-        if re.match(r"^[a-z_]+\.[a-z_]+(\.[a-z_]+)*$", value_lower):
-            # This matches patterns like: aws_vpc.main.id, aws_db_instance.postgres.endpoint
-            if any(
-                keyword in value_lower for keyword in ["aws_", "google_", "azurerm_", "kubernetes_"]
-            ):
-                return True
-
-        # Kubernetes patterns
-        if "kind:" in value_lower or "apiversion:" in value_lower:
-            return True
-        if value_lower.startswith("k8s-") or value_lower.startswith("kube-"):
-            return True
-
-        # ============ AWS IDENTIFIERS ============
-
-        if value_lower.startswith("arn:") or "arn:" in line_lower:
-            return True
-        if value_lower.startswith("i-") and len(value) == 19:  # EC2 instance ID
-            return True
-        if value_lower.startswith("ami-") or value_lower.startswith("ami_"):  # AMI ID
-            return True
-        if value_lower.startswith("sg-"):  # Security group
-            return True
-        if value_lower.startswith("subnet-"):  # Subnet
-            return True
-        if value_lower.startswith("vpc-"):  # VPC
-            return True
-        if value_lower.startswith("vol-"):  # Volume
-            return True
-        if value_lower.startswith("snap-"):  # Snapshot
-            return True
-        if value_lower.startswith("rtb-"):  # Route table
-            return True
-        if value_lower.startswith("acl-"):  # Network ACL
-            return True
-        if value_lower.startswith("eni-"):  # Network interface
-            return True
-        if value_lower.startswith("nat-"):  # NAT gateway
-            return True
-        if value_lower.startswith("igw-"):  # Internet gateway
-            return True
-        if value_lower.startswith("eip-"):  # Elastic IP
-            return True
-        if value_lower.startswith("dopt-"):  # DHCP options set
-            return True
-
-        # ============ GCP IDENTIFIERS ============
-
-        if value.startswith("projects/"):  # GCP resource
-            return True
-        if value_lower.startswith("gke-"):  # GKE cluster
-            return True
-        if re.match(r"^\d{10,}$", value):  # GCP project number
-            return True
-
-        # ============ AZURE IDENTIFIERS ============
-
-        if value_lower.startswith("/subscriptions/"):  # Azure resource path
-            return True
-        if value_lower.startswith("guid-") or value_lower.startswith("id-"):
-            return True
-
-        # ============ STANDARD IDENTIFIERS ============
-
-        # UUID
-        if re.match(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", value_lower):
-            return True
-
-        # Hashes (MD5, SHA1, SHA256, SHA512)
-        if re.match(r"^[a-f0-9]{32}$|^[a-f0-9]{40}$|^[a-f0-9]{64}$|^[a-f0-9]{128}$", value_lower):
-            return True
-
-        # Git hashes
-        if re.match(r"^[0-9a-f]{7,40}$", value_lower) and "git" in line_lower:
-            return True
-
-        # Docker SHA
-        if value_lower.startswith("sha256:"):
-            return True
-        if value_lower.startswith("sha512:"):
-            return True
-
-        # ============ NETWORKING & DNS ============
-
-        # URLs and endpoints
-        if value_lower.startswith("http://") or value_lower.startswith("https://"):
-            return True
-        if value_lower.startswith("ws://") or value_lower.startswith("wss://"):
-            return True
-        if value_lower.startswith("grpc://"):
-            return True
-        if value_lower.startswith("file://") or value_lower.startswith("ftp://"):
-            return True
-
-        # Domain names and FQDNs
-        if re.match(r"^([a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,}$", value_lower):
-            return True
-
-        # Email addresses
-        if "@" in value and "." in value:
-            if re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", value):
-                return True
-
-        # IP addresses
-        if re.match(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$", value):  # IPv4
-            return True
-        if ":" in value and re.match(r"^[0-9a-f:]+$", value_lower):  # IPv6
-            if value_lower.count(":") >= 2:
-                return True
-
-        # Ports in URLs/addresses
-        if re.match(r"^\d{1,5}$", value) and int(value) <= 65535:
-            return True
-
-        # ============ CONTAINER & IMAGE IDENTIFIERS ============
-
-        # Docker image names (repo/name:tag)
-        if re.match(r"^[a-z0-9\-._/]+:[a-z0-9\-._]+$", value_lower):
-            return True
-        if re.match(r"^[a-z0-9\-._/]+@sha256:[a-f0-9]{64}$", value_lower):
-            return True
-
-        # Container registry hosts
-        if "docker.io" in value_lower or "gcr.io" in value_lower:
-            return True
-        if "azurecr.io" in value_lower or "ecr.aws" in value_lower:
-            return True
-
-        # ============ PACKAGE & MODULE REFERENCES ============
-
-        # Go imports
-        if "github.com/" in value_lower or "gitlab.com/" in value_lower:
-            return True
-
-        # Python packages
-        if "pypi.org" in value_lower or "python.org" in value_lower:
-            return True
-
-        # Java packages
-        if re.match(r"^[a-z]+(\.[a-z0-9]+)+$", value_lower):
-            if "java" in line_lower or "package" in line_lower:
-                return True
-
-        # ============ FILE PATHS & DIRECTORIES ============
-
-        # File paths
-        if "/" in value or "\\" in value:
-            if any(
-                ext in value.lower()
-                for ext in [".tf", ".yaml", ".yml", ".json", ".xml", ".py", ".js", ".go"]
-            ):
-                return True
+        return IntelligentDetector.exclusion(value, line) is not None
 
-        # Kubernetes paths
-        if value.startswith("/var/run/secrets") or value.startswith("/etc/"):
-            return True
-
-        # ============ VERSION & BUILD INFO ============
-
-        # Semantic versions (1.2.3)
-        if re.match(r"^\d+\.\d+(\.\d+)?(\-[a-z0-9]+)?$", value_lower):
-            return True
-
-        # Build numbers and dates
-        if re.match(r"^\d{4}-\d{2}-\d{2}", value):  # Dates
-            return True
-        if re.match(r"^\d{10,}$", value):  # Unix timestamps
-            return True
-
-        # Commit SHAs in git refs
-        if "commit" in line_lower and re.match(r"^[0-9a-f]{7,}$", value_lower):
-            return True
-
-        # ============ NAMING PATTERNS ============
-
-        # Hyphenated naming (word-word-word, word-word-123) - only if ALL lowercase and short
-        if re.match(r"^[a-z0-9]+(-[a-z0-9]+)*(-\d+)?$", value_lower) and value == value_lower:
-            # Only exclude if it looks like a resource name, not a secret
-            if len(value) < 24:  # Resource names are typically shorter
-                return True
-
-        # Camel case naming
-        if re.match(r"^[A-Z][a-z]+([A-Z][a-z]+)*$", value):
-            return True
-
-        # ============ CONTEXT-BASED EXCLUSIONS ============
-
-        # Exclude if has exclude keywords in context
-        for keyword in IntelligentDetector.EXCLUDE_KEYWORDS:
-            if keyword in line_lower:
-                return True
-
-        # Exclude if value is mostly digits (IDs, counts)
-        if len(value) > 5 and sum(c.isdigit() for c in value) / len(value) > 0.7:
-            return True
-
-        # ============ RESOURCE NAMING PATTERNS ============
-
-        # Common resource name patterns: env-region-number
-        if re.match(r"^[a-z]+-[a-z]+-\d+$", value_lower):
-            return True
-
-        # DNS-like patterns: subdomain.service.namespace
-        if re.match(r"^[a-z0-9]+\.[a-z0-9]+(\.[a-z0-9]+)*$", value_lower):
-            return True
-
-        return False
+    @staticmethod
+    def exclusion(value: str, line: str) -> Optional[str]:
+        """
+        Name of the rule that excludes value in line (an EXCLUSION_RULES rule,
+        or "Exclude keyword" for EXCLUDE_KEYWORDS in the line), or None.
+        """
+        keywords = IntelligentDetector.line_keywords(line)
+        if keywords.exclude:
+            return "Exclude keyword"
+        return IntelligentDetector._EXCLUSIONS.match(value, keywords.words)
 
     @staticmethod
     def calculate_confidence(value: str, line: str = "") -> float:
+        """Calculate confidence score (0.0 to 1.0) that value is a secret (see analyze)."""
+        return IntelligentDetector.analyze(value, line).confidence
+
+    @staticmethod
+    def analyze(value: str, line: str = "") -> Verdict:
         """
-        Calculate confidence score (0.0 to 1.0) that value is a secret.
+        Score value in line, evaluating every feature once.
 
-        Factors:
+        Confidence factors:
         - Entropy analysis: High entropy increases confidence
         - Format matching: Known secret formats increase confidence
         - Semantic analysis: Secret keywords in variable names increase confidence
         - Context analysis: Secret context keywords increase confidence
         - Exclusions: Legitimate identifiers decrease confidence to 0
         """
-        # Exclusion check: If excluded, confidence is 0
-        if IntelligentDetector.is_excluded(value, line):
-            return 0.0
-
-        confidence = 0.0
-
-        # 1. Format matching (high confidence)
-        is_known_format, format_name = IntelligentDetector.is_likely_secret_format(value)
-        if is_known_format:
-            return 0.95  # Known formats are very confident
-
-        # 2. Entropy analysis (moderate to high confidence)
-        if IntelligentDetector.is_high_entropy(value):
-            entropy = IntelligentDetector.calculate_entropy(value)
-            # Map entropy 3.5-5.7 to confidence 0.4-0.8
-            confidence += min(0.8, (entropy - 3.5) / 2.2 * 0.8)
-
-        # 3. Semantic analysis from variable name (moderate confidence)
-        var_indicator, indicator_boost = IntelligentDetector.extract_secret_indicator(line)
-        if indicator_boost > 0:
-            confidence += indicator_boost
+        return IntelligentDetector.verdict_from_features(
+            value,
+            IntelligentDetector.calculate_entropy(value),
+            character_variety(value),
+            IntelligentDetector._FORMATS.match(value) or "",
+            IntelligentDetector.exclusion(value, line) or "",
+            IntelligentDetector.line_keywords(line),
+        )
 
-        # 4. Context analysis (low to moderate confidence)
-        if line and IntelligentDetector.has_secret_context(line):
-            confidence += 0.15
-
-        # 5. Length analysis (longer strings more likely to be secrets)
-        if len(value) >= 32:
-            confidence += 0.1
-        elif len(value) >= 20:
-            confidence += 0.05
-
-        # 6. Value analysis (special characters, mix of types)
-        has_alpha = bool(re.search(r"[a-zA-Z]", value))
-        has_digit = bool(re.search(r"\d", value))
-        has_special = bool(re.search(r"[^a-zA-Z0-9]", value))
-        variety = sum([has_alpha, has_digit, has_special])
-
-        if variety == 3:
-            confidence += 0.1
-
-        # Cap confidence at 1.0
-        return min(1.0, confidence)
+    @staticmethod
+    def verdict_from_features(
+        value: str,
+        entropy: float,
+        variety: int,
+        format_name: str,
+        exclusion: str,
+        keywords: LineKeywords,
+    ) -> Verdict:
+        """
+        Combine the features of a value into its Verdict (analyze() computes them).
+        """
+        high_entropy = len(value) >= 12 and entropy >= 3.5 and variety >= 2
+        variable = keywords.variable if keywords.secret_variable else ""
+
+        if format_name:
+            method = f"Format: {format_name}"
+        elif high_entropy:
+            method = "High Entropy"
+        elif variable:
+            method = f"Semantic: {variable}"
+        elif keywords.context:
+            method = "Context Analysis"
+        else:
+            method = "Heuristic Analysis"
+
+        if exclusion:
+            confidence = 0.0
+        elif format_name:
+            confidence = 0.95  # Known formats are very confident
+        else:
+            confidence = 0.0
+            # 1. Entropy analysis: map entropy 3.5-5.7 to confidence 0.4-0.8
+            if high_entropy:
+                confidence += min(0.8, (entropy - 3.5) / 2.2 * 0.8)
+            # 2. Semantic analysis from variable name
+            if variable:
+                confidence += 0.3
+            # 3. Context analysis
+            if keywords.context:
+                confidence += 0.15
+            # 4. Length analysis (longer strings more likely to be secrets)
+            if len(value) >= 32:
+                confidence += 0.1
+            elif len(value) >= 20:
+                confidence += 0.05
+            # 5. Value analysis (mix of letters, digits and special characters)
+            if variety == 3:
+                confidence += 0.1
+            confidence = min(1.0, confidence)
+
+        return Verdict(
+            confidence, method, entropy, format_name, variable, keywords.context, exclusion
+        )
 
     @staticmethod
-    def detect_in_line(line: str, min_confidence: float = 0.5, context: str = "") -> List[Dict]:
+    def detect_in_line(
+        line: str, min_confidence: float = 0.5, context: str = "", candidates: Optional[str] = None
+    ) -> List[Dict]:
         """
         Detect potential secrets in a single line.
         Returns list of findings with confidence scores.
@@ -577,129 +642,308 @@ class IntelligentDetector:
             line: The line to scan
             min_confidence: Minimum confidence threshold
             context: Previous lines for variable name context (e.g., "variable db_password")
+            candidates: "assignments", "tokens" or "both" (default: IntelligentDetector.CANDIDATES)
+        """
+        reported = []
+        kept, full_line_context = IntelligentDetector.candidates_in_line(line, context, candidates)
+        for candidate in kept:
+            # Use context-aware confidence calculation
+            verdict = IntelligentDetector.verdict(candidate.value, full_line_context)
+            if verdict.confidence >= min_confidence:
+                reported.append((candidate, verdict))
+        return [
+            IntelligentDetector._line_finding(candidate, verdict)
+            for candidate, verdict in _outermost(reported)
+        ]
+
+    @staticmethod
+    def candidates_in_line(
+        line: str, context: str = "", candidates: Optional[str] = None
+    ) -> Tuple[List[Candidate], str]:
+        """
+        The candidates of a line worth scoring, and the context to score them in
+        (context followed by the line). detect_in_line scores them one by one;
+        detect_secrets scores a whole file's candidates in one batch.
         """
-        findings = []
+        mode = candidates or IntelligentDetector.CANDIDATES
+        full_line_context = context + " " + line if context else line
 
-        # Skip lines with Terraform/CloudFormation interpolations (naming patterns)
-        if "${" in line or "}" in line or "{%" in line:
-            return findings
+        # Lines without an assignment (or, when tokens are scanned, a long token)
+        if not has_candidates(line, mode):
+            return [], full_line_context
 
-        # Skip URLs, paths, and references
-        if any(
-            proto in line
-            for proto in ["http://", "https://", "ws://", "wss://", "file://", "ftp://"]
-        ):
-            return findings
+        # Skip comment lines with examples, URLs and paths (any "://" contains "//"),
+        # and Terraform/CloudFormation interpolations (naming patterns)
+        if "#" in line or "//" in line or "}" in line or "${" in line or "{%" in line:
+            return [], full_line_context
 
         # Skip Kubernetes resources and manifests
-        if "kind:" in line.lower() or "apiversion:" in line.lower():
-            return findings
-
-        # Skip common comment lines with examples
-        if "#" in line or "//" in line:
-            return findings
-
-        # Extract potential values from assignments
-        # Patterns: var = "value", var = value, var: "value", var: value
-        patterns = [
-            r'([a-zA-Z_][a-zA-Z0-9_\-]*)\s*[:=]\s*["\']([^"\']+)["\']',  # Quoted
-            r"([a-zA-Z_][a-zA-Z0-9_\-]*)\s*[:=]\s*([A-Za-z0-9\-_.+/]+)",  # Unquoted
-        ]
+        if ":" in line:
+            lowered = line.lower()
+            if "kind:" in lowered or "apiversion:" in lowered:
+                return [], full_line_context
 
-        for pattern in patterns:
-            for match in re.finditer(pattern, line):
-                var_name = match.group(1)
-                value = match.group(2)
-
-                # Skip very short values
-                if len(value) < 8:
-                    continue
-
-                # Skip common non-secrets
-                if value in ["true", "false", "null", "none", "yes", "no"]:
-                    continue
-
-                # Skip if value contains variable references or interpolations
-                if "var." in value or "local." in value or "data." in value:
-                    continue
-
-                # Use context-aware confidence calculation
-                full_line_context = context + " " + line if context else line
-                confidence = IntelligentDetector.calculate_confidence(value, full_line_context)
-
-                if confidence >= min_confidence:
-                    findings.append(
-                        {
-                            "value": value,
-                            "variable": var_name,
-                            "confidence": confidence,
-                            "detection_method": IntelligentDetector._get_detection_method(
-                                value, full_line_context
-                            ),
-                        }
-                    )
+        # Patterns: var = "value", var = value, var: "value", var: value,
+        # and with tokens, high-entropy runs anywhere in the line
+        kept = []
+        for candidate in line_candidates(line, mode, IntelligentDetector._FORMATS.match):
+            value = candidate.value
 
-        return findings
+            # Skip very short values
+            if len(value) < 8:
+                continue
 
-    @staticmethod
-    def _get_detection_method(value: str, line: str) -> str:
-        """Determine which detection method identified the secret."""
-        is_known, fmt = IntelligentDetector.is_likely_secret_format(value)
-        if is_known:
-            return f"Format: {fmt}"
+            # Skip common non-secrets
+            if value in ["true", "false", "null", "none", "yes", "no"]:
+                continue
 
-        if IntelligentDetector.is_high_entropy(value):
-            return "High Entropy"
+            # Skip if value contains variable references or interpolations
+            if "var." in value or "local." in value or "data." in value:
+                continue
 
-        var_name, boost = IntelligentDetector.extract_secret_indicator(line)
-        if boost > 0:
-            return f"Semantic: {var_name}"
+            kept.append(candidate)
+        return kept, full_line_context
 
-        if IntelligentDetector.has_secret_context(line):
-            return "Context Analysis"
+    @staticmethod
+    def _line_finding(candidate: Candidate, verdict: Verdict) -> Dict:
+        return {
+            "value": candidate.value,
+            "variable": candidate.variable,
+            "column": candidate.column,
+            "confidence": verdict.confidence,
+            "detection_method": verdict.method,
+        }
 
-        return "Heuristic Analysis"
+    @staticmethod
+    def verdict(value: str, line: str = "") -> Verdict:
+        """
+        analyze(value, line), remembered in VERDICTS. Only a few features of the
+        line affect a verdict, so it is remembered for the value together with
+        those features (see context_signature).
+        """
+        key = (value, _context_signature(line))
+        verdict = IntelligentDetector.VERDICTS.get(key)
+        if verdict is None:
+            verdict = IntelligentDetector.analyze(value, line)
+            IntelligentDetector.VERDICTS.put(key, verdict)
+        return verdict
 
+    @staticmethod
+    def verdicts(values: Sequence[str], lines: Sequence[str]) -> List[Verdict]:
+        """verdict() for many candidates; those not remembered are scored in batches."""
+        results: List[Verdict] = []
+        # Chunks small enough that each line's keywords stay memoized from the
+        # signature to the scoring
+        for start in range(0, len(values), _VERDICT_CHUNK):
+            end = start + _VERDICT_CHUNK
+            results.extend(_verdict_chunk(values[start:end], lines[start:end]))
+        return results
+
+    @staticmethod
+    def context_signature(line: str) -> tuple:
+        """
+        The features of a line that analyze reads: the same value in two lines
+        with the same signature gets the same verdict.
+        """
+        return _context_signature(line)
 
-def detect_secrets(text: str, min_confidence: float = 0.5) -> List[Dict]:
+    @staticmethod
+    def _get_detection_method(value: str, line: str) -> str:
+        """Determine which detection method identified the secret."""
+        return IntelligentDetector.analyze(value, line).method
+
+
+@functools.lru_cache(maxsize=1024)
+def _line_keywords(line: str) -> LineKeywords:
+    automaton = IntelligentDetector._KEYWORDS
+    found = automaton.scan(line.lower())
+
+    # Look for assignment patterns: var = value, var: value, etc.
+    match = IntelligentDetector._ASSIGNMENT.search(line)
+    variable = match.group(1).lower() if match else ""
+    secret_variable = bool(variable) and bool(automaton.scan(variable) & SECRET_KEYWORD)
+    return LineKeywords(
+        variable,
+        secret_variable,
+        bool(found & CONTEXT_KEYWORD),
+        bool(found & EXCLUDE_KEYWORD),
+        found & ~(LINE_WORDS - 1),
+    )
+
+
+# Candidates scored per batch by IntelligentDetector.verdicts (below the 1024
+# lines _line_keywords remembers)
+_VERDICT_CHUNK = 512
+
+
+def _verdict_chunk(values: Sequence[str], lines: Sequence[str]) -> List[Verdict]:
+    memo = IntelligentDetector.VERDICTS
+    keys = [(value, _context_signature(line)) for value, line in zip(values, lines)]
+    results = memo.get_many(keys)
+
+    # Score each missing key once, however often it occurs in the chunk
+    missing: Dict[tuple, Any] = {}
+    for index, verdict in enumerate(results):
+        if verdict is None:
+            missing.setdefault(keys[index], index)
+    for index in list(missing.values()):
+        verdict = IntelligentDetector.analyze(values[index], lines[index])
+        memo.put(keys[index], verdict)
+        missing[keys[index]] = verdict
+
+    return [missing[keys[i]] if verdict is None else verdict for i, verdict in enumerate(results)]
+
+
+def character_variety(value: str) -> int:
+    """How many of letters, digits and other characters value contains (0 to 3)."""
+    return (
+        (_ALPHA.search(value) is not None)
+        + (_DIGIT.search(value) is not None)
+        + (_SPECIAL.search(value) is not None)
+    )
+
+
+_ALPHA = re.compile(r"[a-zA-Z]")
+_DIGIT = re.compile(r"\d")
+_SPECIAL = re.compile(r"[^a-zA-Z0-9]")
+
+
+@functools.lru_cache(maxsize=1024)
+def _context_signature(line: str) -> tuple:
+    keywords = IntelligentDetector.line_keywords(line)
+    return (
+        bool(line),
+        # The variable only shows up in the verdict if it names a secret
+        keywords.variable if keywords.secret_variable else None,
+        keywords.context,
+        keywords.exclude,
+        keywords.words,
+    )
+
+
+def detect_secrets(text: Union[str, Sequence[str]], min_confidence: float = 0.5) -> List[Finding]:
     """
     Detect secrets in text using intelligent analysis.
 
     Args:
-        text: Content to scan
+        text: Content to scan (raw text, or lines that were already split)
         min_confidence: Minimum confidence threshold (0.0-1.0)
 
     Returns:
-        List of detected secrets with confidence scores
+        List of detected secrets with confidence scores (the same as detect_secrets_iter)
     """
+    lines = text.splitlines() if isinstance(text, str) else text
+
+    # Collect the candidates of every line first, so they are scored in one batch
+    pending = []
+    previous: Deque[str] = deque(maxlen=3)
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if line.strip() and not line.strip().startswith("#"):
+            context = " ".join([*reversed(previous), line])
+            kept, full_line_context = IntelligentDetector.candidates_in_line(line, context)
+            pending.extend((line_no, line, candidate, full_line_context) for candidate in kept)
+        previous.append(line)
+
+    verdicts = IntelligentDetector.verdicts(
+        [candidate.value for _, _, candidate, _ in pending],
+        [full_line_context for _, _, _, full_line_context in pending],
+    )
+    reported = [
+        (line_no, line, candidate, verdict)
+        for (line_no, line, candidate, _), verdict in zip(pending, verdicts)
+        if verdict.confidence >= min_confidence
+    ]
     findings = []
-    lines = text.splitlines()
+    for _, on_line in groupby(reported, key=lambda item: item[0]):
+        findings.extend(_file_findings(list(on_line)))
+    return findings
+
 
+def detect_secrets_iter(lines: Iterable[str], min_confidence: float = 0.5) -> Iterator[Finding]:
+    """
+    Detect secrets line by line, yielding each finding as soon as its line is read.
+    Only the 3 lines of lookback context are kept, so memory stays bounded however
+    long the input is.
+
+    Args:
+        lines: Any iterable of lines (a list, a file object, a generator);
+               trailing line endings are ignored
+        min_confidence: Minimum confidence threshold (0.0-1.0)
+    """
+    previous: Deque[str] = deque(maxlen=3)
     for line_no, line in enumerate(lines, 1):
-        # Skip empty lines and comments
-        if not line.strip() or line.strip().startswith("#"):
-            continue
-
-        # Build context from previous lines (look back 3 lines for variable declarations)
-        context = line
-        for i in range(max(0, line_no - 4), line_no - 1):
-            if i < len(lines):
-                context = lines[i] + " " + context
-
-        line_findings = IntelligentDetector.detect_in_line(line, min_confidence, context)
-
-        for finding in line_findings:
-            findings.append(
-                {
-                    "file": "",  # Will be set by scanner
-                    "line": line_no,
-                    "snippet": line[:200],
-                    "matched_value": finding["value"],
-                    "variable": finding["variable"],
-                    "confidence": finding["confidence"],
-                    "detection_method": finding["detection_method"],
-                    "pattern": f"Intelligent Detection: {finding['detection_method']}",
-                }
-            )
+        line = line.rstrip("\r\n")
+        # Look back 3 lines for variable declarations
+        yield from detect_secrets_in_line(line, line_no, previous, min_confidence)
+        previous.append(line)
+
+
+def detect_secrets_in_line(
+    line: str, line_no: int, previous: Sequence[str], min_confidence: float = 0.5
+) -> List[Finding]:
+    """
+    Detect secrets in one line of a file.
+
+    Args:
+        line: The line to scan
+        line_no: 1-based line number reported in findings
+        previous: Up to 3 lines preceding this one, oldest first (used as context)
+        min_confidence: Minimum confidence threshold (0.0-1.0)
+    """
+    findings = []
+
+    # Skip empty lines and comments
+    if not line.strip() or line.strip().startswith("#"):
+        return findings
+
+    # Build context from previous lines, nearest line first
+    context = " ".join([*reversed(previous), line])
+
+    kept, full_line_context = IntelligentDetector.candidates_in_line(line, context)
+    reported = []
+    for candidate in kept:
+        verdict = IntelligentDetector.verdict(candidate.value, full_line_context)
+        if verdict.confidence >= min_confidence:
+            reported.append((candidate, verdict))
+    for candidate, verdict in _outermost(reported):
+        findings.append(_file_finding(candidate, verdict, line_no, line))
 
     return findings
+
+
+def _outermost(reported: List[Tuple[Candidate, Verdict]]) -> List[Tuple[Candidate, Verdict]]:
+    """
+    Drop reported candidates whose value lies inside another reported value on the
+    same line (api_key=VALUE quoted in a value is one secret, not two). A nested
+    candidate whose enclosing value was not reported is kept.
+    """
+    if len(reported) < 2:
+        return reported
+    spans = [(c.column, c.column + len(c.value)) for c, _ in reported]
+    return [
+        pair
+        for pair, (start, end) in zip(reported, spans)
+        if not any(s <= start and end <= e and (s, e) != (start, end) for s, e in spans)
+    ]
+
+
+def _file_findings(reported: List[Tuple[int, str, Candidate, Verdict]]) -> List[Finding]:
+    """Findings for the reported candidates of one line of a file."""
+    line_no, line = reported[0][:2]
+    pairs = _outermost([(candidate, verdict) for _, _, candidate, verdict in reported])
+    return [_file_finding(candidate, verdict, line_no, line) for candidate, verdict in pairs]
+
+
+def _file_finding(candidate: Candidate, verdict: Verdict, line_no: int, line: str) -> Finding:
+    """A finding as reported for a line of a file ('file' is set by the scanner)."""
+    return Finding(
+        "",
+        line_no,
+        line,
+        candidate.value,
+        candidate.variable,
+        verdict.confidence,
+        verdict.method,
+        column=candidate.column,
+    )
@@ -0,0 +1,176 @@
+"""
+Candidate lexer for the line detector.
+Splits a line into the (variable, value) pairs the detector scores. One
+compiled pattern finds every assignment operator in a single left-to-right
+pass, and the value after it is read as either a quoted string or a bare
+token, so each assignment yields exactly one candidate.
+
+Values that are not assigned to anything (items of a JSON array, CLI
+arguments, heredoc lines) are found by the token scanner instead: a window
+slides over every long token with a running character histogram, and the
+stretches where the window's entropy stays high become candidates.
+"""
+
+import math
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Where candidates come from
+ASSIGNMENTS = "assignments"
+TOKENS = "tokens"
+BOTH = "both"
+CANDIDATE_MODES = (ASSIGNMENTS, TOKENS, BOTH)
+
+# Characters per entropy window; tokens shorter than this are not scanned
+TOKEN_WINDOW = 20
+
+# Bits per character a window needs to count as random. Random base62/base64
+# windows of 20 characters average about 4.0 bits; words and identifiers mostly
+# stay below 3.7.
+TOKEN_MIN_ENTROPY = 3.7
+
+# name = / name: followed by the start of a quoted or bare value. The value is
+# read in a lookahead, so an assignment inside a quoted value ("user:pass") is
+# still found by the same pass.
+_ASSIGNMENT = re.compile(
+    r"""([a-zA-Z_][a-zA-Z0-9_\-]*)\s*[:=]\s*(?=["']([^"']+)["']|([A-Za-z0-9\-_.+/]+))"""
+)
+
+# Base64/base62/hex-like runs, with optional base64 padding
+_TOKEN = re.compile(r"[A-Za-z0-9+/_\-]{%d,}={0,2}" % TOKEN_WINDOW)
+
+# c * log2(c) for every count a window can hold
+_PLOGP = [0.0] + [c * math.log2(c) for c in range(1, TOKEN_WINDOW + 1)]
+
+
+class Candidate(NamedTuple):
+    """A value on a line for the detector to score."""
+
+    variable: str  # "" for tokens found outside an assignment
+    value: str
+    quoted: bool
+    column: int  # 0-based offset of the value in the line
+
+
+def has_operator(line: str) -> bool:
+    """Whether line contains an assignment operator at all (the cheap prefilter)."""
+    return "=" in line or ":" in line
+
+
+def has_candidates(line: str, mode: str = ASSIGNMENTS) -> bool:
+    """Whether line can yield any candidate: an operator, or a long token if tokens are scanned."""
+    if mode != TOKENS and has_operator(line):
+        return True
+    return mode != ASSIGNMENTS and _TOKEN.search(line) is not None
+
+
+def assignment_candidates(line: str) -> List[Candidate]:
+    """
+    Every variable = value / variable: value pair in line, in column order.
+    Quoted values run to the next quote; bare values are runs of
+    [A-Za-z0-9-_.+/].
+    """
+    if not has_operator(line):
+        return []
+    candidates = []
+    for match in _ASSIGNMENT.finditer(line):
+        quoted = match.group(2)
+        if quoted is not None:
+            candidates.append(Candidate(match.group(1), quoted, True, match.start(2)))
+        else:
+            candidates.append(Candidate(match.group(1), match.group(3), False, match.start(3)))
+    return candidates
+
+
+def high_entropy_spans(
+    text: str, window: int = TOKEN_WINDOW, min_entropy: float = TOKEN_MIN_ENTROPY
+) -> List[Tuple[int, int]]:
+    """
+    (start, end) spans of text covered by windows of `window` characters whose
+    Shannon entropy is at least min_entropy. Overlapping and adjacent windows
+    are merged, so a span can be any length. Runs in O(len(text)): each step
+    moves one character out of the histogram and one in.
+    """
+    if len(text) < window:
+        return []
+    if window < len(_PLOGP):
+        plogp = _PLOGP
+    else:
+        plogp = [0.0] + [c * math.log2(c) for c in range(1, window + 1)]
+    # entropy = log2(window) - sum(c * log2(c)) / window, so comparing the sum
+    # against a fixed limit avoids a log per step
+    limit = (math.log2(window) - min_entropy) * window + 1e-9
+
+    counts: Dict[str, int] = {}
+    total = 0.0
+    for char in text[:window]:
+        count = counts.get(char, 0)
+        total += plogp[count + 1] - plogp[count]
+        counts[char] = count + 1
+
+    spans = []
+    start = end = -1
+    for i in range(len(text) - window + 1):
+        if i:
+            leaving = text[i - 1]
+            count = counts[leaving]
+            total += plogp[count - 1] - plogp[count]
+            counts[leaving] = count - 1
+            entering = text[i + window - 1]
+            count = counts.get(entering, 0)
+            total += plogp[count + 1] - plogp[count]
+            counts[entering] = count + 1
+        if total <= limit:
+            if i > end:
+                if end >= 0:
+                    spans.append((start, end))
+                start = i
+            end = i + window
+    if end >= 0:
+        spans.append((start, end))
+    return spans
+
+
+def token_candidates(line: str, known: Optional[Callable[[str], object]] = None) -> List[Candidate]:
+    """
+    High-entropy stretches of the long tokens in line, whatever surrounds them.
+    A whole token that known accepts (e.g. a match for a known secret format) is
+    a candidate too, since structured keys such as AKIA... are often not random
+    enough to pass the entropy test and would only be offered in pieces.
+    """
+    candidates = []
+    for match in _TOKEN.finditer(line):
+        token = match.group()
+        whole = known is not None and bool(known(token))
+        if whole:
+            candidates.append(Candidate("", token, False, match.start()))
+        for start, end in high_entropy_spans(token):
+            if not (whole and end - start == len(token)):
+                candidates.append(Candidate("", token[start:end], False, match.start() + start))
+    return candidates
+
+
+def line_candidates(
+    line: str, mode: str = ASSIGNMENTS, known: Optional[Callable[[str], object]] = None
+) -> List[Candidate]:
+    """
+    The candidates of line for a mode (ASSIGNMENTS, TOKENS or BOTH), in column
+    order. With BOTH, tokens inside an assigned value are left to the assignment.
+    known is passed on to token_candidates.
+    """
+    if mode == ASSIGNMENTS:
+        return assignment_candidates(line)
+    if mode == TOKENS:
+        return token_candidates(line, known)
+    if mode != BOTH:
+        raise ValueError(f"unknown candidate mode {mode!r}")
+    assignments = assignment_candidates(line)
+    taken = [(c.column, c.column + len(c.value)) for c in assignments]
+    tokens = [
+        token
+        for token in token_candidates(line, known)
+        if not any(
+            token.column < end and start < token.column + len(token.value) for start, end in taken
+        )
+    ]
+    return sorted(assignments + tokens, key=lambda candidate: candidate.column)
@@ -0,0 +1,364 @@
+"""
+Compiled matching engines for the detector's rule tables.
+Each engine is built once from a plain, declarative list of rules, so the lists
+in IntelligentDetector stay easy to read and extend while every candidate is
+checked in a single pass instead of one rule at a time.
+"""
+
+import re
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern
+from typing import Sequence, Tuple
+
+# Characters with a special meaning at the top level of a regular expression
+_REGEX_SPECIAL = set(".^$*+?{}[]|()")
+
+# Quantifiers that make the literal before them optional or repeated
+_QUANTIFIERS = set("*?{")
+
+# Kinds of exclusion rules, in the order ExclusionMatcher evaluates them
+LINE = "line"  # the lowercased line contains text
+PREFIX = "prefix"  # the lowercased value starts with text
+CASE_PREFIX = "case_prefix"  # the value itself starts with text
+CONTAINS = "contains"  # the lowercased value contains text
+MATCH = "match"  # the regex text matches at the start of the value
+MATCH_LOWER = "match_lower"  # the regex text matches at the start of the lowercased value
+CHECK = "check"  # check(value) is true
+EXCLUSION_KINDS = (LINE, PREFIX, CASE_PREFIX, CONTAINS, MATCH, MATCH_LOWER, CHECK)
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    The literal text every match of an anchored pattern starts with, e.g.
+    "AKIA" for ^AKIA[0-9A-Z]{16}$ and "ya29." for ^ya29\\.[...]. Returns ""
+    when the pattern starts with a class, group or escape sequence.
+    """
+    if _has_top_level_alternation(pattern):
+        return ""
+    prefix = []
+    i = 1 if pattern.startswith("^") else 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break  # \d, \s, \b ... are not literals
+            literal, width = pattern[i + 1], 2
+        elif char in _REGEX_SPECIAL:
+            if char in _QUANTIFIERS or char == "+":
+                # The quantifier applies to the last literal, which may not appear as-is
+                if prefix:
+                    prefix.pop()
+            break
+        else:
+            literal, width = char, 1
+        following = pattern[i + width] if i + width < len(pattern) else ""
+        if following in _QUANTIFIERS:
+            break
+        prefix.append(literal)
+        i += width
+    return "".join(prefix)
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+class FormatMatcher:
+    """
+    Matches a value against a list of (anchored regex, format name) rules in one pass.
+
+    Rules are grouped by the first character of their literal prefix ("A" for
+    AKIA/ASIA/AIza, "s" for sk-/sk_live_, ...). Each group is compiled into a
+    single alternation of named groups, so a value is tested once, against only
+    the rules that could match its first character. Rules without a literal
+    prefix are part of every group. When several rules match, the earliest one
+    in the list wins, exactly as when the rules are tried one by one.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, str]]):
+        self.rules = list(rules)
+        self.names: Dict[str, str] = {}
+        by_char: Dict[str, List[int]] = {}
+        anywhere: List[int] = []
+        for index, (pattern, name) in enumerate(self.rules):
+            self.names[f"f{index}"] = name
+            prefix = literal_prefix(pattern)
+            if prefix:
+                by_char.setdefault(prefix[0], []).append(index)
+            else:
+                anywhere.append(index)
+
+        self._dispatch: Dict[str, Pattern] = {
+            char: self._compile(sorted(indexes + anywhere)) for char, indexes in by_char.items()
+        }
+        self._fallback: Optional[Pattern] = self._compile(anywhere) if anywhere else None
+
+    def _compile(self, indexes: List[int]) -> Pattern:
+        alternatives = []
+        for index in indexes:
+            pattern = self.rules[index][0]
+            if pattern.startswith("^"):
+                pattern = pattern[1:]
+            alternatives.append(f"(?P<f{index}>{pattern})")
+        return re.compile("|".join(alternatives))
+
+    def match(self, value: str) -> Optional[str]:
+        """Return the name of the first format value matches, or None."""
+        if not value:
+            return None
+        regex = self._dispatch.get(value[0], self._fallback)
+        if regex is None:
+            return None
+        found = regex.match(value)
+        if found is None:
+            return None
+        # The rule's own group closes last, so it is the match's lastgroup
+        return self.names[found.lastgroup]
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over several classes of keywords.
+
+    scan() walks a text once and returns the bitwise OR of the classes of every
+    keyword that occurs in it as a substring, however many keywords there are.
+    Transitions are resolved through failure links the first time they are
+    taken and then remembered, so the automaton stays small but scanning does
+    one dict lookup per character.
+    """
+
+    def __init__(self, classes: Dict[int, Iterable[str]]):
+        """classes maps a bit (1, 2, 4, ...) to the keywords of that class."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[int] = [0]
+        self.all_classes = 0
+        for bit, keywords in classes.items():
+            self.all_classes |= bit
+            for keyword in keywords:
+                self._add(keyword, bit)
+        self._fail = self._link()
+        # No keyword spans a character outside this set, so the text can be cut
+        # there and each distinct run scanned once
+        alphabet = sorted({char for edges in self._goto for char in edges})
+        self._runs = re.compile("[" + "".join(re.escape(char) for char in alphabet) + "]+")
+        # Resolved transitions per state, filled in as scan() takes them
+        self._delta: List[Dict[str, int]] = [dict(edges) for edges in self._goto]
+
+    def _add(self, keyword: str, bit: int):
+        state = 0
+        for char in keyword:
+            following = self._goto[state].get(char)
+            if following is None:
+                following = len(self._goto)
+                self._goto.append({})
+                self._out.append(0)
+                self._goto[state][char] = following
+            state = following
+        self._out[state] |= bit
+
+    def _link(self) -> List[int]:
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                back = fail[state]
+                while back and char not in self._goto[back]:
+                    back = fail[back]
+                target = self._goto[back].get(char, 0)
+                fail[following] = target if target != following else 0
+                # A state also ends every keyword its failure state ends
+                self._out[following] |= self._out[fail[following]]
+        return fail
+
+    def _resolve(self, state: int, char: str) -> int:
+        origin = state
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        target = self._goto[state].get(char, 0)
+        self._delta[origin][char] = target
+        return target
+
+    def scan(self, text: str) -> int:
+        """Return the OR of the classes of all keywords occurring in text."""
+        delta, out, resolve = self._delta, self._out, self._resolve
+        complete = self.all_classes
+        found = 0
+        for run in set(self._runs.findall(text)):
+            state = 0
+            for char in run:
+                following = delta[state].get(char)
+                state = resolve(state, char) if following is None else following
+                if out[state]:
+                    found |= out[state]
+            if found == complete:
+                break
+        return found
+
+
+class PrefixTrie:
+    """Finds which of many literal prefixes a text starts with, in one walk."""
+
+    def __init__(self, entries: Iterable[Tuple[str, object]] = ()):
+        self._root: Dict[str, dict] = {}
+        for prefix, payload in entries:
+            self.add(prefix, payload)
+
+    def add(self, prefix: str, payload: object):
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        # "" never labels an edge, so it holds the payloads of prefixes ending here
+        node.setdefault("", []).append(payload)
+
+    def matches(self, text: str) -> Iterator[object]:
+        """Payloads of every prefix text starts with, shortest prefix first."""
+        node = self._root
+        if "" in node:
+            yield from node[""]
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                return
+            if "" in node:
+                yield from node[""]
+
+
+class ExclusionRule(NamedTuple):
+    """One reason a value is a legitimate identifier rather than a secret."""
+
+    kind: str  # one of EXCLUSION_KINDS
+    text: str  # prefix, substring, regex or line word, depending on kind
+    name: str  # reported as the rule that fired
+    line: Tuple[str, ...] = ()  # if set, the rule only applies when the line contains one
+    check: Optional[Callable[[str], bool]] = None  # predicate of CHECK rules
+
+
+class ExclusionMatcher:
+    """
+    Evaluates a table of ExclusionRules for a value in one pass per kind,
+    cheapest kind first, and returns the name of the rule that fired.
+
+    Line words (of LINE rules and rule.line conditions) are looked up by the
+    caller's KeywordAutomaton, which scans each line once for every rule:
+    line_words gives it a class bit per word, and match() takes the bits found.
+    Literal prefixes share one PrefixTrie, substrings one regex search, and
+    the anchored patterns one alternation per case (rebuilt for each set of
+    line conditions that hold, so a rule whose condition fails never hides a
+    later rule). Only CHECK rules run one by one. Adding a rule therefore adds
+    a trie path or an alternative, not another pass over every candidate.
+    """
+
+    def __init__(self, rules: Sequence[ExclusionRule], first_bit: int = 1):
+        for rule in rules:
+            if rule.kind not in EXCLUSION_KINDS:
+                raise ValueError(f"unknown exclusion kind {rule.kind!r}")
+        self.rules = list(rules)
+
+        # A class bit for every line word
+        self._bits: Dict[str, int] = {}
+        for rule in self.rules:
+            for word in (rule.text,) if rule.kind == LINE else rule.line:
+                if word not in self._bits:
+                    self._bits[word] = first_bit << len(self._bits)
+        self.line_words: Dict[int, List[str]] = {bit: [word] for word, bit in self._bits.items()}
+        self._conditions = 0
+        for rule in self.rules:
+            for word in rule.line:
+                self._conditions |= self._bits[word]
+
+        self._line_rules = [(self._bits[r.text], r.name) for r in self.rules if r.kind == LINE]
+        self._trie = PrefixTrie(
+            (rule.text.lower(), rule) for rule in self.rules if rule.kind in (PREFIX, CASE_PREFIX)
+        )
+        self._names = {f"r{i}": rule.name for i, rule in enumerate(self.rules)}
+        self._checks = [rule for rule in self.rules if rule.kind == CHECK]
+        # CONTAINS regex, its texts' rule names, and MATCH and MATCH_LOWER regexes,
+        # for each set of line conditions that hold
+        self._regexes: Dict[int, tuple] = {}
+
+    def _applies(self, rule: ExclusionRule, words: int) -> bool:
+        return not rule.line or any(words & self._bits[word] for word in rule.line)
+
+    def _compile(self, alternatives: List[Tuple[int, str]]) -> Optional[Pattern]:
+        if not alternatives:
+            return None
+        return re.compile("|".join(f"(?P<r{index}>{pattern})" for index, pattern in alternatives))
+
+    def _regexes_for(self, words: int) -> Tuple[Optional[Pattern], ...]:
+        regexes = self._regexes.get(words)
+        if regexes is None:
+            applicable = [
+                (index, rule) for index, rule in enumerate(self.rules) if self._applies(rule, words)
+            ]
+            # Substrings are searched without groups, which lets the regex engine
+            # skip ahead on their first characters; the text found names the rule
+            substrings: Dict[str, str] = {}
+            for _, rule in applicable:
+                if rule.kind == CONTAINS:
+                    substrings.setdefault(rule.text.lower(), rule.name)
+            contains = None
+            if substrings:
+                contains = re.compile("|".join(re.escape(text) for text in substrings))
+            regexes = (
+                contains,
+                substrings,
+                self._compile([(i, rule.text) for i, rule in applicable if rule.kind == MATCH]),
+                self._compile(
+                    [(i, rule.text) for i, rule in applicable if rule.kind == MATCH_LOWER]
+                ),
+            )
+            self._regexes[words] = regexes
+        return regexes
+
+    def match(self, value: str, words: int = 0) -> Optional[str]:
+        """
+        Name of a rule excluding value, or None. words is the OR of the
+        line_words bits found in the value's (lowercased) line.
+        """
+        for bit, name in self._line_rules:
+            if words & bit:
+                return name
+
+        value_lower = value.lower()
+        for rule in self._trie.matches(value_lower):
+            if rule.kind == PREFIX or value.startswith(rule.text):
+                if self._applies(rule, words):
+                    return rule.name
+
+        # Only the rules whose line conditions hold are part of these
+        contains, substrings, match, match_lower = self._regexes_for(words & self._conditions)
+        if contains is not None:
+            found = contains.search(value_lower)
+            if found is not None:
+                return substrings[found.group()]
+        found = match.match(value) if match is not None else None
+        if found is None and match_lower is not None:
+            found = match_lower.match(value_lower)
+        if found is not None:
+            return self._names[found.lastgroup]
+
+        for rule in self._checks:
+            if self._applies(rule, words) and rule.check(value):
+                return rule.name
+        return None
@@ -0,0 +1,110 @@
+"""
+Bounded in-memory memo of candidate verdicts.
+The same values turn up again and again (shared settings, copy-pasted configs,
+one test token in hundreds of fixtures), so the detector remembers the verdict
+for a value in a given kind of context instead of analysing it every time.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Verdicts kept by default; each entry is a value plus a few small objects
+DEFAULT_SIZE = 65536
+
+# What is remembered for a key (an intelligent_detector.Verdict)
+Verdict = Tuple[Any, ...]
+
+
+def configured_size() -> int:
+    """$SHIELDCOMMIT_VERDICT_MEMO if it is a number (0 disables the memo), else DEFAULT_SIZE."""
+    try:
+        return max(0, int(os.environ["SHIELDCOMMIT_VERDICT_MEMO"]))
+    except (KeyError, ValueError):
+        return DEFAULT_SIZE
+
+
+class VerdictMemo:
+    """
+    Thread-safe map from a key to a verdict, evicting the least recently used
+    entry beyond maxsize. A maxsize of 0 disables the memo.
+    hits and misses count lookups, to help choose a size.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = configured_size() if maxsize is None else maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Verdict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Verdict]:
+        """Return the verdict remembered for key, or None."""
+        with self._lock:
+            verdict = self._entries.get(key)
+            if verdict is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return verdict
+
+    def get_many(self, keys: Sequence[Hashable]) -> List[Optional[Verdict]]:
+        """
+        get() for a batch of keys. A key missing from the memo counts as one
+        miss, however often it repeats in the batch: the caller scores it once.
+        """
+        verdicts: List[Optional[Verdict]] = []
+        missed = set()
+        with self._lock:
+            entries = self._entries
+            for key in keys:
+                verdict = entries.get(key)
+                if verdict is not None:
+                    entries.move_to_end(key)
+                    self.hits += 1
+                elif key in missed:
+                    self.hits += 1
+                else:
+                    missed.add(key)
+                    self.misses += 1
+                verdicts.append(verdict)
+        return verdicts
+
+    def put(self, key: Hashable, verdict: Verdict):
+        """Remember a verdict, evicting the least recently used ones over maxsize."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int):
+        """Change the size, evicting entries if it shrinks."""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget every verdict (e.g. after the rules changed) and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """hits, misses, entries and maxsize."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,163 @@
+"""
+Memory-mapped secret scanning for very large files.
+Walks lines straight from the mapping and decodes only lines that can hold a secret,
+so peak memory stays flat no matter how large the file is.
+"""
+
+import codecs
+import locale
+import mmap
+import os
+from collections import deque
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from .finding import Finding
+
+# Files at least this large are scanned through a memory mapping
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Pages behind the scan position are released in windows of this size
+_RELEASE_WINDOW = 16 * 1024 * 1024
+
+# When detection only looks at assignments, a line needs one of these to be a candidate
+_CANDIDATE_BYTES = (b"=", b":")
+_CANDIDATE_CHARS = ("=", ":")
+
+# Line boundaries str.splitlines() uses besides LF, as UTF-8 bytes; a block of the file
+# holding none of these can be split on LF alone
+_OTHER_BREAKS = (b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\xc2\x85", b"\xe2\x80")
+
+# Files are split into blocks of about this size, each ending on an LF
+_BLOCK = 1024 * 1024
+
+
+def should_use_mmap(path: Path) -> bool:
+    """
+    Whether a file should be scanned through a memory mapping: it must be large enough,
+    and the platform default encoding must be UTF-8 so both paths decode alike.
+    """
+    if codecs.lookup(locale.getpreferredencoding(False)).name != "utf-8":
+        return False
+    try:
+        return os.stat(path).st_size >= MMAP_THRESHOLD
+    except OSError:
+        return False
+
+
+def _advise(mm: mmap.mmap, advice_name: str, start: int = 0, length: int = 0):
+    """Give the kernel a paging hint, where the platform supports it."""
+    advice = getattr(mmap, advice_name, None)
+    if advice is None or not hasattr(mm, "madvise"):
+        return
+    try:
+        if length:
+            mm.madvise(advice, start, length)
+        else:
+            mm.madvise(advice)
+    except (OSError, ValueError):
+        pass
+
+
+def _decode(mm: mmap.mmap, start: int, end: int) -> str:
+    """Decode one line the way FileContent reads files."""
+    return mm[start:end].decode("utf-8", errors="ignore")
+
+
+def _lines(mm: mmap.mmap, size: int) -> Iterator[Tuple[int, int, Optional[str]]]:
+    """
+    Yield (start, end, text) for each line, split where FileContent.lines would split.
+
+    Blocks with only LF breaks are walked by offset and text is None, so the caller
+    decodes just the lines it needs. Any other block is decoded whole, with universal
+    newlines, and its lines all carry the block's offsets.
+    """
+    pos = 0
+    while pos < size:
+        newline = mm.find(b"\n", min(pos + _BLOCK, size))
+        block_end = size if newline < 0 else newline + 1
+        if any(mm.find(sep, pos, block_end) >= 0 for sep in _OTHER_BREAKS):
+            text = _decode(mm, pos, block_end).replace("\r\n", "\n").replace("\r", "\n")
+            for line in text.splitlines():
+                yield pos, block_end, line
+        else:
+            while pos < block_end:
+                newline = mm.find(b"\n", pos, block_end)
+                if newline >= 0:
+                    yield pos, newline, None
+                elif _decode(mm, pos, block_end):
+                    # Unterminated last line; it only counts if it decodes to something
+                    yield pos, block_end, None
+                pos = block_end if newline < 0 else newline + 1
+        pos = block_end
+
+
+def scan_file_mmap(path: Path, min_confidence: float = 0.5, hasher=None) -> List[Finding]:
+    """
+    Scan a file for secrets through a read-only memory mapping.
+    Returns the same findings as scan_file, with 'file' set.
+
+    Lines are split and decoded as FileContent does; when only assignments are checked,
+    only lines containing an assignment operator (and the up-to-3 lines before them,
+    for context) are decoded.
+    If a hashlib object is given it is fed the file bytes during the same walk.
+    """
+    return list(iter_file_mmap(path, min_confidence=min_confidence, hasher=hasher))
+
+
+def iter_file_mmap(path: Path, min_confidence: float = 0.5, hasher=None) -> Iterator[Finding]:
+    """Generator form of scan_file_mmap: yields each finding as the walk reaches it."""
+    from .intelligent_detector import IntelligentDetector, detect_secrets_in_line
+    from .lexer import ASSIGNMENTS
+
+    try:
+        with open(path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if size == 0:
+                return
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return
+
+    file_name = str(path)
+    try:
+        _advise(mm, "MADV_SEQUENTIAL")
+
+        # (start, end, text) of the 3 lines before the current one
+        previous = deque(maxlen=3)
+        released = 0
+        line_no = 0
+        assignments_only = IntelligentDetector.CANDIDATES == ASSIGNMENTS
+
+        for pos, end, text in _lines(mm, size):
+            line_no += 1
+
+            if not assignments_only:
+                # Tokens can be anywhere; the detector's own prefilter decides
+                candidate = True
+            elif text is None:
+                candidate = any(mm.find(op, pos, end) >= 0 for op in _CANDIDATE_BYTES)
+            else:
+                candidate = any(op in text for op in _CANDIDATE_CHARS)
+            if candidate:
+                line = _decode(mm, pos, end) if text is None else text
+                context = [_decode(mm, s, e) if t is None else t for s, e, t in previous]
+                for finding in detect_secrets_in_line(line, line_no, context, min_confidence):
+                    finding.file = file_name
+                    yield finding
+
+            previous.append((pos, end, text))
+
+            # Drop pages we will not revisit so resident memory does not grow
+            keep_from = previous[0][0]
+            if keep_from - released >= _RELEASE_WINDOW:
+                length = (keep_from - released) // mmap.PAGESIZE * mmap.PAGESIZE
+                if hasher is not None:
+                    hasher.update(mm[released : released + length])
+                _advise(mm, "MADV_DONTNEED", released, length)
+                released += length
+
+        if hasher is not None:
+            hasher.update(mm[released:size])
+    finally:
+        mm.close()
@@ -0,0 +1,286 @@
+"""
+Parallel multi-process scanning.
+Spreads files across a pool of worker processes, largest files first among
+those read ahead. Results are returned in the same order as a serial scan.
+"""
+
+import heapq
+import math
+import multiprocessing
+import os
+import signal
+import stat
+import time
+from multiprocessing import connection
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .scanner import open_cache, scan_one, summarize
+
+# Seconds a single file may take before its worker is killed
+DEFAULT_FILE_TIMEOUT = 60.0
+
+# How often the dispatcher wakes up to check worker deadlines
+_POLL_INTERVAL = 0.1
+
+# Files read ahead of the pool per worker, to pick the largest from
+_LOOKAHEAD = 64
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """
+    Read the container CPU quota (in CPUs) from cgroup v2 or v1.
+    Returns None when no quota is set.
+    """
+    # cgroup v2: "max 100000" or "200000 100000"
+    try:
+        fields = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if fields and fields[0] != "max":
+            return int(fields[0]) / int(fields[1])
+        if fields:
+            return None
+    except (OSError, ValueError, IndexError):
+        pass
+
+    # cgroup v1: quota of -1 means unlimited
+    try:
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def default_jobs() -> int:
+    """
+    Pick a worker count for this machine.
+    Honours CPU affinity and container CPU quotas, not just the host core count.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+
+    return max(1, cpus)
+
+
+def _worker_main(
+    tasks,
+    results,
+    min_confidence: float,
+    max_file_size: Optional[int],
+    cache_dir: Optional[str],
+    candidates: str,
+):
+    """
+    Worker process entry point.
+    Loads the detectors and opens the cache once, then scans (index, path) tasks
+    until it gets None, sending each (index, result) back over its own pipe.
+    """
+    # Ctrl-C is handled by the parent, which terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from .intelligent_detector import IntelligentDetector
+
+    # Spawned workers do not inherit the parent's class attributes
+    IntelligentDetector.set_candidates(candidates)
+    # Warm up the regex cache so the first real file does not pay for it
+    IntelligentDetector.calculate_confidence("warmup-value-1234", 'key = "warmup"')
+    cache = open_cache(cache_dir, min_confidence)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        index, path = task
+        result = scan_one(Path(path), min_confidence, max_file_size, cache=cache)
+        results.send((index, result))
+
+
+class _Worker:
+    """
+    A worker process plus the task it is currently running.
+    Its task queue and result pipe are its own, so killing it can only break
+    channels that are thrown away with it.
+    """
+
+    def __init__(self, ctx, options: tuple):
+        self.tasks = ctx.SimpleQueue()
+        self.results, sender = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=_worker_main, args=(self.tasks, sender) + options)
+        self.process.daemon = True
+        self.process.start()
+        # Only the worker writes; without this copy closed, a dead worker is never EOF
+        sender.close()
+        self.index = None
+        self.path = None
+        self.deadline = None
+
+    def assign(self, index: int, path: str, timeout: Optional[float]):
+        self.index = index
+        self.path = path
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.tasks.put((index, path))
+
+    def release(self):
+        self.index = None
+        self.path = None
+        self.deadline = None
+
+    def receive(self) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """The finished (index, result), or None if the worker died without sending it."""
+        try:
+            return self.results.recv()
+        except (EOFError, OSError):
+            return None
+
+    def stop(self):
+        self.tasks.put(None)
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(1)
+        self.results.close()
+
+
+def scan_files_parallel(
+    paths: Iterable,
+    jobs: int = 0,
+    min_confidence: float = 0.5,
+    file_timeout: Optional[float] = DEFAULT_FILE_TIMEOUT,
+    max_file_size: Optional[int] = None,
+    cache_dir=None,
+) -> Dict[str, Any]:
+    """
+    Scan files using a pool of worker processes.
+
+    Args:
+        paths: Files to scan (non-files are ignored, as in a serial scan); any
+            iterable, consumed as the pool needs more work
+        jobs: Number of worker processes (0 = pick from available CPUs)
+        min_confidence: Minimum confidence threshold for secrets
+        file_timeout: Seconds before a worker stuck on one file is killed (None or 0 = no limit)
+        max_file_size: Files larger than this many bytes are skipped (None = no cap)
+        cache_dir: Result cache directory shared by all workers (None = no cache)
+
+    Returns the same dict as a serial scan_files, in serial-scan order, plus
+    'timed_out' (files abandoned by the watchdog) and 'interrupted' (Ctrl-C).
+    """
+    jobs = jobs or default_jobs()
+    remaining = iter(paths)
+    read = 0
+
+    # Up to _LOOKAHEAD files per worker are read ahead of the pool and handed
+    # out largest first, so one huge file does not hold up the tail of the run
+    # and the paths are never all held at once
+    pending: List[Tuple[int, int, str]] = []
+    exhausted = False
+
+    def _refill():
+        nonlocal read, exhausted
+        while not exhausted and len(pending) < jobs * _LOOKAHEAD:
+            path = next(remaining, None)
+            if path is None:
+                exhausted = True
+                break
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            heapq.heappush(pending, (-st.st_size, read, str(path)))
+            read += 1
+
+    done: Dict[int, Dict[str, Any]] = {}
+    timed_out: List[Tuple[int, str]] = []
+    interrupted = False
+
+    ctx = multiprocessing.get_context()
+    workers: List[_Worker] = []
+    from .intelligent_detector import IntelligentDetector
+
+    options = (
+        min_confidence,
+        max_file_size,
+        str(cache_dir) if cache_dir else None,
+        IntelligentDetector.CANDIDATES,
+    )
+
+    def _dispatch(worker: _Worker):
+        _refill()
+        if pending:
+            _, index, path = heapq.heappop(pending)
+            worker.assign(index, path, file_timeout)
+        else:
+            worker.release()
+
+    def _abandon(i: int, worker: _Worker):
+        timed_out.append((worker.index, worker.path))
+        worker.kill()
+        workers[i] = _Worker(ctx, options)
+        _dispatch(workers[i])
+
+    try:
+        _refill()
+        while pending and len(workers) < jobs:
+            worker = _Worker(ctx, options)
+            workers.append(worker)
+            _dispatch(worker)
+
+        while any(w.index is not None for w in workers):
+            busy = {w.results: w for w in workers if w.index is not None}
+            for ready in connection.wait(list(busy), timeout=_POLL_INTERVAL):
+                worker = busy[ready]
+                received = worker.receive()
+                if received is None:
+                    # Died mid-file; the watchdog below replaces it
+                    continue
+                index, result = received
+                done[index] = result
+                _dispatch(worker)
+
+            # Watchdog: replace workers that overran their deadline or died
+            now = time.monotonic()
+            for i, worker in enumerate(workers):
+                if worker.index is None:
+                    continue
+                expired = worker.deadline is not None and now > worker.deadline
+                if expired or not worker.process.is_alive():
+                    if worker.results.poll():
+                        received = worker.receive()
+                        if received is not None:
+                            # Finished just as the watchdog fired; keep the result
+                            done[received[0]] = received[1]
+                            _dispatch(worker)
+                            continue
+                    _abandon(i, worker)
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        for worker in workers:
+            if interrupted:
+                worker.kill()
+            else:
+                worker.stop()
+        for worker in workers:
+            worker.process.join(1)
+            worker.kill()
+
+    # Workers only add entries; evict once, from the parent, after they are gone
+    cache = open_cache(cache_dir, min_confidence)
+    if cache is not None and done:
+        cache.prune()
+
+    summary = summarize(done[index] for index in sorted(done))
+    summary["timed_out"] = [path for _, path in sorted(timed_out)]
+    summary["interrupted"] = interrupted
+    return summary
@@ -0,0 +1,138 @@
+"""
+Asynchronous scan pipeline for slow filesystems.
+Concurrent readers (asyncio over a thread pool) load files into a bounded queue
+that a single detector stage consumes, so reads overlap with detection while
+a byte budget caps how much file content is held in memory at once.
+"""
+
+import asyncio
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .scanner import PendingScan, finish_one, load_one, open_cache, summarize
+
+# Number of files read concurrently
+DEFAULT_READERS = 8
+
+# Upper bound on file bytes that have been read but not yet scanned
+DEFAULT_MAX_BYTES_IN_FLIGHT = 64 * 1024 * 1024
+
+
+class ByteBudget:
+    """
+    Async counting limit on bytes in flight.
+    A request larger than the whole budget is let through once nothing else is
+    in flight, so one huge file cannot stall the pipeline.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self, size: int) -> int:
+        """Wait until size bytes fit, then charge them. Returns the amount charged."""
+        size = min(size, self.limit)
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.used + size <= self.limit)
+            self.used += size
+        return size
+
+    async def release(self, size: int):
+        async with self._changed:
+            self.used -= size
+            self._changed.notify_all()
+
+
+def _file_size(path: Path) -> Optional[int]:
+    """Size of a regular file, or None for anything else (directories, missing files)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size if stat.S_ISREG(st.st_mode) else None
+
+
+async def scan_files_async(
+    paths,
+    min_confidence: float = 0.5,
+    max_file_size: Optional[int] = None,
+    cache_dir=None,
+    readers: int = DEFAULT_READERS,
+    max_bytes_in_flight: int = DEFAULT_MAX_BYTES_IN_FLIGHT,
+) -> Dict[str, Any]:
+    """
+    Scan files with reads overlapped against detection.
+    Returns the same dict as scan_files, with results in the order of paths.
+
+    Args:
+        paths: Files to scan (non-files are ignored, as in scan_files)
+        readers: Number of files read concurrently
+        max_bytes_in_flight: Cap on read-but-unscanned file bytes (backpressure)
+    """
+    loop = asyncio.get_running_loop()
+    cache = open_cache(cache_dir, min_confidence)
+    budget = ByteBudget(max_bytes_in_flight)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, readers))
+    work = iter(enumerate(Path(p) for p in paths))
+    results: Dict[int, Dict[str, Any]] = {}
+
+    read_pool = ThreadPoolExecutor(max(1, readers), thread_name_prefix="shieldcommit-read")
+    # Detection is CPU-bound: one thread keeps it off the event loop without
+    # contending with itself for the GIL
+    detect_pool = ThreadPoolExecutor(1, thread_name_prefix="shieldcommit-detect")
+
+    async def read_stage():
+        # All readers pull from one iterator; the event loop makes that safe
+        for index, path in work:
+            size = await loop.run_in_executor(read_pool, _file_size, path)
+            if size is None:
+                continue
+            charged = await budget.acquire(size)
+            try:
+                loaded = await loop.run_in_executor(read_pool, load_one, path, max_file_size, cache)
+            except BaseException:
+                await budget.release(charged)
+                raise
+            if isinstance(loaded, PendingScan):
+                await queue.put((index, loaded, charged))
+            else:
+                results[index] = loaded
+                await budget.release(charged)
+
+    async def detect_stage():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, pending, charged = item
+            try:
+                results[index] = await loop.run_in_executor(
+                    detect_pool, finish_one, pending, min_confidence, cache
+                )
+            finally:
+                await budget.release(charged)
+
+    detector = asyncio.ensure_future(detect_stage())
+    reading = asyncio.gather(*(read_stage() for _ in range(max(1, readers))))
+    try:
+        # A failed detector must not leave readers blocked on a full queue
+        done, _ = await asyncio.wait({reading, detector}, return_when=asyncio.FIRST_COMPLETED)
+        if detector in done:
+            detector.result()
+        await reading
+        await queue.put(None)
+        await detector
+    finally:
+        reading.cancel()
+        detector.cancel()
+        await asyncio.gather(reading, detector, return_exceptions=True)
+        read_pool.shutdown(wait=True)
+        detect_pool.shutdown(wait=True)
+
+    if cache is not None and cache.writes:
+        cache.prune()
+    return summarize(results[index] for index in sorted(results))
@@ -0,0 +1,69 @@
+"""
+Server-side enforcement: scanning pushes from a git pre-receive hook.
+All refs of a push are handled together, so a blob that appears in many of the
+pushed commits (or on several pushed branches) is read and scanned once.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from .git_objects import ZERO_OID
+
+# Default wall-clock budget for scanning one push, in seconds
+DEFAULT_BUDGET = 30.0
+
+
+class RefUpdate(NamedTuple):
+    """One `<old> <new> <ref>` line of pre-receive input."""
+
+    old: str
+    new: str
+    ref: str
+
+
+def parse_updates(lines: Iterable[str]) -> List[RefUpdate]:
+    """Parse pre-receive stdin; malformed lines are ignored."""
+    updates = []
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3:
+            updates.append(RefUpdate(*parts))
+    return updates
+
+
+def pushed_revisions(updates: Iterable[RefUpdate]) -> List[str]:
+    """
+    Revision arguments selecting every commit the push adds to the repository:
+    the new tips, minus everything already reachable from existing refs.
+    Ref deletions add nothing.
+    """
+    tips = sorted({update.new for update in updates if update.new != ZERO_OID})
+    if not tips:
+        return []
+    # During pre-receive the refs still point at their old values, so --all
+    # covers exactly the objects the server had before this push
+    return tips + ["--not", "--all"]
+
+
+def scan_push(
+    updates: Iterable[RefUpdate],
+    min_confidence: float = 0.5,
+    max_file_size: Optional[int] = None,
+    cache_dir=None,
+    budget: Optional[float] = DEFAULT_BUDGET,
+    cwd: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Scan the blobs introduced by a push.
+    Returns the same dict as scan_history; 'unscanned' > 0 means the time budget
+    (in seconds, None = unlimited) ran out before every blob was scanned.
+    Raises history.HistoryError if the pushed commits cannot be listed or read.
+    """
+    from .history import blob_introductions, scan_introductions
+
+    deadline = time.monotonic() + budget if budget else None
+    revisions = pushed_revisions(updates)
+    introductions = blob_introductions(revisions, cwd=cwd) if revisions else {}
+    return scan_introductions(
+        introductions, min_confidence, max_file_size, cache_dir, cwd, deadline=deadline
+    )
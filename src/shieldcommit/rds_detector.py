@@ -5,7 +5,9 @@ Warns on end-of-life and extended support engines.
 
 import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Union
+
+from .content import FileContent, TERRAFORM_SUFFIXES, as_lines
 
 # RDS engine version support timeline
 # https://docs.aws.amazon.com/AmazonRDS/latest/UserGuide/CHAP_MariaDB.html
@@ -35,7 +37,7 @@ RDS_ENGINES = {
 }
 
 
-def parse_terraform_rds_versions(content: str) -> List[Dict[str, Any]]:
+def parse_terraform_rds_versions(content: Union[str, Sequence[str]]) -> List[Dict[str, Any]]:
     """
     Parse Terraform file content for RDS engine versions.
     Detects versions in:
@@ -44,7 +46,7 @@ def parse_terraform_rds_versions(content: str) -> List[Dict[str, Any]]:
     Returns list of version findings with line numbers and engine type.
     """
     findings = []
-    lines = content.splitlines()
+    lines = as_lines(content)
 
     # Pattern to match engine and engine_version in resources
     engine_pattern = r'engine\s*=\s*["\']([a-z]+)["\']'
@@ -129,18 +131,30 @@ def scan_rds_versions(file_path: Path) -> List[Dict[str, Any]]:
     Scan a Terraform file for RDS version warnings.
     Returns list of warnings.
     """
-    warnings = []
-
     # Only scan Terraform files
-    if file_path.suffix not in {".tf", ".json"}:
-        return warnings
+    if file_path.suffix not in TERRAFORM_SUFFIXES:
+        return []
+
+    content = FileContent.from_path(file_path)
+    if content is None:
+        return []
+
+    return scan_rds_content(content)
+
+
+def scan_rds_content(content: FileContent) -> List[Dict[str, Any]]:
+    """
+    Check already-read file content for RDS version warnings.
+    Returns list of warnings.
+    """
+    warnings = []
 
-    try:
-        content = file_path.read_text(errors="ignore")
-    except Exception:
+    # Skip non-Terraform files and files that never mention a versioned resource
+    if not content.is_terraform or not content.mentions("engine_version", "db_version"):
         return warnings
 
-    findings = parse_terraform_rds_versions(content)
+    file_path = content.path
+    findings = parse_terraform_rds_versions(content.lines)
 
     for finding in findings:
         engine = finding["engine"]
@@ -0,0 +1,276 @@
+"""
+Report writers for the scan command.
+Every writer receives findings and warnings one at a time and writes them out
+immediately, so reports of any size are produced without holding them in memory.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, TextIO
+
+import click
+
+from . import __version__
+
+# Formats accepted by `shieldcommit scan --format`
+FORMATS = ("text", "ndjson", "json", "sarif")
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+
+SECRET_RULE_ID = "shieldcommit/secret"
+VERSION_RULE_ID = "shieldcommit/version-warning"
+
+_SARIF_RULES = [
+    {
+        "id": SECRET_RULE_ID,
+        "name": "HardcodedSecret",
+        "shortDescription": {"text": "Hardcoded secret"},
+        "defaultConfiguration": {"level": "error"},
+    },
+    {
+        "id": VERSION_RULE_ID,
+        "name": "OutdatedVersion",
+        "shortDescription": {"text": "Deprecated or unsupported platform version"},
+        "defaultConfiguration": {"level": "warning"},
+    },
+]
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"), default=str)
+
+
+class Reporter(ABC):
+    """
+    Base class for report writers.
+    Call warning() and finding() as results arrive, then finish() once; it
+    returns the process exit code (1 = secrets found, 130 = interrupted, else 0).
+    Subclasses implement the three _write_* methods.
+    """
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self.findings = 0
+        self.warnings = 0
+
+    def warning(self, w: Dict[str, Any]):
+        self._write_warning(w)
+        self.warnings += 1
+
+    def finding(self, f: Dict[str, Any]):
+        self._write_finding(f)
+        self.findings += 1
+
+    def finish(self, skipped: Dict[str, int], sampled: int, interrupted: bool = False) -> int:
+        self._write_summary(skipped, sampled, interrupted)
+        self.out.flush()
+        if self.findings:
+            return 1
+        return 130 if interrupted else 0
+
+    def notice(self, message: str):
+        """Progress and status messages; machine-readable formats send them to stderr."""
+        click.echo(message, err=True)
+
+    @abstractmethod
+    def _write_warning(self, w):
+        """Write one version warning."""
+
+    @abstractmethod
+    def _write_finding(self, f):
+        """Write one finding."""
+
+    @abstractmethod
+    def _write_summary(self, skipped, sampled, interrupted):
+        """Write whatever follows the last record (totals, closing brackets)."""
+
+
+class TextReporter(Reporter):
+    """Human-readable output."""
+
+    def notice(self, message: str):
+        click.echo(message, file=self.out)
+
+    def _write_warning(self, w):
+        # Warnings are informational (non-blocking)
+        if not self.warnings:
+            click.echo("⚠️  VERSION WARNINGS (Info only - no block):\n", file=self.out)
+        click.echo(f"File: {w['file']} (line {w['line']})", file=self.out)
+        if "commit" in w:
+            click.echo(f"  Commit: {w['commit']}", file=self.out)
+        click.echo(f"  {w['message']}", file=self.out)
+        click.echo(f"  Snippet: {w['snippet']}", file=self.out)
+        click.echo("", file=self.out)
+
+    def _write_finding(self, f):
+        # Findings are blocking
+        if not self.findings:
+            click.echo("❌ Secrets detected!\n", file=self.out)
+        click.echo(f"File: {f['file']} (line {f['line']})", file=self.out)
+        if "commit" in f:
+            click.echo(f"  Commit: {f['commit']}", file=self.out)
+        click.echo(
+            f"  Detection: {f.get('detection_method', f.get('pattern', 'Unknown'))}", file=self.out
+        )
+        click.echo(f"  Confidence: {f.get('confidence', 'N/A'):.2%}", file=self.out)
+        click.echo(f"  Snippet: {f['snippet']}", file=self.out)
+        click.echo("", file=self.out)
+
+    def _write_summary(self, skipped, sampled, interrupted):
+        # Summarize files that were skipped or only partly scanned
+        if skipped:
+            reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(skipped.items()))
+            click.echo(f"Skipped {sum(skipped.values())} file(s) ({reasons})", file=self.out)
+        if sampled:
+            click.echo(f"Sampled {sampled} minified/generated file(s)", file=self.out)
+
+        if self.findings:
+            click.echo(
+                "Your commit or action has been blocked. Remove or rotate secrets before proceeding.",
+                file=self.out,
+            )
+        elif not interrupted:
+            click.echo("✓ No secrets found.", file=self.out)
+
+
+class NdjsonReporter(Reporter):
+    """
+    One JSON object per line: {"kind": "finding" | "warning", ...} for each
+    result as it is found, then a closing {"kind": "summary", ...} line.
+    """
+
+    def _write_record(self, kind, record):
+        self.out.write(_dumps({"kind": kind, **record}) + "\n")
+        self.out.flush()
+
+    def _write_warning(self, w):
+        self._write_record("warning", w)
+
+    def _write_finding(self, f):
+        self._write_record("finding", f)
+
+    def _write_summary(self, skipped, sampled, interrupted):
+        self._write_record("summary", _summary(self, skipped, sampled, interrupted))
+
+
+class JsonReporter(Reporter):
+    """
+    A single JSON document, written incrementally:
+    {"results": [{"kind": ..., ...}, ...], "summary": {...}}
+    """
+
+    def _write_record(self, kind, record):
+        first = not (self.findings or self.warnings)
+        self.out.write(('{"results":[' if first else ",") + _dumps({"kind": kind, **record}))
+        self.out.flush()
+
+    def _write_warning(self, w):
+        self._write_record("warning", w)
+
+    def _write_finding(self, f):
+        self._write_record("finding", f)
+
+    def _write_summary(self, skipped, sampled, interrupted):
+        opening = "" if (self.findings or self.warnings) else '{"results":['
+        summary = _dumps(_summary(self, skipped, sampled, interrupted))
+        self.out.write(f'{opening}],"summary":{summary}}}\n')
+
+
+class SarifReporter(Reporter):
+    """
+    SARIF 2.1.0 log with one run. The document head is written up front, each
+    result is appended to the run's results array as it arrives, and the
+    invocation record closes the document.
+    """
+
+    def __init__(self, out: TextIO):
+        super().__init__(out)
+        self._started = False
+
+    def _start(self):
+        driver = {
+            "name": "ShieldCommit",
+            "version": __version__,
+            "informationUri": "https://github.com/Techikrish/ShieldCommit",
+            "rules": _SARIF_RULES,
+        }
+        head = {"$schema": SARIF_SCHEMA, "version": SARIF_VERSION}
+        # Everything up to the open results array; the rest is closed in _write_summary
+        self.out.write(_dumps(head)[:-1] + ',"runs":[{"tool":{"driver":' + _dumps(driver))
+        self.out.write('},"results":[')
+        self._started = True
+
+    def _write_result(self, result):
+        if not self._started:
+            self._start()
+        elif self.findings or self.warnings:
+            self.out.write(",")
+        self.out.write(_dumps(result))
+        self.out.flush()
+
+    def _write_warning(self, w):
+        self._write_result(_sarif_result(w, VERSION_RULE_ID, "warning", w.get("message", "")))
+
+    def _write_finding(self, f):
+        method = f.get("detection_method", "Unknown")
+        message = f"Possible hardcoded secret ({method})"
+        if f.get("variable"):
+            message += f" in '{f['variable']}'"
+        result = _sarif_result(f, SECRET_RULE_ID, "error", message)
+        result["properties"].update(confidence=f.get("confidence"), detectionMethod=method)
+        self._write_result(result)
+
+    def _write_summary(self, skipped, sampled, interrupted):
+        if not self._started:
+            self._start()
+        invocation = {
+            "executionSuccessful": not interrupted,
+            "properties": {"skipped": skipped, "sampled": sampled},
+        }
+        self.out.write('],"invocations":[' + _dumps(invocation) + "]}]}\n")
+
+
+def _sarif_result(record: Dict[str, Any], rule_id: str, level: str, message: str):
+    region = {"startLine": record.get("line") or 1}
+    if record.get("snippet"):
+        region["snippet"] = {"text": record["snippet"]}
+    result = {
+        "ruleId": rule_id,
+        "level": level,
+        "message": {"text": message},
+        "locations": [
+            {
+                "physicalLocation": {
+                    "artifactLocation": {"uri": Path(record.get("file", "")).as_posix()},
+                    "region": region,
+                }
+            }
+        ],
+        "properties": {"commit": record["commit"]} if record.get("commit") else {},
+    }
+    return result
+
+
+def _summary(reporter: Reporter, skipped, sampled, interrupted) -> Dict[str, Any]:
+    return {
+        "findings": reporter.findings,
+        "warnings": reporter.warnings,
+        "skipped": skipped,
+        "sampled": sampled,
+        "interrupted": bool(interrupted),
+    }
+
+
+_REPORTERS = {
+    "text": TextReporter,
+    "ndjson": NdjsonReporter,
+    "json": JsonReporter,
+    "sarif": SarifReporter,
+}
+
+
+def get_reporter(name: str, out: TextIO) -> Reporter:
+    """Create the writer for a --format name."""
+    return _REPORTERS[name](out)
@@ -1,54 +1,507 @@
+import functools
+import os
+from collections import Counter
 from pathlib import Path
-from .intelligent_detector import detect_secrets
-from .eks_detector import scan_eks_versions
-from .rds_detector import scan_rds_versions
-from .aks_detector import scan_aks_versions
-from .gcp_detector import scan_gcp_versions
-from .azure_db_detector import scan_azure_db_versions
-from .gcp_db_detector import scan_gcp_cloudsql_versions
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+from .classifier import Classification, classify_file, classify_head, SNIFF_BYTES
+from .classifier import SAMPLE, SAMPLE_CHARS, SCAN, SKIP
+from .cache import ResultCache, ruleset_fingerprint
+from .content import FileContent, TERRAFORM_SUFFIXES, git_blob_hasher
+from .git_objects import CatFileBatch, StagedEntry, staged_entries
+from .mmap_scan import iter_file_mmap, should_use_mmap, scan_file_mmap
+
+# The detectors and their catalogs load on first use (see _version_scanners), so
+# commands that end up scanning nothing never import them
 
 
 def scan_file(path: Path, min_confidence: float = 0.5):
     """
     Scan a file for secrets using intelligent detection.
     Returns findings with line numbers, confidence scores, and detection methods.
+    Very large files are scanned through a memory mapping instead of being read whole.
     """
+    if should_use_mmap(path):
+        return scan_file_mmap(path, min_confidence=min_confidence)
+
+    content = FileContent.from_path(path)
+    if content is None:
+        return []
+
+    return scan_content_secrets(content, min_confidence=min_confidence)
+
+
+def scan_content_secrets(content: FileContent, min_confidence: float = 0.5):
+    """Run secret detection over already-read file content."""
+    from .intelligent_detector import detect_secrets
+
     findings = []
-    try:
-        text = path.read_text(errors="ignore")
-    except Exception:
-        return findings
 
     # Use intelligent detection instead of patterns
-    detected = detect_secrets(text, min_confidence=min_confidence)
+    detected = detect_secrets(content.lines, min_confidence=min_confidence)
 
     for finding in detected:
-        finding["file"] = str(path)
+        finding.file = str(content.path)
         findings.append(finding)
 
     return findings
 
 
-def scan_files(paths):
+def scan_content(content: FileContent, min_confidence: float = 0.5):
     """
-    Scan files for secrets and warnings (EKS/RDS/AKS/GCP versions + Azure/GCP databases).
-    Uses intelligent detection for secrets (no patterns).
-    Returns dict with 'findings' (secrets) and 'warnings' (version issues).
+    Run the secret detector and all version detectors over one file's content.
+    The file is read and split into lines only once for all of them.
+    Returns (findings, warnings).
+    """
+    findings = scan_content_secrets(content, min_confidence=min_confidence)
+    return findings, scan_content_versions(content)
+
+
+@functools.lru_cache(maxsize=None)
+def _version_scanners():
+    """Import the version detectors (and their catalogs) the first time they are needed."""
+    from .eks_detector import scan_eks_content
+    from .rds_detector import scan_rds_content
+    from .aks_detector import scan_aks_content
+    from .gcp_detector import scan_gcp_content
+    from .azure_db_detector import scan_azure_db_content
+    from .gcp_db_detector import scan_gcp_cloudsql_content
+
+    return (
+        # Kubernetes versions
+        scan_eks_content,
+        scan_aks_content,
+        scan_gcp_content,
+        # Database versions
+        scan_rds_content,
+        scan_azure_db_content,
+        scan_gcp_cloudsql_content,
+    )
+
+
+def scan_content_versions(content: FileContent):
+    """Run all version detectors over already-read file content."""
+    # Every version detector only looks at Terraform files
+    if not content.is_terraform:
+        return []
+    warnings = []
+    for scan_versions in _version_scanners():
+        warnings.extend(scan_versions(content))
+    return warnings
+
+
+def scan_path(
+    path: Path, min_confidence: float = 0.5, classification: Optional[Classification] = None
+):
+    """
+    Scan a single file for secrets and version warnings.
+    Returns (findings, warnings).
+
+    A SAMPLE classification limits the scan to the start of the file, and its
+    encoding (if sniffed from a byte-order mark) is used to decode the file.
+    """
+    encoding = classification.encoding if classification else None
+    if classification is not None and classification.verdict == SAMPLE:
+        content = FileContent.from_path(path, encoding=encoding, limit=SAMPLE_CHARS)
+        if content is None:
+            return [], []
+        return scan_content(content, min_confidence=min_confidence)
+
+    if encoding is None and should_use_mmap(path):
+        findings = scan_file_mmap(path, min_confidence=min_confidence)
+        # Only Terraform files need the full text for the version detectors
+        content = FileContent.from_path(path) if path.suffix in TERRAFORM_SUFFIXES else None
+        warnings = scan_content_versions(content) if content else []
+        return findings, warnings
+
+    content = FileContent.from_path(path, encoding=encoding)
+    if content is None:
+        return [], []
+
+    return scan_content(content, min_confidence=min_confidence)
+
+
+def _scan_mmap_hashed(path: Path, min_confidence: float):
+    """
+    Memory-mapped scan that also computes the file's git blob id during the walk.
+    Returns (findings, warnings, blob_id); blob_id is None if the file changed mid-scan.
+    """
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return [], [], None
+    hasher = git_blob_hasher(size)
+    findings = scan_file_mmap(path, min_confidence=min_confidence, hasher=hasher)
+    content = FileContent.from_path(path) if path.suffix in TERRAFORM_SUFFIXES else None
+    warnings = scan_content_versions(content) if content else []
+    try:
+        unchanged = path.stat().st_size == size
+    except OSError:
+        unchanged = False
+    return findings, warnings, hasher.hexdigest() if unchanged else None
+
+
+def _result_key(
+    blob_id: Optional[str], path: Path, classification: Classification
+) -> Optional[str]:
+    """
+    Cache key for a scan result: the blob id plus everything besides content that
+    changes the result (sampling, decoding, and whether version detectors apply).
+    """
+    if not blob_id:
+        return None
+    terraform = int(path.suffix in TERRAFORM_SUFFIXES)
+    return f"{blob_id}:{classification.verdict}:{classification.encoding or ''}:{terraform}"
+
+
+def _key_lines(path: Path, key: str) -> Optional[List[str]]:
+    """
+    The lines of a file decoded as for the result key it was recorded under,
+    for the cache to read the values of cached findings back from.
+    """
+    encoding = key.split(":")[2] if key.count(":") >= 3 else ""
+    content = FileContent.from_path(path, encoding or None)
+    return content.lines if content is not None else None
+
+
+def _result(findings, warnings, verdict: str, reason: str = "") -> Dict[str, Any]:
+    return {"findings": findings, "warnings": warnings, "verdict": verdict, "reason": reason}
+
+
+class PendingScan(NamedTuple):
+    """
+    A file that load_one has classified and read, waiting for detection.
+    content is None for files that are scanned through a memory mapping.
+    """
+
+    path: Path
+    classification: Classification
+    content: Optional[FileContent]
+    st: Optional[os.stat_result]
+
+
+def scan_one(
+    path: Path,
+    min_confidence: float = 0.5,
+    max_file_size: Optional[int] = None,
+    cache: Optional[ResultCache] = None,
+) -> Dict[str, Any]:
+    """
+    Classify a file, then scan it unless it is skipped.
+    Returns dict with 'findings', 'warnings', 'verdict' and 'reason'.
+
+    With a cache, a file whose stat matches a previous run costs a stat and
+    two lookups (and a read, if it has findings); otherwise its blob id is
+    computed while it is read, and the result is stored for any file with the
+    same content.
+    """
+    if cache is None:
+        classification = classify_file(path, max_size=max_file_size)
+        if classification.verdict == SKIP:
+            return _result([], [], SKIP, classification.reason)
+        findings, warnings = scan_path(path, min_confidence, classification=classification)
+        return _result(findings, warnings, classification.verdict, classification.reason)
+
+    loaded = load_one(path, max_file_size, cache)
+    if isinstance(loaded, PendingScan):
+        return finish_one(loaded, min_confidence, cache)
+    return loaded
+
+
+def load_one(
+    path: Path, max_file_size: Optional[int] = None, cache: Optional[ResultCache] = None
+) -> Union[Dict[str, Any], PendingScan]:
+    """
+    The I/O half of scan_one: classify and read a file.
+    Returns a finished result for skipped files and cache hits, or a PendingScan
+    to hand to finish_one.
+    """
+    st = None
+    if cache is not None:
+        try:
+            st = path.stat()
+        except OSError:
+            return _result([], [], SKIP, "unreadable")
+        if max_file_size is not None and st.st_size > max_file_size:
+            return _result([], [], SKIP, "too_large")
+
+        recorded = cache.lookup_stat(path, st)
+        if recorded and recorded.startswith("skip:"):
+            return _result([], [], SKIP, recorded[len("skip:") :])
+        if recorded:
+            cached = cache.get(recorded, str(path), lambda: _key_lines(path, recorded))
+            if cached is not None:
+                return cached
+
+    classification = classify_file(path, max_size=max_file_size)
+    if classification.verdict == SKIP:
+        if cache is not None:
+            cache.record_stat(path, st, "skip:" + classification.reason)
+        return _result([], [], SKIP, classification.reason)
+
+    verdict = classification.verdict
+    if verdict == SCAN and classification.encoding is None and should_use_mmap(path):
+        return PendingScan(path, classification, None, st)
+
+    limit = SAMPLE_CHARS if verdict == SAMPLE else None
+    if cache is None:
+        content = FileContent.from_path(path, classification.encoding, limit)
+        if content is None:
+            return _result([], [], verdict, classification.reason)
+        return PendingScan(path, classification, content, st)
+
+    content = FileContent.from_path_hashed(path, classification.encoding, limit)
+    if content is None:
+        return _result([], [], SKIP, "unreadable")
+    # Same content seen under another path (or an older stat) needs no rescan
+    key = _result_key(content.blob_id, path, classification)
+    cached = cache.get(key, str(path), lambda: content.lines) if key else None
+    if cached is not None:
+        cache.record_stat(path, st, key)
+        return cached
+    return PendingScan(path, classification, content, st)
+
+
+def finish_one(
+    pending: PendingScan, min_confidence: float = 0.5, cache: Optional[ResultCache] = None
+) -> Dict[str, Any]:
+    """The CPU half of scan_one: run the detectors on a loaded file and cache the result."""
+    path, classification, content = pending.path, pending.classification, pending.content
+    if content is not None:
+        findings, warnings = scan_content(content, min_confidence=min_confidence)
+        key = _result_key(content.blob_id, path, classification)
+    elif cache is not None:
+        findings, warnings, blob_id = _scan_mmap_hashed(path, min_confidence)
+        key = _result_key(blob_id, path, classification)
+    else:
+        findings, warnings = scan_path(path, min_confidence, classification=classification)
+        key = None
+
+    result = _result(findings, warnings, classification.verdict, classification.reason)
+    if cache is not None and key:
+        cache.put(key, result)
+        cache.record_stat(path, pending.st, key)
+    return result
+
+
+def scan_blob(
+    path: str,
+    blob_id: str,
+    data: bytes,
+    min_confidence: float = 0.5,
+    max_file_size: Optional[int] = None,
+    cache: Optional[ResultCache] = None,
+) -> Dict[str, Any]:
+    """
+    Classify and scan in-memory file contents (e.g. a git blob) as if read from path.
+    Returns the same dict as scan_one.
+    """
+    classification = classify_head(path, data[:SNIFF_BYTES], len(data), max_size=max_file_size)
+    if classification.verdict == SKIP:
+        return _result([], [], SKIP, classification.reason)
+
+    key = _result_key(blob_id, Path(path), classification)
+    if cache is not None:
+        cached = cache.get(
+            key, path, lambda: FileContent.from_bytes(path, data, classification.encoding).lines
+        )
+        if cached is not None:
+            return cached
+
+    limit = SAMPLE_CHARS if classification.verdict == SAMPLE else None
+    content = FileContent.from_bytes(path, data, classification.encoding, limit, blob_id=blob_id)
+    findings, warnings = scan_content(content, min_confidence=min_confidence)
+    result = _result(findings, warnings, classification.verdict, classification.reason)
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+def scan_staged(
+    min_confidence: float = 0.5,
+    max_file_size: Optional[int] = None,
+    cache_dir=None,
+    cwd: Optional[str] = None,
+    entries: Optional[List[StagedEntry]] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Scan exactly what would be committed: the staged blobs, not the working tree.
+    Deleted files and submodules are skipped; all blobs are streamed through a
+    single `git cat-file --batch` process. Returns the same dict as scan_files.
+
+    entries can be passed in if the caller already listed them with staged_entries;
+    env is the environment git runs with (None = inherit).
+    """
+    if entries is None:
+        entries = staged_entries(cwd=cwd, env=env)
+    cache = open_cache(cache_dir, min_confidence)
+    results = []
+    if entries:
+        with CatFileBatch(cwd=cwd, env=env) as cat:
+            for entry in entries:
+                obj = cat.read(entry.blob_id)
+                if obj is None or obj[0] != "blob":
+                    results.append(_result([], [], SKIP, "unreadable"))
+                    continue
+                results.append(
+                    scan_blob(
+                        entry.path, entry.blob_id, obj[1], min_confidence, max_file_size, cache
+                    )
+                )
+
+    if cache is not None and cache.writes:
+        cache.prune()
+    return summarize(results)
+
+
+class ScanEvent(NamedTuple):
+    """
+    One item from iter_scan.
+    kind is FINDING or WARNING (record is the finding/warning dict), or FILE once
+    a file is done (record has 'file', 'verdict' and 'reason').
     """
+
+    kind: str
+    record: Dict[str, Any]
+
+
+FINDING = "finding"
+WARNING = "warning"
+FILE = "file"
+
+
+def iter_scan(
+    paths: Iterable,
+    min_confidence: float = 0.5,
+    max_file_size: Optional[int] = None,
+    cache_dir=None,
+) -> Iterator[ScanEvent]:
+    """
+    Scan files one at a time, yielding findings and warnings as they are produced.
+    Accepts any iterable of paths (e.g. a walk_files generator) and holds at most
+    one file's results at a time. Memory-mapped scans of very large files stream
+    their findings mid-file (when no cache is in use).
+    """
+    cache = open_cache(cache_dir, min_confidence)
+    try:
+        for p in paths:
+            path = Path(p)
+            if not path.is_file():
+                continue
+            loaded = load_one(path, max_file_size, cache)
+            if isinstance(loaded, PendingScan) and loaded.content is None and cache is None:
+                for finding in iter_file_mmap(path, min_confidence=min_confidence):
+                    yield ScanEvent(FINDING, finding)
+                content = FileContent.from_path(path) if path.suffix in TERRAFORM_SUFFIXES else None
+                for warning in scan_content_versions(content) if content else []:
+                    yield ScanEvent(WARNING, warning)
+                result = _result(
+                    [], [], loaded.classification.verdict, loaded.classification.reason
+                )
+            else:
+                if isinstance(loaded, PendingScan):
+                    result = finish_one(loaded, min_confidence, cache)
+                else:
+                    result = loaded
+                for finding in result["findings"]:
+                    yield ScanEvent(FINDING, finding)
+                for warning in result["warnings"]:
+                    yield ScanEvent(WARNING, warning)
+            yield ScanEvent(
+                FILE, {"file": str(path), "verdict": result["verdict"], "reason": result["reason"]}
+            )
+    finally:
+        if cache is not None and cache.writes:
+            cache.prune()
+
+
+def summarize(results) -> Dict[str, Any]:
+    """Merge per-file scan_one results (in order) into one scan_files result."""
     findings = []
     warnings = []
+    skipped = Counter()
+    sampled = 0
+    for result in results:
+        findings.extend(result["findings"])
+        warnings.extend(result["warnings"])
+        if result["verdict"] == SKIP:
+            skipped[result["reason"]] += 1
+        elif result["verdict"] == SAMPLE:
+            sampled += 1
+    return {
+        "findings": findings,
+        "warnings": warnings,
+        "skipped": dict(skipped),
+        "sampled": sampled,
+    }
+
+
+def scan_files(
+    paths,
+    jobs: int = 1,
+    min_confidence: float = 0.5,
+    file_timeout=None,
+    max_file_size: Optional[int] = None,
+    cache_dir=None,
+    readers: int = 0,
+):
+    """
+    Scan files for secrets and warnings (EKS/RDS/AKS/GCP versions + Azure/GCP databases).
+    Uses intelligent detection for secrets (no patterns).
+    Returns dict with 'findings' (secrets) and 'warnings' (version issues), plus
+    'skipped' (count per skip reason) and 'sampled' (files only partly scanned).
+
+    Each file is classified first: binaries, lockfiles and files over
+    max_file_size bytes are skipped; minified and generated files are sampled.
+
+    With cache_dir set, results are cached there by content and ruleset (see cache.py).
+
+    With jobs != 1 the files are scanned by a process pool (jobs=0 picks the
+    worker count from the available CPUs); see parallel.scan_files_parallel.
+
+    With readers > 0 (and jobs == 1), that many files are read concurrently
+    while earlier ones are scanned; see pipeline.scan_files_async.
+    """
+    if jobs != 1:
+        from .parallel import scan_files_parallel, DEFAULT_FILE_TIMEOUT
 
+        return scan_files_parallel(
+            paths,
+            jobs=jobs,
+            min_confidence=min_confidence,
+            file_timeout=DEFAULT_FILE_TIMEOUT if file_timeout is None else file_timeout,
+            max_file_size=max_file_size,
+            cache_dir=cache_dir,
+        )
+
+    if readers > 0:
+        import asyncio
+        from .pipeline import scan_files_async
+
+        return asyncio.run(
+            scan_files_async(
+                paths,
+                min_confidence=min_confidence,
+                max_file_size=max_file_size,
+                cache_dir=cache_dir,
+                readers=readers,
+            )
+        )
+
+    cache = open_cache(cache_dir, min_confidence)
+    results = []
     for p in paths:
         p = Path(p)
         if p.is_file():
-            findings.extend(scan_file(p))
-            # Scan for Kubernetes versions
-            warnings.extend(scan_eks_versions(p))
-            warnings.extend(scan_aks_versions(p))
-            warnings.extend(scan_gcp_versions(p))
-            # Scan for database versions
-            warnings.extend(scan_rds_versions(p))
-            warnings.extend(scan_azure_db_versions(p))
-            warnings.extend(scan_gcp_cloudsql_versions(p))
-
-    return {"findings": findings, "warnings": warnings}
+            results.append(scan_one(p, min_confidence, max_file_size, cache=cache))
+
+    if cache is not None and cache.writes:
+        cache.prune()
+    return summarize(results)
+
+
+def open_cache(cache_dir, min_confidence: float) -> Optional[ResultCache]:
+    """Open the result cache for this ruleset, or return None if caching is off."""
+    if cache_dir is None:
+        return None
+    return ResultCache(Path(cache_dir), ruleset_fingerprint(min_confidence))
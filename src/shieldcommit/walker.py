@@ -0,0 +1,285 @@
+"""
+Directory walking for `shieldcommit scan <dir>`.
+Files are yielded as they are found. Vendored and tool directories are pruned
+without being entered, .gitignore/.shieldcommitignore rules are honoured, and
+every file and directory is visited at most once (hardlinks, symlink loops).
+"""
+
+import os
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+# Directories never worth descending into: VCS metadata, dependency trees,
+# tool caches and build state
+PRUNED_DIRS = {
+    ".git",
+    ".hg",
+    ".svn",
+    "node_modules",
+    "bower_components",
+    "vendor",
+    ".terraform",
+    ".terragrunt-cache",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".tox",
+    ".nox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".shieldcommit",
+}
+
+# Ignore files read from every directory, in increasing precedence
+IGNORE_FILES = (".gitignore", ".shieldcommitignore")
+
+# A directory containing this file is a virtualenv, whatever it is called
+_VENV_MARKER = "pyvenv.cfg"
+
+
+class IgnoreRule(NamedTuple):
+    """One compiled ignore pattern."""
+
+    regex: Pattern
+    negate: bool
+    dir_only: bool
+    anchored: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob (without anchoring slashes) into a regex body."""
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i) and i + 2 == n and (i == 0 or pattern[i - 1] == "/"):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1 : i + 2] in ("!", "^") else i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1 : end]
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def compile_rule(line: str) -> Optional[IgnoreRule]:
+    """Compile one line of an ignore file, or return None for blanks and comments."""
+    line = line.rstrip("\n").rstrip("\r")
+    # Trailing spaces are ignored unless escaped
+    if not line.endswith("\\ "):
+        line = line.rstrip(" ")
+    if not line or line.startswith("#"):
+        return None
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith(("\\!", "\\#")):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # A slash anywhere but the end anchors the pattern to the ignore file's directory
+    anchored = "/" in line
+    line = line.lstrip("/")
+
+    try:
+        regex = re.compile("^" + _translate(line) + "$")
+    except re.error:
+        return None
+    return IgnoreRule(regex, negate, dir_only, anchored)
+
+
+def load_rules(path: str) -> List[IgnoreRule]:
+    """Read an ignore file; a missing or unreadable file has no rules."""
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as fh:
+            lines = fh.readlines()
+    except OSError:
+        return []
+    return [rule for rule in map(compile_rule, lines) if rule is not None]
+
+
+class IgnoreFrame(NamedTuple):
+    """Rules read from one directory, matched against paths relative to it."""
+
+    base: str
+    rules: List[IgnoreRule]
+
+
+def is_ignored(frames: List[IgnoreFrame], path: str, is_dir: bool) -> bool:
+    """
+    Whether ignore rules exclude a path (absolute, below every frame's base).
+    Deeper ignore files take precedence, and within a file the last match wins.
+    """
+    name = path[path.rfind(os.sep) + 1 :]
+    for frame in reversed(frames):
+        rel = path[len(frame.base) + 1 :]
+        if os.sep != "/":
+            rel = rel.replace(os.sep, "/")
+        for rule in reversed(frame.rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(rel if rule.anchored else name):
+                return not rule.negate
+    return False
+
+
+def _read_frame(directory: str) -> Optional[IgnoreFrame]:
+    rules = [rule for name in IGNORE_FILES for rule in load_rules(os.path.join(directory, name))]
+    return IgnoreFrame(directory, rules) if rules else None
+
+
+def _ancestor_frames(root: str) -> List[IgnoreFrame]:
+    """
+    Ignore rules that reach root from above: those of the directories between
+    the enclosing git repository's top level and root, plus .git/info/exclude.
+    Outside a repository only rules found while walking apply.
+    """
+    top = root
+    while not os.path.exists(os.path.join(top, ".git")):
+        parent = os.path.dirname(top)
+        if parent == top:
+            return []
+        top = parent
+
+    frames = [IgnoreFrame(top, load_rules(os.path.join(top, ".git", "info", "exclude")))]
+    if top == root:
+        return frames
+    directory = top
+    parts = os.path.relpath(os.path.dirname(root), top).split(os.sep)
+    for part in [""] + [part for part in parts if part != "."]:
+        directory = os.path.join(directory, part) if part else directory
+        frame = _read_frame(directory)
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+def _pruned(name: str, path: str, pruned_dirs) -> bool:
+    return name in pruned_dirs or os.path.exists(os.path.join(path, _VENV_MARKER))
+
+
+def walk_files(
+    paths: Iterable,
+    ignore_files: bool = True,
+    pruned_dirs=PRUNED_DIRS,
+    visited_dirs: Optional[List[str]] = None,
+) -> Iterator[str]:
+    """
+    Expand files and directories into the files to scan, lazily.
+
+    Directory contents are yielded in name order as they are read. Directories
+    in pruned_dirs (and virtualenvs) are never entered; with ignore_files,
+    paths excluded by .gitignore/.shieldcommitignore (and the enclosing
+    repository's .gitignore files and .git/info/exclude) are skipped too.
+    Symlinks are followed, but each directory and file is visited only once.
+    Paths given explicitly are always yielded, even if they would be ignored.
+    If visited_dirs is given, the absolute path of every directory entered is
+    appended to it.
+    """
+    seen: Set[Tuple[int, int]] = set()
+
+    for given in paths:
+        given = str(given)
+        if not os.path.isdir(given):
+            yield given
+            continue
+
+        root = os.path.abspath(given)
+        try:
+            st = os.stat(root)
+        except OSError:
+            continue
+        if (st.st_dev, st.st_ino) in seen:
+            continue
+        seen.add((st.st_dev, st.st_ino))
+
+        frames = _ancestor_frames(root) if ignore_files else []
+        # (display path, absolute path, device, ignore frames in effect); files
+        # under "." are reported without a "./" prefix, as Path.rglob did
+        display = "" if os.path.normpath(given) == "." else given
+        stack = [(display, root, st.st_dev, frames)]
+        while stack:
+            display, absolute, dev, frames = stack.pop()
+            if visited_dirs is not None:
+                visited_dirs.append(absolute)
+            if ignore_files:
+                frame = _read_frame(absolute)
+                if frame is not None:
+                    frames = frames + [frame]
+            try:
+                with os.scandir(display or ".") as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                path = os.path.join(absolute, entry.name)
+                shown = os.path.join(display, entry.name) if display else entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir:
+                    if _pruned(entry.name, path, pruned_dirs):
+                        continue
+                    if frames and is_ignored(frames, path, True):
+                        continue
+                    try:
+                        dst = entry.stat()
+                    except OSError:
+                        continue
+                    key = (dst.st_dev, dst.st_ino)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    subdirs.append((shown, path, dst.st_dev, frames))
+                    continue
+
+                if not entry.is_file():
+                    continue
+                if frames and is_ignored(frames, path, False):
+                    continue
+                # Regular entries carry their inode; only symlinks need a stat
+                if entry.is_symlink():
+                    try:
+                        fst = entry.stat()
+                    except OSError:
+                        continue
+                    key = (fst.st_dev, fst.st_ino)
+                else:
+                    key = (dev, entry.inode())
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield shown
+
+            stack.extend(reversed(subdirs))
@@ -0,0 +1,310 @@
+"""
+Watch mode: rescan files as they change.
+Changes are found by comparing stat snapshots of the watched tree. On Linux,
+inotify wakes the watcher as soon as something is written; elsewhere (or if
+inotify is unavailable) the tree is polled. Only files whose stat changed are
+rescanned, and with the result cache a file whose content did not change is
+not scanned again at all.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .scanner import open_cache, scan_one
+from .walker import walk_files
+
+# Seconds between snapshots when polling
+DEFAULT_INTERVAL = 1.0
+
+# Seconds without further changes before a burst of saves is rescanned
+DEFAULT_DEBOUNCE = 0.3
+
+# A tree that never goes quiet is rescanned at least this often, in debounce periods
+_MAX_DEBOUNCE_PERIODS = 10
+
+NEW = "new"
+RESOLVED = "resolved"
+
+# (st_size, st_mtime_ns, st_ino) for every watched file
+Snapshot = Dict[str, Tuple[int, int, int]]
+
+
+def snapshot(paths: Iterable, ignore_files: bool = True, dirs: Optional[List[str]] = None):
+    """Stat every file walk_files yields for paths; dirs collects the directories walked."""
+    states: Snapshot = {}
+    for path in walk_files(paths, ignore_files=ignore_files, visited_dirs=dirs):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        states[path] = (st.st_size, st.st_mtime_ns, st.st_ino)
+    return states
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Tuple[List[str], List[str]]:
+    """Return (added or modified paths, removed paths)."""
+    changed = sorted(path for path, state in new.items() if old.get(path) != state)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+
+# ---------- waiting for changes ----------
+
+
+class PollWaiter:
+    """Waits a fixed time; changes are only noticed by the next snapshot."""
+
+    # Whether wait() returns as soon as anything changes
+    complete = False
+
+    def watch(self, directories: Iterable[str]):
+        pass
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Sleep for timeout seconds. Polling cannot tell whether anything happened."""
+        time.sleep(timeout if timeout is not None else DEFAULT_INTERVAL)
+        return True
+
+    def settle(self, debounce: float):
+        time.sleep(debounce)
+
+    def close(self):
+        pass
+
+
+class InotifyWaiter:
+    """
+    Wakes up on inotify events in the watched directories.
+    Events are only used as a signal to take a new snapshot, so they are drained
+    without being decoded. Raises OSError where inotify is not available.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = 0o2000000
+
+    MASK = (
+        IN_MODIFY
+        | IN_ATTRIB
+        | IN_CLOSE_WRITE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_CREATE
+        | IN_DELETE
+        | IN_DELETE_SELF
+        | IN_MOVE_SELF
+    )
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("libc has no inotify")
+        self._libc = libc
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[str, int] = {}
+        self.complete = True
+
+    def watch(self, directories: Iterable[str]):
+        """Watch exactly these directories, adding and dropping watches as needed."""
+        wanted = set(directories)
+        for directory in set(self._watches) - wanted:
+            # Fails harmlessly if the kernel already dropped it (directory deleted)
+            self._libc.inotify_rm_watch(self.fd, self._watches.pop(directory))
+        complete = True
+        for directory in wanted - set(self._watches):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                # Usually fs.inotify.max_user_watches; wait() then also times out
+                complete = False
+                continue
+            self._watches[directory] = wd
+        self.complete = complete
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Block until events arrive or timeout passes; returns whether there were events."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        self._drain()
+        return True
+
+    def settle(self, debounce: float):
+        """Wait until no event has arrived for debounce seconds (or a bounded time passed)."""
+        deadline = time.monotonic() + debounce * _MAX_DEBOUNCE_PERIODS
+        while time.monotonic() < deadline and self.wait(debounce):
+            pass
+
+    def _drain(self):
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_waiter(use_inotify: bool = True):
+    """An InotifyWaiter where possible, otherwise a PollWaiter."""
+    if use_inotify:
+        try:
+            return InotifyWaiter()
+        except OSError:
+            pass
+    return PollWaiter()
+
+
+# ---------- tracking results ----------
+
+
+class Change(NamedTuple):
+    """A finding or warning that appeared (NEW) or disappeared (RESOLVED)."""
+
+    status: str
+    kind: str
+    record: Dict[str, Any]
+
+
+def _identity(kind: str, record: Dict[str, Any]) -> tuple:
+    """
+    What makes two results the same across rescans. Line numbers are left out,
+    so editing lines above a finding does not report it as resolved and new.
+    """
+    return (
+        kind,
+        record.get("type", ""),
+        record.get("variable", ""),
+        record.get("version", ""),
+        record.get("snippet", "").strip(),
+    )
+
+
+class Watcher:
+    """
+    Keeps the current findings and warnings of a set of paths and reports how
+    they change. Call update() to rescan what changed, or run() to loop.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable,
+        min_confidence: float = 0.5,
+        max_file_size: Optional[int] = None,
+        cache_dir=None,
+        ignore_files: bool = True,
+        interval: float = DEFAULT_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+        waiter=None,
+    ):
+        self.paths = list(paths)
+        self.min_confidence = min_confidence
+        self.max_file_size = max_file_size
+        self.ignore_files = ignore_files
+        self.interval = interval
+        self.debounce = debounce
+        self.waiter = waiter if waiter is not None else PollWaiter()
+        self.cache = open_cache(cache_dir, min_confidence)
+        self.states: Snapshot = {}
+        # path -> {identity: (kind, record)} of what is currently reported
+        self.reported: Dict[str, Dict[tuple, Tuple[str, Dict[str, Any]]]] = {}
+        # Files rescanned by the last update
+        self.rescanned = 0
+
+    def update(self) -> List[Change]:
+        """Take a new snapshot, rescan changed files and return what changed."""
+        dirs: List[str] = []
+        states = snapshot(self.paths, self.ignore_files, dirs)
+        self.waiter.watch(dirs)
+        changed, removed = diff_snapshots(self.states, states)
+        self.states = states
+        self.rescanned = len(changed)
+
+        changes = []
+        for path in removed:
+            changes.extend(self._replace(path, {}))
+        for path in changed:
+            result = scan_one(Path(path), self.min_confidence, self.max_file_size, self.cache)
+            current = {}
+            for kind, records in (("finding", result["findings"]), ("warning", result["warnings"])):
+                for record in records:
+                    current[_identity(kind, record)] = (kind, record)
+            changes.extend(self._replace(path, current))
+        return changes
+
+    def _replace(self, path: str, current) -> List[Change]:
+        previous = self.reported.pop(path, {})
+        if current:
+            self.reported[path] = current
+        changes = [
+            Change(RESOLVED, kind, record)
+            for key, (kind, record) in previous.items()
+            if key not in current
+        ]
+        changes.extend(
+            Change(NEW, kind, record)
+            for key, (kind, record) in current.items()
+            if key not in previous
+        )
+        return changes
+
+    def run(self, on_changes: Callable[[List[Change]], None], should_stop=lambda: False):
+        """
+        Report the initial results, then rescan after every burst of changes
+        until should_stop() returns true.
+        """
+        try:
+            on_changes(self.update())
+            while not should_stop():
+                self.waiter.wait(None if self.waiter.complete else self.interval)
+                if should_stop():
+                    break
+                # Let a burst of saves (editors often write several times) finish
+                self.waiter.settle(self.debounce)
+                changes = self.update()
+                if changes:
+                    on_changes(changes)
+        finally:
+            self.waiter.close()
+            if self.cache is not None and self.cache.writes:
+                self.cache.prune()
+
+    @property
+    def findings(self) -> int:
+        """Number of findings currently reported."""
+        return sum(
+            kind == "finding" for current in self.reported.values() for kind, _ in current.values()
+        )
+
+
+def format_change(change: Change) -> str:
+    """One line describing a change, for the terminal."""
+    record = change.record
+    where = f"{record['file']} (line {record['line']})"
+    if change.kind == "finding":
+        method = record.get("detection_method", record.get("pattern", "Unknown"))
+        what = f"secret ({method}, {record.get('confidence', 0):.0%}): {record['snippet'].strip()}"
+    else:
+        what = record["message"]
+    if change.status == NEW:
+        icon = "❌" if change.kind == "finding" else "⚠️ "
+        return f"{icon} {where}: {what}"
+    return f"✓ Resolved {where}: {what}"
@@ -0,0 +1,185 @@
+"""
+Tests for the persistent result cache
+Warm runs should reuse results keyed by content and ruleset
+"""
+
+import os
+from pathlib import Path
+import tempfile
+import time
+
+import pytest
+from shieldcommit import scanner
+from shieldcommit.cache import ResultCache, ruleset_fingerprint
+from shieldcommit.content import FileContent, git_blob_id
+from shieldcommit.finding import Finding
+from shieldcommit.scanner import scan_files
+
+SECRET = 'api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"\n'
+TERRAFORM = 'resource "aws_eks_cluster" "main" {\n  kubernetes_version = "1.24"\n}\n'
+
+
+def _write_old(path: Path, text: str):
+    """Write a file with an mtime safely in the past (outside the racy window)."""
+    path.write_text(text)
+    past = time.time() - 60
+    os.utime(path, (past, past))
+
+
+@pytest.fixture
+def tree():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _write_old(root / "app.py", SECRET)
+        _write_old(root / "main.tf", TERRAFORM)
+        (root / "cache").mkdir()
+        yield root
+
+
+class TestBlobId:
+    """Test git blob id computation"""
+
+    def test_matches_git_hash_object(self):
+        """Blob ids should match `git hash-object`"""
+        assert git_blob_id(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+    def test_computed_while_reading(self, tree):
+        """from_path_hashed should return the blob id with the content"""
+        content = FileContent.from_path_hashed(tree / "app.py")
+        assert content.blob_id == git_blob_id(SECRET.encode())
+        assert content.lines == [SECRET.strip()]
+
+
+class TestResultCache:
+    """Test cached scanning"""
+
+    def test_warm_run_skips_reading(self, tree, monkeypatch):
+        """A second run with unchanged files should not read or classify them"""
+        paths = [str(tree / "app.py"), str(tree / "main.tf")]
+        cold = scan_files(paths, cache_dir=tree / "cache")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("file was read on a warm run")
+
+        monkeypatch.setattr(scanner, "classify_file", fail)
+        monkeypatch.setattr(FileContent, "from_path_hashed", fail)
+        warm = scan_files(paths, cache_dir=tree / "cache")
+
+        assert warm == cold
+        assert len(warm["findings"]) == 1
+        assert warm["findings"][0]["file"] == paths[0]
+        assert {w["type"] for w in warm["warnings"]} == {"eks_version", "aks_version"}
+
+    def test_same_content_under_new_path(self, tree):
+        """Identical content at another path should be served from the cache"""
+        scan_files([str(tree / "app.py")], cache_dir=tree / "cache")
+        _write_old(tree / "copy.py", SECRET)
+
+        cache = scanner.open_cache(tree / "cache", 0.5)
+        result = scanner.scan_one(tree / "copy.py", cache=cache)
+        assert cache.hits == 1
+        assert result["findings"][0]["file"] == str(tree / "copy.py")
+        assert isinstance(result["findings"][0], Finding)
+
+    def test_changed_content_is_rescanned(self, tree):
+        """Editing a file should invalidate its cached result"""
+        scan_files([str(tree / "app.py")], cache_dir=tree / "cache")
+        _write_old(tree / "app.py", "nothing here\n")
+        assert scan_files([str(tree / "app.py")], cache_dir=tree / "cache")["findings"] == []
+
+    def test_ruleset_changes_fingerprint(self):
+        """A different confidence threshold should use different cache entries"""
+        assert ruleset_fingerprint(0.5) == ruleset_fingerprint(0.5)
+        assert ruleset_fingerprint(0.5) != ruleset_fingerprint(0.9)
+
+    def test_candidates_change_fingerprint(self):
+        """Scanning tokens as well as assignments should use different cache entries"""
+        from shieldcommit.intelligent_detector import IntelligentDetector
+
+        assignments = ruleset_fingerprint(0.5)
+        IntelligentDetector.set_candidates("both")
+        try:
+            assert ruleset_fingerprint(0.5) != assignments
+        finally:
+            IntelligentDetector.set_candidates("assignments")
+        assert ruleset_fingerprint(0.5) == assignments
+
+    def test_recently_modified_files_are_not_stat_indexed(self, tree):
+        """Files inside the racy mtime window must be re-hashed next time"""
+        (tree / "fresh.py").write_text(SECRET)
+        cache = scanner.open_cache(tree / "cache", 0.5)
+        scanner.scan_one(tree / "fresh.py", cache=cache)
+        assert cache.lookup_stat(tree / "fresh.py", (tree / "fresh.py").stat()) is None
+
+    def test_no_temp_files_left(self, tree):
+        """Atomic writes should not leave temporary files behind"""
+        scan_files([str(tree / "app.py"), str(tree / "main.tf")], cache_dir=tree / "cache")
+        leftovers = [p for p in (tree / "cache").rglob(".tmp-*")]
+        assert leftovers == []
+
+    def test_prune_evicts_least_recently_used(self, tree):
+        """prune() should drop the oldest entries once over the size cap"""
+        cache = ResultCache(tree / "cache", "fp", max_bytes=10**6)
+        for i in range(5):
+            cache.put(f"key{i}", {"findings": [], "warnings": [], "verdict": "scan"})
+            entry = cache._entry_path("results", f"key{i}")
+            os.utime(entry, (1000 + i, 1000 + i))
+
+        size = cache._entry_path("results", "key0").stat().st_size
+        cache.max_bytes = size * 3
+        cache.prune()
+
+        assert cache.get("key0", "x") is None
+        assert cache.get("key1", "x") is None
+        assert cache.get("key4", "x") is not None
+
+    def test_prune_skips_walk_under_estimate(self, tree, monkeypatch):
+        """Once the size is known, a run that stays under the cap does not walk the cache"""
+        cache = ResultCache(tree / "cache", "fp")
+        cache.put("key0", {"findings": [], "warnings": [], "verdict": "scan"})
+        cache.prune()
+        usage = int((tree / "cache" / "usage").read_bytes())
+
+        def fail(*args, **kwargs):
+            raise AssertionError("cache was walked")
+
+        monkeypatch.setattr(os, "scandir", fail)
+        cache.put("key1", {"findings": [], "warnings": [], "verdict": "scan"})
+        cache.prune()
+        assert int((tree / "cache" / "usage").read_bytes()) > usage
+
+    def test_prune_walks_over_estimate(self, tree):
+        """An estimate over the cap should trigger eviction and be reset to the real size"""
+        cache = ResultCache(tree / "cache", "fp", max_bytes=10**6)
+        cache.put("key0", {"findings": [], "warnings": [], "verdict": "scan"})
+        size = cache._entry_path("results", "key0").stat().st_size
+        (tree / "cache" / "usage").write_bytes(b"%d" % 10**7)
+        cache.prune()
+        assert int((tree / "cache" / "usage").read_bytes()) == size
+
+    def test_secrets_not_stored(self, tree):
+        """Cache entries should hold neither the matched value nor its line"""
+        result = scan_files([str(tree / "app.py")], cache_dir=tree / "cache")
+        assert len(result["findings"]) == 1
+        stored = b"".join(p.read_bytes() for p in (tree / "cache").rglob("*") if p.is_file())
+        assert b"xK7mPqL9bJnR2tFhWdS4vE6cB8gA" not in stored
+        assert b"api_key" not in stored.replace(b'"variable": "api_key"', b"")
+
+    def test_values_read_back_from_content(self, tree):
+        """A hit should restore value and snippet from the lines, and miss if they changed"""
+        cache = ResultCache(tree / "cache", "fp")
+        cold = scanner.scan_one(tree / "app.py")
+        cache.put("key", cold)
+
+        warm = cache.get("key", str(tree / "app.py"), lambda: [SECRET.strip()])
+        assert warm["findings"] == cold["findings"]
+        assert cache.get("key", "x") is None
+        assert cache.get("key", "x", lambda: ['api_key = "somethingElseEntirely1"']) is None
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_unwritable_cache_does_not_fail_scan(self, tree):
+        """A cache directory that cannot be created must not break scanning"""
+        blocker = tree / "blocker"
+        blocker.write_text("not a directory")
+        result = scan_files([str(tree / "app.py")], cache_dir=blocker / "cache")
+        assert len(result["findings"]) == 1
@@ -0,0 +1,110 @@
+"""
+Tests for file classification before scanning
+Binaries and lockfiles are skipped, minified/generated files are sampled
+"""
+
+import codecs
+from pathlib import Path
+import tempfile
+
+from shieldcommit.classifier import classify_file, classify_head, classify_name, SCAN, SAMPLE, SKIP
+from shieldcommit.scanner import scan_files
+
+
+class TestClassifyHead:
+    """Test verdicts from the sniffed first block"""
+
+    def test_plain_source_is_scanned(self):
+        """Ordinary text files should be scanned normally"""
+        head = b'api_key = "abc"\nname = "x"\n'
+        assert classify_head("app.py", head, len(head)).verdict == SCAN
+
+    def test_nul_bytes_mean_binary(self):
+        """NUL bytes in the first block should skip the file"""
+        result = classify_head("blob.dat", b"\x89PNG\x00\x00\x01", 7)
+        assert result == (SKIP, "binary", None)
+
+    def test_binary_suffix(self):
+        """Known binary extensions should be skipped without sniffing"""
+        assert classify_head("dist/pkg-1.0-py3-none-any.whl", b"PK", 2).reason == "binary"
+
+    def test_lockfiles_are_skipped(self):
+        """Dependency lockfiles should be skipped"""
+        assert classify_head("web/package-lock.json", b"{}", 2) == (SKIP, "lockfile", None)
+        assert classify_head("poetry.lock", b"[[package]]", 11).verdict == SKIP
+
+    def test_size_cap(self):
+        """Files over the configured cap should be skipped"""
+        assert classify_head("app.py", b"x", 5000, max_size=1000).reason == "too_large"
+        assert classify_head("app.py", b"x", 5000).verdict == SCAN
+
+    def test_minified_by_line_length(self):
+        """A very long first line should mark the file as minified"""
+        head = b"var a=1;" * 1000
+        assert classify_head("bundle.js", head, len(head)) == (SAMPLE, "minified", None)
+
+    def test_minified_by_suffix(self):
+        """.min.js files should be sampled"""
+        assert classify_head("vendor/jquery.min.js", b"x", 1).verdict == SAMPLE
+
+    def test_generated_marker(self):
+        """Files carrying a generated-code marker should be sampled"""
+        head = b"// Code generated by protoc-gen-go. DO NOT EDIT.\npackage pb\n"
+        assert classify_head("api.pb.go", head, len(head)).reason == "generated"
+
+    def test_utf16_bom_is_text(self):
+        """UTF-16 files contain NULs but are text, decoded with the sniffed encoding"""
+        head = codecs.BOM_UTF16_LE + 'password = "x"'.encode("utf-16-le")
+        assert classify_head("creds.txt", head, len(head)) == (SCAN, "", "utf-16")
+
+    def test_latin1_text_is_not_binary(self):
+        """Non-UTF-8 text without control bytes should still be scanned"""
+        head = 'name = "café"\n'.encode("latin-1")
+        assert classify_head("notes.txt", head, len(head)).verdict == SCAN
+
+    def test_classify_name(self):
+        """Lockfiles and binary suffixes are decided from the name alone"""
+        assert classify_name("web/package-lock.json") == (SKIP, "lockfile", None)
+        assert classify_name("logo.PNG") == (SKIP, "binary", None)
+        assert classify_name("app.py") is None
+
+
+class TestScanWithClassification:
+    """Test classification inside scan_files"""
+
+    def test_skip_counts_in_summary(self):
+        """Skipped files should be counted by reason and not scanned"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            secret = 'api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"\n'
+            (Path(tmpdir) / "image.png").write_bytes(b"\x89PNG\x00" + secret.encode())
+            (Path(tmpdir) / "yarn.lock").write_text(secret)
+            (Path(tmpdir) / "app.py").write_text(secret)
+            paths = sorted(str(p) for p in Path(tmpdir).iterdir())
+
+            result = scan_files(paths)
+            assert len(result["findings"]) == 1
+            assert result["skipped"] == {"binary": 1, "lockfile": 1}
+            assert result["sampled"] == 0
+
+    def test_sampled_file_still_scanned(self):
+        """Minified files are scanned from their first block"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "bundle.min.js"
+            path.write_text('api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"\n')
+
+            result = scan_files([str(path)])
+            assert result["sampled"] == 1
+            assert len(result["findings"]) == 1
+
+    def test_utf16_file_is_decoded(self):
+        """Secrets in UTF-16 files should be found"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "creds.txt"
+            path.write_text('api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"\n', encoding="utf-16")
+
+            assert classify_file(path).encoding == "utf-16"
+            assert len(scan_files([str(path)])["findings"]) == 1
+
+    def test_missing_file_is_unreadable(self):
+        """classify_file should not raise for missing files"""
+        assert classify_file(Path("/nonexistent/shieldcommit.py")) == (SKIP, "unreadable", None)
@@ -0,0 +1,97 @@
+"""
+Tests for shared file content
+A file should be read once and shared by every detector
+"""
+
+from pathlib import Path
+import tempfile
+
+from shieldcommit.content import FileContent, as_lines
+from shieldcommit.aks_detector import scan_aks_versions
+from shieldcommit.eks_detector import scan_eks_versions, scan_eks_content
+from shieldcommit.rds_detector import scan_rds_versions
+from shieldcommit.scanner import scan_content, scan_path
+
+TERRAFORM = """
+resource "aws_eks_cluster" "main" {
+  kubernetes_version = "1.24"
+}
+
+resource "aws_db_instance" "postgres" {
+  engine         = "postgres"
+  engine_version = "12"
+  password       = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"
+}
+"""
+
+
+class TestFileContent:
+    """Test the FileContent views"""
+
+    def test_lines_and_lower_are_cached(self):
+        """Line and lowercase views should be computed once"""
+        content = FileContent("main.tf", "Kubernetes_Version = 1\nB")
+        assert content.lines == ["Kubernetes_Version = 1", "B"]
+        assert content.lines is content.lines
+        assert content.lower is content.lower
+        assert content.mentions("kubernetes_version")
+        assert not content.mentions("engine_version")
+
+    def test_from_path_missing_file(self):
+        """Unreadable files should return None"""
+        assert FileContent.from_path("/nonexistent/shieldcommit/file.tf") is None
+
+    def test_is_terraform(self):
+        """Only .tf and .json files are handled by the version detectors"""
+        assert FileContent("main.tf", "").is_terraform
+        assert FileContent("plan.json", "").is_terraform
+        assert not FileContent("app.py", "").is_terraform
+
+    def test_as_lines_accepts_all_forms(self):
+        """as_lines should accept text, FileContent or a list of lines"""
+        assert as_lines("a\nb") == ["a", "b"]
+        assert as_lines(FileContent("x.tf", "a\nb")) == ["a", "b"]
+        assert as_lines(["a", "b"]) == ["a", "b"]
+
+
+class TestSharedScan:
+    """Test that all detectors share a single read"""
+
+    def test_reads_file_once(self, monkeypatch):
+        """scan_path should call read_text exactly once for all seven detectors"""
+        reads = []
+        real_read_text = Path.read_text
+
+        def counting_read_text(self, *args, **kwargs):
+            reads.append(self)
+            return real_read_text(self, *args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = Path(tmpdir) / "main.tf"
+            file_path.write_text(TERRAFORM)
+
+            monkeypatch.setattr(Path, "read_text", counting_read_text)
+            findings, warnings = scan_path(file_path)
+
+            assert len(reads) == 1
+            assert len(findings) > 0
+            assert {w["type"] for w in warnings} == {"eks_version", "aks_version", "rds_version"}
+
+    def test_wrappers_match_shared_path(self):
+        """The path-based detector functions should give the same warnings"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = Path(tmpdir) / "main.tf"
+            file_path.write_text(TERRAFORM)
+
+            _, warnings = scan_content(FileContent.from_path(file_path))
+            expected = (
+                scan_eks_versions(file_path)
+                + scan_aks_versions(file_path)
+                + scan_rds_versions(file_path)
+            )
+            assert warnings == expected
+
+    def test_skips_non_terraform_content(self):
+        """Version detectors should ignore files that are not Terraform"""
+        content = FileContent("notes.txt", TERRAFORM)
+        assert scan_eks_content(content) == []
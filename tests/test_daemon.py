@@ -0,0 +1,202 @@
+"""
+Tests for the scan daemon
+A warm daemon must give the same results as scanning in-process, and clients
+must fall back cleanly when no daemon is running
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+import pytest
+from shieldcommit import daemon as daemon_module
+from shieldcommit.daemon import default_socket_path, request, scan_staged_remote, serve
+from shieldcommit.git_objects import staged_entries
+from shieldcommit.scanner import scan_staged
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+SECRET = 'api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"\n'
+
+ENV = dict(
+    os.environ,
+    GIT_AUTHOR_NAME="t",
+    GIT_AUTHOR_EMAIL="t@example.com",
+    GIT_COMMITTER_NAME="t",
+    GIT_COMMITTER_EMAIL="t@example.com",
+)
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env=ENV)
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 bytes, which pytest's tmp_path can exceed
+    directory = tempfile.mkdtemp(prefix="sc-")
+    yield os.path.join(directory, "d.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def daemon(socket_path):
+    thread = threading.Thread(target=serve, args=(socket_path,), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if request({"op": "ping"}, socket_path=socket_path):
+            break
+        time.sleep(0.05)
+    yield socket_path
+    request({"op": "shutdown"}, socket_path=socket_path)
+    thread.join(timeout=5)
+
+
+class TestClient:
+    """Test the client side without a daemon"""
+
+    def test_no_daemon(self, socket_path):
+        """Without a daemon the client should return None so callers scan in-process"""
+        assert request({"op": "ping"}, socket_path=socket_path) is None
+        assert scan_staged_remote([], socket_path=socket_path) is None
+
+    def test_stale_socket(self, socket_path):
+        """A socket file nobody listens on should not count as a daemon"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(socket_path)
+        assert request({"op": "ping"}, socket_path=socket_path) is None
+
+
+class TestDaemon:
+    """Test requests served by a running daemon"""
+
+    def test_ping(self, daemon):
+        """The daemon should answer with its version"""
+        from shieldcommit import __version__
+
+        assert request({"op": "ping"}, socket_path=daemon)["version"] == __version__
+
+    def test_socket_private(self, daemon):
+        """Only the owner may connect"""
+        assert os.stat(daemon).st_mode & 0o077 == 0
+
+    def test_other_users_daemon_ignored(self, daemon, monkeypatch):
+        """A daemon running as another user must not be sent requests or trusted"""
+        uid = os.getuid()
+        monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+        assert request({"op": "ping"}, socket_path=daemon) is None
+
+    def test_bad_request(self, daemon):
+        """Malformed requests are answered with an error and the daemon keeps serving"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(daemon)
+            sock.sendall(b"not json\n")
+            assert b"error" in sock.makefile("rb").readline()
+        assert request({"op": "unknown"}, socket_path=daemon) is None
+        assert request({"op": "ping"}, socket_path=daemon) is not None
+
+    def test_second_daemon_refused(self, daemon):
+        """Starting a daemon on a socket that is in use should fail"""
+        with pytest.raises(RuntimeError):
+            serve(daemon)
+
+    def test_shutdown(self, socket_path):
+        """A shutdown request should stop the daemon and remove its socket"""
+        thread = threading.Thread(target=serve, args=(socket_path,), daemon=True)
+        thread.start()
+        for _ in range(100):
+            if request({"op": "ping"}, socket_path=socket_path):
+                break
+            time.sleep(0.05)
+        assert request({"op": "shutdown"}, socket_path=socket_path) == {"stopping": True}
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert not os.path.exists(socket_path)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+class TestRemoteScan:
+    """Test staged scans handed to the daemon"""
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        git(tmp_path, "init", "-q")
+        (tmp_path / "leak.py").write_text(SECRET)
+        (tmp_path / "ok.py").write_text("x = 1\n")
+        git(tmp_path, "add", "-A")
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
+    def test_same_as_in_process(self, daemon, repo):
+        """Results from the daemon should match an in-process scan"""
+        entries = staged_entries()
+        remote = scan_staged_remote(entries, socket_path=daemon)
+        local = scan_staged(entries=entries)
+        assert remote == local
+        assert [f["file"] for f in remote["findings"]] == ["leak.py"]
+
+    def test_diff_only(self, daemon, repo):
+        """Diff-only scans should run in the client's repository"""
+        remote = scan_staged_remote(staged_entries(), diff_only=True, socket_path=daemon)
+        assert [f["file"] for f in remote["findings"]] == ["leak.py"]
+
+    def test_client_index(self, daemon, repo, monkeypatch):
+        """The daemon should read the index the client's git environment selects"""
+        index = repo / "other-index"
+        env = dict(ENV, GIT_INDEX_FILE=str(index))
+        subprocess.run(["git", "add", "ok.py"], cwd=repo, check=True, env=env)
+        monkeypatch.setenv("GIT_INDEX_FILE", str(index))
+        remote = scan_staged_remote([], diff_only=True, socket_path=daemon)
+        assert remote["findings"] == []
+
+    def test_cache_dir_relative_to_client(self, daemon, repo, tmp_path_factory, monkeypatch):
+        """A relative cache directory should be created under the client's cwd"""
+        sent = []
+        real_request = daemon_module.request
+
+        def recording_request(payload, socket_path=None):
+            sent.append(payload)
+            return real_request(payload, socket_path=socket_path)
+
+        monkeypatch.setattr(daemon_module, "request", recording_request)
+        scan_staged_remote(staged_entries(), cache_dir="cache", socket_path=daemon)
+        assert sent[0]["cache_dir"] == str(repo / "cache")
+
+        # The daemon runs elsewhere; a relative path in the request is still the client's
+        monkeypatch.chdir(tmp_path_factory.mktemp("daemon-cwd"))
+        assert real_request(dict(sent[0], cache_dir="other-cache"), socket_path=daemon)
+        assert (repo / "other-cache").is_dir()
+        assert not os.path.exists("other-cache")
+
+
+class TestSocketPath:
+    """Test where the socket goes without an explicit path"""
+
+    @pytest.fixture
+    def temp_dir(self, monkeypatch):
+        directory = tempfile.mkdtemp(prefix="sc-")
+        monkeypatch.delenv("SHIELDCOMMIT_SOCKET", raising=False)
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setattr(tempfile, "gettempdir", lambda: directory)
+        yield directory
+        shutil.rmtree(directory, ignore_errors=True)
+
+    def test_private_directory(self, temp_dir):
+        """Without a runtime directory the socket goes into a private directory"""
+        path = default_socket_path()
+        assert os.path.dirname(path) == os.path.join(temp_dir, f"shieldcommit-{os.getuid()}")
+
+        daemon_module._make_private_dir(os.path.dirname(path))
+        assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+
+    def test_shared_directory_refused(self, temp_dir):
+        """A directory others can enter (e.g. created by another user first) is refused"""
+        directory = os.path.dirname(default_socket_path())
+        os.mkdir(directory, 0o777)
+        os.chmod(directory, 0o777)
+        with pytest.raises(RuntimeError):
+            serve()
@@ -0,0 +1,170 @@
+"""
+Tests for added-lines-only scanning of the staged diff
+Only lines a commit adds are checked, with real neighbouring lines as context
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+from shieldcommit.diffscan import DiffLine, detect_in_diff_lines, parse_unified_diff
+from shieldcommit.diffscan import scan_staged_diff
+from shieldcommit.installer import install_hook
+
+SECRET = 'api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"'
+
+DIFF = b"""diff --git a/app.py b/app.py
+index 1111111..2222222 100644
+--- a/app.py
++++ b/app.py
+@@ -10,3 +10,4 @@ def main():
+ a = 1
+-b = 2
++b = 3
+++++ not a header
+ c = 4
+diff --git a/old.py b/old.py
+deleted file mode 100644
+--- a/old.py
++++ /dev/null
+@@ -1 +0,0 @@
+-gone = True
+diff --git a/new.py b/new.py
+new file mode 100644
+--- /dev/null
++++ b/new.py
+@@ -0,0 +1 @@
++x = 1
+\\ No newline at end of file
+"""
+
+
+def git(repo, *args):
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="t",
+        GIT_AUTHOR_EMAIL="t@example.com",
+        GIT_COMMITTER_NAME="t",
+        GIT_COMMITTER_EMAIL="t@example.com",
+    )
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env=env)
+
+
+class TestParseUnifiedDiff:
+    """Test mapping diff hunks back to new-file lines"""
+
+    def test_maps_lines_to_new_file(self):
+        """Context and added lines should carry their new-file line numbers"""
+        files = parse_unified_diff(DIFF)
+        assert files["app.py"] == [
+            DiffLine(10, "a = 1", False),
+            DiffLine(11, "b = 3", True),
+            DiffLine(12, "+++ not a header", True),
+            DiffLine(13, "c = 4", False),
+        ]
+
+    def test_skips_deleted_files(self):
+        """A file removed by the change has no new lines to scan"""
+        files = parse_unified_diff(DIFF)
+        assert "old.py" not in files
+        assert files["new.py"] == [DiffLine(1, "x = 1", True)]
+
+    def test_quoted_path(self):
+        """Paths git quotes (non-ASCII, spaces) should be decoded"""
+        diff = b'+++ "b/caf\\303\\251 file.py"\n@@ -0,0 +1 @@\n+x = 1\n'
+        assert list(parse_unified_diff(diff)) == ["café file.py"]
+
+
+class TestDetectInDiffLines:
+    """Test detection restricted to added lines"""
+
+    def test_only_added_lines_are_scanned(self):
+        """A secret on a context line was already committed and is not reported"""
+        lines = [DiffLine(1, SECRET, False), DiffLine(2, "x = 1", True)]
+        assert detect_in_diff_lines("a.py", lines) == []
+
+    def test_reports_new_file_line(self):
+        """Findings should point at the line in the new file"""
+        lines = [DiffLine(40, "x = 1", False), DiffLine(41, SECRET, True)]
+        findings = detect_in_diff_lines("a.py", lines)
+        assert len(findings) == 1
+        assert findings[0]["line"] == 41
+        assert findings[0]["file"] == "a.py"
+
+    def test_context_matches_full_scan(self):
+        """Added lines should get the same lookback context as a whole-file scan"""
+        from shieldcommit.intelligent_detector import detect_secrets
+
+        text = ["# example config", 'token = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"']
+        expected = detect_secrets(text)
+        lines = [DiffLine(1, text[0], False), DiffLine(2, text[1], True)]
+        found = detect_in_diff_lines("a.py", lines)
+        assert [f["confidence"] for f in found] == [f["confidence"] for f in expected]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+class TestScanStagedDiff:
+    """Test diff-only scanning in a real repository"""
+
+    def test_existing_secret_not_reported(self, tmp_path):
+        """Editing a file that already holds a secret should only scan the edit"""
+        git(tmp_path, "init", "-q")
+        body = [f"value_{i} = {i}" for i in range(50)]
+        (tmp_path / "big.py").write_text("\n".join([SECRET] + body) + "\n")
+        git(tmp_path, "add", ".")
+        git(tmp_path, "commit", "-q", "-m", "init")
+
+        (tmp_path / "big.py").write_text("\n".join([SECRET] + body + ["extra = 1"]) + "\n")
+        git(tmp_path, "add", ".")
+        assert scan_staged_diff(cwd=str(tmp_path))["findings"] == []
+
+        (tmp_path / "big.py").write_text("\n".join([SECRET] + body + [SECRET]) + "\n")
+        git(tmp_path, "add", ".")
+        findings = scan_staged_diff(cwd=str(tmp_path))["findings"]
+        assert [(f["file"], f["line"]) for f in findings] == [("big.py", 52)]
+
+    def test_skips_lockfiles(self, tmp_path):
+        """Lockfiles are classified by name and never scanned"""
+        git(tmp_path, "init", "-q")
+        (tmp_path / "package-lock.json").write_text(SECRET + "\n")
+        git(tmp_path, "add", ".")
+        result = scan_staged_diff(cwd=str(tmp_path))
+        assert result["findings"] == []
+        assert sum(result["skipped"].values()) == 1
+
+    @pytest.mark.parametrize("config", ["diff.noprefix", "diff.mnemonicPrefix"])
+    def test_prefix_config_ignored(self, tmp_path, config):
+        """Paths should not depend on the user's diff prefix settings"""
+        git(tmp_path, "init", "-q")
+        git(tmp_path, "config", config, "true")
+        (tmp_path / "b").mkdir()
+        (tmp_path / "b" / "k.py").write_text(SECRET + "\n")
+        (tmp_path / "cfg.py").write_text(SECRET + "\n")
+        git(tmp_path, "add", ".")
+        findings = scan_staged_diff(cwd=str(tmp_path))["findings"]
+        assert sorted(f["file"] for f in findings) == ["b/k.py", "cfg.py"]
+
+    def test_textconv_ignored(self, tmp_path):
+        """A textconv filter should not hide the staged bytes from the scan"""
+        git(tmp_path, "init", "-q")
+        git(tmp_path, "config", "diff.hide.textconv", "true")
+        (tmp_path / ".gitattributes").write_text("*.py diff=hide\n")
+        (tmp_path / "cfg.py").write_text(SECRET + "\n")
+        git(tmp_path, "add", ".")
+        findings = scan_staged_diff(cwd=str(tmp_path))["findings"]
+        assert [f["file"] for f in findings] == ["cfg.py"]
+
+
+class TestInstallHook:
+    """Test the pre-commit hook the installer writes"""
+
+    def test_scans_staged_content_by_default(self, tmp_path):
+        """The hook should scan the whole staged content unless diff mode is asked for"""
+        install_hook(tmp_path)
+        hook = (tmp_path / ".git" / "hooks" / "pre-commit").read_text()
+        assert "shieldcommit scan\n" in hook
+
+        install_hook(tmp_path, diff=True)
+        hook = (tmp_path / ".git" / "hooks" / "pre-commit").read_text()
+        assert "shieldcommit scan --diff\n" in hook
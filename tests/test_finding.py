@@ -0,0 +1,97 @@
+"""
+Unit tests for compact finding records
+A Finding must read exactly like the finding dicts it replaces
+"""
+
+import json
+import pickle
+
+import pytest
+from shieldcommit.finding import SNIPPET_CHARS, Finding, to_json
+
+
+def make(**changes):
+    finding = Finding(
+        "app.py",
+        3,
+        'api_key = "xK7mPqL9bJnR2tFh"',
+        "xK7mPqL9bJnR2tFh",
+        "api_key",
+        0.7,
+        "High Entropy",
+    )
+    return finding.replace(**changes) if changes else finding
+
+
+class TestFinding:
+    """Test the mapping interface and compact storage"""
+
+    def test_same_as_dict(self):
+        """Keys, order and values should be those of the finding dicts"""
+        assert make().to_dict() == {
+            "file": "app.py",
+            "line": 3,
+            "snippet": 'api_key = "xK7mPqL9bJnR2tFh"',
+            "matched_value": "xK7mPqL9bJnR2tFh",
+            "variable": "api_key",
+            "confidence": 0.7,
+            "detection_method": "High Entropy",
+            "pattern": "Intelligent Detection: High Entropy",
+        }
+        assert make() == make().to_dict()
+        assert list(make()) == list(make().to_dict())
+
+    def test_commit_only_when_set(self):
+        """'commit' should only be a key of history findings"""
+        assert "commit" not in make() and make().get("commit") is None
+        attributed = make(commit="abc", file="other.py")
+        assert attributed["commit"] == "abc"
+        assert list(attributed)[-1] == "commit"
+        assert dict(attributed)["file"] == "other.py"
+
+    def test_setitem(self):
+        """Stored fields can be assigned like dict keys, derived ones cannot"""
+        finding = make()
+        finding["file"] = "x.py"
+        assert finding.file == "x.py"
+        with pytest.raises(KeyError):
+            finding["pattern"] = "x"
+        with pytest.raises(KeyError):
+            finding["unknown"] = 1
+
+    def test_interned(self):
+        """Equal paths and methods should be stored once"""
+        path = "".join(["src/", "app.py"])
+        assert make(file=path).file is make(file="src/app.py").file
+        assert make(detection_method="".join(["High ", "Entropy"])).detection_method is (
+            make().detection_method
+        )
+
+    def test_snippet(self):
+        """The snippet is the start of the line; long lines are not kept whole"""
+        line = "x" * 5000
+        finding = make(snippet=line)
+        assert finding["snippet"] == "x" * SNIPPET_CHARS
+        assert finding._snippet == "x" * SNIPPET_CHARS
+        assert finding["matched_value"] == "xK7mPqL9bJnR2tFh"
+
+    def test_value_kept_as_offsets(self):
+        """A value inside the snippet is sliced from it; one past it is kept as is"""
+        finding = make()
+        assert finding._value is None and finding["matched_value"] == "xK7mPqL9bJnR2tFh"
+        line = "x" * 300 + ' = "xK7mPqL9bJnR2tFh"'
+        finding = Finding("a.py", 1, line, "xK7mPqL9bJnR2tFh", "", 0.7, "High Entropy", column=304)
+        assert finding["matched_value"] == "xK7mPqL9bJnR2tFh"
+        assert finding["snippet"] == "x" * SNIPPET_CHARS
+        assert pickle.loads(pickle.dumps(finding)) == finding
+
+    def test_no_instance_dict(self):
+        """Findings should be slotted"""
+        assert not hasattr(make(), "__dict__")
+
+    def test_round_trips(self):
+        """Pickling, JSON and from_dict should keep every key"""
+        finding = make(commit="abc")
+        assert pickle.loads(pickle.dumps(finding)) == finding
+        assert json.loads(json.dumps(finding, default=to_json)) == finding.to_dict()
+        assert Finding.from_dict(finding.to_dict()) == finding
@@ -0,0 +1,112 @@
+"""
+Tests for staged-blob scanning through git cat-file --batch
+The hook must scan exactly what will be committed
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+from shieldcommit.content import git_blob_id
+from shieldcommit.git_objects import CatFileBatch, parse_raw_diff, staged_entries
+from shieldcommit.scanner import scan_staged
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+SECRET = 'api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"\n'
+
+
+def git(repo, *args):
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="t",
+        GIT_AUTHOR_EMAIL="t@example.com",
+        GIT_COMMITTER_NAME="t",
+        GIT_COMMITTER_EMAIL="t@example.com",
+    )
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env=env)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    (tmp_path / "keep.py").write_text("x = 1\n")
+    (tmp_path / "gone.py").write_text(SECRET)
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+class TestParseRawDiff:
+    """Test parsing of `git diff --raw -z` output"""
+
+    def test_skips_deletions_and_gitlinks(self):
+        """Deleted files and submodule entries should not be scanned"""
+        oid = "a" * 40
+        zero = "0" * 40
+        raw = (
+            f":000000 100644 {zero} {oid} A\0new.py\0"
+            f":100644 000000 {oid} {zero} D\0old.py\0"
+            f":000000 160000 {zero} {oid} A\0vendor/lib\0"
+            f":100644 100755 {oid} {oid} M\0run.sh\0"
+        ).encode()
+        entries = parse_raw_diff(raw)
+        assert [(e.path, e.status) for e in entries] == [("new.py", "A"), ("run.sh", "M")]
+        assert entries[1].mode == "100755"
+
+    def test_empty_output(self):
+        """No staged changes should give no entries"""
+        assert parse_raw_diff(b"") == []
+
+
+class TestStagedScan:
+    """Test scanning staged blobs in a real repository"""
+
+    def test_scans_staged_version_not_working_tree(self, repo):
+        """A secret that is staged but removed from the working tree must be caught"""
+        (repo / "app.py").write_text(SECRET)
+        git(repo, "add", "app.py")
+        (repo / "app.py").write_text("clean = True\n")
+
+        result = scan_staged(cwd=str(repo))
+        assert len(result["findings"]) == 1
+        assert result["findings"][0]["file"] == "app.py"
+
+    def test_ignores_unstaged_secret(self, repo):
+        """Unstaged edits are not part of the commit and must not block it"""
+        (repo / "app.py").write_text("clean = True\n")
+        git(repo, "add", "app.py")
+        (repo / "app.py").write_text(SECRET)
+
+        assert scan_staged(cwd=str(repo))["findings"] == []
+
+    def test_skips_deleted_files(self, repo):
+        """Staged deletions should not be scanned"""
+        git(repo, "rm", "-q", "gone.py")
+        assert staged_entries(cwd=str(repo)) == []
+        assert scan_staged(cwd=str(repo))["findings"] == []
+
+    def test_staged_blob_ids(self, repo):
+        """Entries should carry the staged blob id"""
+        (repo / "app.py").write_text(SECRET)
+        git(repo, "add", "app.py")
+        entries = staged_entries(cwd=str(repo))
+        assert [(e.path, e.blob_id) for e in entries] == [("app.py", git_blob_id(SECRET.encode()))]
+
+    def test_cat_file_batch_streams_many_objects(self, repo):
+        """One cat-file process should serve several objects, and report missing ones"""
+        ids = []
+        for name in ("a.txt", "b.txt"):
+            (repo / name).write_text(name)
+            git(repo, "add", name)
+            ids.append(git_blob_id(name.encode()))
+
+        with CatFileBatch(cwd=str(repo)) as cat:
+            assert cat.read(ids[0]) == ("blob", b"a.txt")
+            assert cat.read("f" * 40) is None
+            assert cat.read(ids[1]) == ("blob", b"b.txt")
+
+    def test_not_a_repository(self, tmp_path):
+        """Outside a git repository there is nothing staged"""
+        assert staged_entries(cwd=str(tmp_path)) == []
@@ -0,0 +1,140 @@
+"""
+Tests for whole-history scanning
+Each distinct blob is scanned once and attributed to every commit that introduced it
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+from shieldcommit.history import HistoryError, Introduction, blob_introductions, parse_log_raw
+from shieldcommit.history import scan_history, scan_introductions
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+SECRET = 'api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"\n'
+
+
+def git(repo, *args):
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="t",
+        GIT_AUTHOR_EMAIL="t@example.com",
+        GIT_COMMITTER_NAME="t",
+        GIT_COMMITTER_EMAIL="t@example.com",
+    )
+    res = subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env=env)
+    return res.stdout.decode().strip()
+
+
+def commit_all(repo, message):
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+class TestParseLogRaw:
+    """Test parsing of `git log --raw -c -z` output"""
+
+    def test_plain_and_merge_records(self):
+        """Single-parent and combined (merge) records should both be read"""
+        a, b, zero = "a" * 40, "b" * 40, "0" * 40
+        fields = [
+            b"",
+            b"commit " + b"1" * 40,
+            f"\n::100644 100644 100644 {a} {a} {b} MM".encode(),
+            b"conflict.py",
+            b"",
+            b"commit " + b"2" * 40,
+            f"\n:000000 100644 {zero} {a} A".encode(),
+            b"new.py",
+            f":100644 000000 {a} {zero} D".encode(),
+            b"gone.py",
+            f":000000 160000 {zero} {b} A".encode(),
+            b"vendor/lib",
+        ]
+        assert list(parse_log_raw(fields)) == [
+            ("1" * 40, "conflict.py", b),
+            ("2" * 40, "new.py", a),
+        ]
+
+
+class TestScanHistory:
+    """Test scanning a real repository history"""
+
+    def test_deleted_secret_is_found(self, tmp_path):
+        """A secret removed from the tip is still in history"""
+        git(tmp_path, "init", "-q")
+        (tmp_path / "app.py").write_text(SECRET)
+        leaked = commit_all(tmp_path, "leak")
+        (tmp_path / "app.py").write_text("clean = True\n")
+        commit_all(tmp_path, "fix")
+
+        result = scan_history(cwd=str(tmp_path))
+        assert [(f["file"], f["commit"]) for f in result["findings"]] == [("app.py", leaked)]
+
+    def test_identical_blobs_scanned_once(self, tmp_path, monkeypatch):
+        """Copies of a blob across paths and commits should cost one scan"""
+        from shieldcommit import history
+
+        git(tmp_path, "init", "-q")
+        (tmp_path / "a.py").write_text(SECRET)
+        first = commit_all(tmp_path, "one")
+        (tmp_path / "b.py").write_text(SECRET)
+        second = commit_all(tmp_path, "two")
+
+        calls = []
+        real = history.scan_blob
+
+        def counting(path, blob_id, *args, **kwargs):
+            calls.append(blob_id)
+            return real(path, blob_id, *args, **kwargs)
+
+        monkeypatch.setattr(history, "scan_blob", counting)
+        result = scan_history(cwd=str(tmp_path))
+
+        assert len(calls) == 1
+        assert result["blobs"] == 1
+        assert sorted((f["file"], f["commit"]) for f in result["findings"]) == sorted(
+            [("a.py", first), ("b.py", second)]
+        )
+
+    def test_reports_verdict_memo(self, tmp_path):
+        """The result should include the verdict memo counters"""
+        git(tmp_path, "init", "-q")
+        (tmp_path / "app.py").write_text(SECRET)
+        commit_all(tmp_path, "leak")
+
+        verdicts = scan_history(cwd=str(tmp_path))["verdicts"]
+        assert set(verdicts) == {"hits", "misses", "entries", "maxsize"}
+
+    def test_rev_range(self, tmp_path):
+        """Only blobs introduced within the range should be scanned"""
+        git(tmp_path, "init", "-q")
+        (tmp_path / "app.py").write_text(SECRET)
+        commit_all(tmp_path, "leak")
+        (tmp_path / "other.py").write_text("x = 1\n")
+        commit_all(tmp_path, "more")
+
+        assert list(blob_introductions(["HEAD~1..HEAD"], cwd=str(tmp_path))) != []
+        assert scan_history(["HEAD~1..HEAD"], cwd=str(tmp_path))["findings"] == []
+
+    def test_unknown_revision_raises(self, tmp_path):
+        """A revision git cannot resolve must not look like an empty history"""
+        git(tmp_path, "init", "-q")
+        (tmp_path / "app.py").write_text("x = 1\n")
+        commit_all(tmp_path, "one")
+
+        with pytest.raises(HistoryError, match="git log failed"):
+            blob_introductions(["deadbeef" * 5], cwd=str(tmp_path))
+
+    def test_missing_blob_raises(self, tmp_path):
+        """An introduced blob that cannot be read must not be passed as skipped"""
+        git(tmp_path, "init", "-q")
+        (tmp_path / "app.py").write_text("x = 1\n")
+        commit = commit_all(tmp_path, "one")
+
+        missing = {"1" * 40: [Introduction(commit, "app.py")]}
+        with pytest.raises(HistoryError, match="could not be read"):
+            scan_introductions(missing, cwd=str(tmp_path))
@@ -0,0 +1,85 @@
+"""
+Unit tests for the verdict memo
+Bounded LRU map from candidate keys to (confidence, method) verdicts
+"""
+
+import threading
+
+from shieldcommit.memo import DEFAULT_SIZE, VerdictMemo, configured_size
+
+
+class TestVerdictMemo:
+    """Test lookups, eviction and counters"""
+
+    def test_get_and_put(self):
+        """A stored verdict should be returned, unknown keys give None"""
+        memo = VerdictMemo(4)
+        memo.put("a", (0.9, "Entropy Analysis"))
+        assert memo.get("a") == (0.9, "Entropy Analysis")
+        assert memo.get("b") is None
+
+    def test_evicts_least_recently_used(self):
+        """Beyond maxsize the entry used longest ago should go first"""
+        memo = VerdictMemo(2)
+        memo.put("a", (0.1, "x"))
+        memo.put("b", (0.2, "x"))
+        memo.get("a")
+        memo.put("c", (0.3, "x"))
+        assert len(memo) == 2
+        assert memo.get("b") is None
+        assert memo.get("a") == (0.1, "x")
+
+    def test_counters(self):
+        """Hits and misses should be counted and reset by clear()"""
+        memo = VerdictMemo(4)
+        memo.put("a", (0.1, "x"))
+        memo.get("a")
+        memo.get("a")
+        memo.get("b")
+        assert memo.stats() == {"hits": 2, "misses": 1, "entries": 1, "maxsize": 4}
+        memo.clear()
+        assert memo.stats() == {"hits": 0, "misses": 0, "entries": 0, "maxsize": 4}
+
+    def test_get_many(self):
+        """A key repeated in a batch should miss once, its repeats count as hits"""
+        memo = VerdictMemo(4)
+        memo.put("a", (0.1, "x"))
+        assert memo.get_many(["a", "b", "b", "a"]) == [(0.1, "x"), None, None, (0.1, "x")]
+        assert (memo.hits, memo.misses) == (3, 1)
+
+    def test_resize(self):
+        """Shrinking should evict the oldest entries, 0 should disable the memo"""
+        memo = VerdictMemo(4)
+        for key in "abcd":
+            memo.put(key, (0.5, key))
+        memo.resize(2)
+        assert memo.get("a") is None and memo.get("d") == (0.5, "d")
+        memo.resize(0)
+        memo.put("e", (0.5, "e"))
+        assert len(memo) == 0
+
+    def test_size_from_environment(self, monkeypatch):
+        """$SHIELDCOMMIT_VERDICT_MEMO should set the default size, if it is a number"""
+        monkeypatch.setenv("SHIELDCOMMIT_VERDICT_MEMO", "10")
+        assert VerdictMemo().maxsize == 10
+        monkeypatch.setenv("SHIELDCOMMIT_VERDICT_MEMO", "lots")
+        assert configured_size() == DEFAULT_SIZE
+
+    def test_threads(self):
+        """Concurrent use should keep the bound and count every lookup"""
+        memo = VerdictMemo(50)
+
+        def work(offset):
+            for i in range(1000):
+                key = (offset + i) % 100
+                if memo.get(key) is None:
+                    memo.put(key, (0.5, "x"))
+
+        threads = [threading.Thread(target=work, args=(n * 7,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = memo.stats()
+        assert stats["hits"] + stats["misses"] == 4000
+        assert stats["entries"] <= 50
@@ -0,0 +1,152 @@
+"""
+Tests for parallel multi-process scanning
+Results must match a serial scan, in the same order
+"""
+
+import multiprocessing
+import time
+from pathlib import Path
+import tempfile
+
+import pytest
+from shieldcommit import parallel, scanner
+from shieldcommit.parallel import default_jobs, scan_files_parallel
+from shieldcommit.scanner import scan_files
+
+
+def _write_tree(tmpdir):
+    """Create a mix of files with secrets, version warnings and clean content."""
+    paths = []
+    for i in range(6):
+        path = Path(tmpdir) / f"app{i}.py"
+        # Vary the size so the largest-first scheduling reorders the work
+        padding = "\n".join(f"x{n} = {n}" for n in range(i * 50))
+        path.write_text(f'{padding}\napi_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8g{i}"\n')
+        paths.append(str(path))
+
+    tf = Path(tmpdir) / "main.tf"
+    tf.write_text('resource "aws_eks_cluster" "main" {\n  kubernetes_version = "1.24"\n}\n')
+    paths.append(str(tf))
+
+    clean = Path(tmpdir) / "README.md"
+    clean.write_text("Nothing to see here\n")
+    paths.append(str(clean))
+    return paths
+
+
+class TestParallelScan:
+    """Test the process-pool execution mode"""
+
+    def test_matches_serial_order(self):
+        """Parallel results should be identical to a serial scan"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = _write_tree(tmpdir)
+            serial = scan_files(paths)
+            result = scan_files_parallel(paths, jobs=3)
+
+            assert result["findings"] == serial["findings"]
+            assert result["warnings"] == serial["warnings"]
+            assert result["timed_out"] == []
+            assert result["interrupted"] is False
+
+    def test_scan_files_dispatches_on_jobs(self):
+        """scan_files(jobs=N) should use the process pool"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = _write_tree(tmpdir)
+            result = scan_files(paths, jobs=2)
+            assert len(result["findings"]) == 6
+            assert "interrupted" in result
+
+    def test_workers_use_candidate_mode(self):
+        """Workers should check the same candidates as the parent process"""
+        from shieldcommit.intelligent_detector import IntelligentDetector
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "run.sh"
+            path.write_text("deploy --token xK7mPqL9bJnR2tFhWdS4vE6cB8gA\n")
+            assert scan_files_parallel([str(path)], jobs=1)["findings"] == []
+            IntelligentDetector.set_candidates("tokens")
+            try:
+                result = scan_files_parallel([str(path)], jobs=1)
+            finally:
+                IntelligentDetector.set_candidates("assignments")
+            assert [f["line"] for f in result["findings"]] == [1]
+
+    def test_paths_read_as_needed(self, monkeypatch):
+        """Paths are taken from an iterator a window at a time, not listed up front"""
+        monkeypatch.setattr(parallel, "_LOOKAHEAD", 2)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = _write_tree(tmpdir)
+            taken = []
+
+            def walk():
+                for path in paths:
+                    taken.append(path)
+                    yield path
+
+            stream = walk()
+            result = scan_files_parallel(stream, jobs=1)
+            assert result["findings"] == scan_files(paths)["findings"]
+            assert len(taken) == len(paths)
+
+            stream = walk()
+            taken.clear()
+            monkeypatch.setattr(parallel, "_Worker", None)  # no worker may start
+            with pytest.raises(TypeError):
+                scan_files_parallel(stream, jobs=1)
+            assert len(taken) == 2
+
+    def test_zero_timeout_disables_watchdog(self, monkeypatch):
+        """file_timeout=0 should reach the pool as 'no limit', None as the default"""
+        calls = []
+        monkeypatch.setattr(
+            parallel, "scan_files_parallel", lambda paths, **kw: calls.append(kw) or {}
+        )
+        scan_files([], jobs=2, file_timeout=0)
+        scan_files([], jobs=2)
+        assert [kw["file_timeout"] for kw in calls] == [0, parallel.DEFAULT_FILE_TIMEOUT]
+
+    def test_ignores_missing_paths(self):
+        """Paths that are not files should be skipped"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = scan_files_parallel([str(Path(tmpdir) / "missing.py"), tmpdir], jobs=2)
+            assert result["findings"] == []
+            assert result["warnings"] == []
+
+    @pytest.mark.skipif(
+        multiprocessing.get_start_method() != "fork", reason="patch must reach the workers"
+    )
+    def test_watchdog_abandons_slow_file(self, monkeypatch):
+        """A file that exceeds the per-file timeout should be reported, not hang the pool"""
+        real_scan_path = scanner.scan_path
+
+        def slow_scan_path(path, *args, **kwargs):
+            if path.name == "app0.py":
+                time.sleep(30)
+            return real_scan_path(path, *args, **kwargs)
+
+        monkeypatch.setattr(scanner, "scan_path", slow_scan_path)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = _write_tree(tmpdir)
+            start = time.monotonic()
+            result = scan_files_parallel(paths, jobs=2, file_timeout=0.5)
+
+            assert time.monotonic() - start < 10
+            assert result["timed_out"] == [paths[0]]
+            # Every other file is still scanned by the replacement worker
+            assert len(result["findings"]) == 5
+            assert result["interrupted"] is False
+
+
+class TestDefaultJobs:
+    """Test worker count selection"""
+
+    def test_respects_cpu_quota(self, monkeypatch):
+        """A container CPU quota should cap the worker count"""
+        monkeypatch.setattr(parallel, "_cgroup_cpu_quota", lambda: 1.5)
+        assert default_jobs() <= 2
+
+    def test_at_least_one_job(self, monkeypatch):
+        """Should never return zero workers"""
+        monkeypatch.setattr(parallel, "_cgroup_cpu_quota", lambda: 0.1)
+        assert default_jobs() == 1
@@ -0,0 +1,89 @@
+"""
+Tests for the asynchronous read/detect pipeline
+Results must match a serial scan, and bytes in flight must stay under the budget
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from shieldcommit import pipeline, scanner
+from shieldcommit.pipeline import ByteBudget, scan_files_async
+from shieldcommit.scanner import scan_files
+
+
+def _write_tree(tmpdir):
+    """Create files with secrets, a version warning, a lockfile and clean content."""
+    paths = []
+    for i in range(12):
+        path = Path(tmpdir) / f"app{i}.py"
+        padding = "\n".join(f"x{n} = {n}" for n in range(i * 40))
+        path.write_text(f'{padding}\napi_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8g{i}"\n')
+        paths.append(str(path))
+
+    tf = Path(tmpdir) / "main.tf"
+    tf.write_text('resource "aws_eks_cluster" "main" {\n  kubernetes_version = "1.24"\n}\n')
+    lock = Path(tmpdir) / "package-lock.json"
+    lock.write_text("{}\n")
+    return paths + [str(tf), str(lock), str(Path(tmpdir) / "missing.py"), str(tmpdir)]
+
+
+class TestPipeline:
+    """Test the async pipeline execution mode"""
+
+    def test_matches_serial_order(self, tmp_path):
+        """Pipelined results should be identical to a serial scan"""
+        paths = _write_tree(tmp_path)
+        serial = scan_files(paths)
+        result = asyncio.run(scan_files_async(paths, readers=4))
+        assert result == serial
+
+    def test_scanner_option(self, tmp_path):
+        """scan_files(readers=N) should run the pipeline"""
+        paths = _write_tree(tmp_path)
+        assert scan_files(paths, readers=3) == scan_files(paths)
+
+    def test_with_cache(self, tmp_path):
+        """Cold and warm cached runs should give the serial result"""
+        tree = tmp_path / "tree"
+        tree.mkdir()
+        paths = _write_tree(tree)
+        serial = scan_files(paths)
+        cache_dir = tmp_path / "cache"
+        assert asyncio.run(scan_files_async(paths, cache_dir=cache_dir)) == serial
+        assert asyncio.run(scan_files_async(paths, cache_dir=cache_dir)) == serial
+
+    def test_bytes_in_flight_bounded(self, tmp_path, monkeypatch):
+        """Read-but-unscanned bytes must never exceed the budget"""
+        paths = _write_tree(tmp_path)
+        limit = 4096
+        peak = []
+        real_acquire = ByteBudget.acquire
+
+        async def recording_acquire(self, size):
+            charged = await real_acquire(self, size)
+            peak.append(self.used)
+            return charged
+
+        monkeypatch.setattr(ByteBudget, "acquire", recording_acquire)
+        result = asyncio.run(scan_files_async(paths, readers=8, max_bytes_in_flight=limit))
+        assert len(result["findings"]) == 12
+        assert max(peak) <= limit
+
+    def test_detector_failure_propagates(self, tmp_path, monkeypatch):
+        """An error in the detector stage must surface instead of hanging the readers"""
+        paths = _write_tree(tmp_path)
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("detector failed")
+
+        monkeypatch.setattr(pipeline, "finish_one", broken)
+        with pytest.raises(RuntimeError, match="detector failed"):
+            asyncio.run(scan_files_async(paths, readers=2))
+
+    def test_load_and_finish_match_scan_one(self, tmp_path):
+        """The two halves of scan_one should compose to the same result"""
+        paths = _write_tree(tmp_path)
+        for p in paths[:3]:
+            loaded = scanner.load_one(Path(p))
+            assert scanner.finish_one(loaded) == scanner.scan_one(Path(p))
@@ -0,0 +1,140 @@
+"""
+Tests for server-side pre-receive scanning
+Only what a push introduces is scanned, each blob once, within a time budget
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+from shieldcommit.history import HistoryError
+from shieldcommit.installer import install_pre_receive_hook
+from shieldcommit.prereceive import RefUpdate, parse_updates, pushed_revisions, scan_push
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+SECRET = 'api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"\n'
+ZERO = "0" * 40
+
+ENV = dict(
+    os.environ,
+    GIT_AUTHOR_NAME="t",
+    GIT_AUTHOR_EMAIL="t@example.com",
+    GIT_COMMITTER_NAME="t",
+    GIT_COMMITTER_EMAIL="t@example.com",
+)
+
+
+def git(repo, *args):
+    res = subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env=ENV)
+    return res.stdout.decode().strip()
+
+
+def commit_all(repo, message):
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def pushed(tmp_path):
+    """A repo whose main is at `base`, plus unreferenced commits as if just received."""
+    git(tmp_path, "init", "-q")
+    (tmp_path / "old.py").write_text(SECRET)
+    base = commit_all(tmp_path, "base")
+    git(tmp_path, "branch", "-q", "-M", "main")
+
+    git(tmp_path, "checkout", "-q", "--detach")
+    for i in range(20):
+        (tmp_path / "app.py").write_text(f"x = {i}\n")
+        commit_all(tmp_path, f"c{i}")
+    (tmp_path / "leak.py").write_text(SECRET)
+    (tmp_path / "copy.py").write_text(SECRET)
+    tip = commit_all(tmp_path, "leak")
+    git(tmp_path, "checkout", "-q", "main")
+    return tmp_path, base, tip
+
+
+class TestParsing:
+    """Test pre-receive input handling"""
+
+    def test_parse_updates(self):
+        """Each `old new ref` line becomes one update"""
+        lines = [f"{ZERO} {'a' * 40} refs/heads/main\n", "garbage\n"]
+        assert parse_updates(lines) == [RefUpdate(ZERO, "a" * 40, "refs/heads/main")]
+
+    def test_deletions_add_nothing(self):
+        """A push that only deletes refs has nothing to scan"""
+        assert pushed_revisions([RefUpdate("a" * 40, ZERO, "refs/heads/old")]) == []
+
+    def test_tips_combined(self):
+        """All pushed refs are walked together"""
+        updates = [
+            RefUpdate(ZERO, "b" * 40, "refs/heads/x"),
+            RefUpdate(ZERO, "b" * 40, "refs/tags/v1"),
+            RefUpdate(ZERO, "c" * 40, "refs/heads/y"),
+        ]
+        assert pushed_revisions(updates) == ["b" * 40, "c" * 40, "--not", "--all"]
+
+
+class TestScanPush:
+    """Test scanning a push in a real repository"""
+
+    def test_scans_only_new_blobs_once(self, pushed):
+        """Blobs already on the server are not rescanned; copies are scanned once"""
+        repo, base, tip = pushed
+        result = scan_push([RefUpdate(base, tip, "refs/heads/main")], cwd=str(repo))
+        assert sorted(f["file"] for f in result["findings"]) == ["copy.py", "leak.py"]
+        # 20 versions of app.py plus the one secret blob shared by two paths
+        assert result["blobs"] == 21
+        assert result["unscanned"] == 0
+
+    def test_budget(self, pushed):
+        """Blobs left when the budget runs out are reported as unscanned"""
+        repo, base, tip = pushed
+        result = scan_push([RefUpdate(base, tip, "refs/heads/main")], budget=1e-9, cwd=str(repo))
+        assert result["unscanned"] == 21
+
+    def test_unknown_tip_raises(self, pushed):
+        """A push whose commits cannot be listed must not pass as empty"""
+        repo, base, _ = pushed
+        with pytest.raises(HistoryError):
+            scan_push([RefUpdate(base, "deadbeef" * 5, "refs/heads/main")], cwd=str(repo))
+
+    @pytest.mark.skipif(shutil.which("shieldcommit") is None, reason="CLI not installed")
+    def test_hook_rejects_unscannable_push(self, pushed):
+        """The hook should reject a push it cannot scan"""
+        repo, base, _ = pushed
+        stdin = f"{base} {'deadbeef' * 5} refs/heads/main\n".encode()
+        cmd = ["shieldcommit", "pre-receive", "--no-cache"]
+        res = subprocess.run(cmd, cwd=repo, input=stdin, capture_output=True, env=ENV)
+        assert res.returncode != 0
+        assert b"Push rejected" in res.stdout
+
+    @pytest.mark.skipif(shutil.which("shieldcommit") is None, reason="CLI not installed")
+    def test_hook_rejects_push(self, tmp_path):
+        """An installed hook should decline a push that adds a secret"""
+        server = tmp_path / "server.git"
+        git(tmp_path, "init", "-q", "--bare", str(server))
+        install_pre_receive_hook(server)
+
+        client = tmp_path / "client"
+        client.mkdir()
+        git(client, "init", "-q")
+
+        def push():
+            # The hook inherits this environment; keep its cache out of the home directory
+            env = dict(ENV, SHIELDCOMMIT_CACHE_DIR=str(tmp_path / "cache"))
+            cmd = ["git", "push", "-q", str(server), "HEAD:refs/heads/main"]
+            return subprocess.run(cmd, cwd=client, capture_output=True, env=env)
+
+        (client / "ok.py").write_text("x = 1\n")
+        commit_all(client, "ok")
+        assert push().returncode == 0
+
+        (client / "leak.py").write_text(SECRET)
+        commit_all(client, "leak")
+        rejected = push()
+        assert rejected.returncode != 0
+        assert b"leak.py" in rejected.stderr
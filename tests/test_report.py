@@ -0,0 +1,128 @@
+"""
+Tests for the streaming report writers
+Each format must be valid as a whole and written one result at a time
+"""
+
+import io
+import json
+
+import pytest
+from shieldcommit.report import FORMATS, Reporter, get_reporter
+
+FINDING = {
+    "file": "app.py",
+    "line": 3,
+    "snippet": 'api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"',
+    "matched_value": "xK7mPqL9bJnR2tFhWdS4vE6cB8gA",
+    "variable": "api_key",
+    "confidence": 0.97,
+    "detection_method": "High Entropy",
+    "pattern": "Intelligent Detection: High Entropy",
+}
+
+WARNING = {
+    "type": "eks_version",
+    "file": "main.tf",
+    "line": 2,
+    "version": "1.24",
+    "status": "deprecated",
+    "message": "EKS 1.24 is DEPRECATED",
+    "snippet": 'kubernetes_version = "1.24"',
+}
+
+
+def _report(fmt, findings=(), warnings=(), interrupted=False):
+    out = io.StringIO()
+    reporter = get_reporter(fmt, out)
+    for w in warnings:
+        reporter.warning(w)
+    for f in findings:
+        reporter.finding(f)
+    code = reporter.finish({"lockfile": 1}, 0, interrupted)
+    return out.getvalue(), code
+
+
+class TestExitCodes:
+    """Test exit codes are the same in every format"""
+
+    @pytest.mark.parametrize("fmt", FORMATS)
+    def test_codes(self, fmt):
+        """Findings block (1), interrupted clean scans exit 130, otherwise 0"""
+        assert _report(fmt, findings=[FINDING])[1] == 1
+        assert _report(fmt, warnings=[WARNING])[1] == 0
+        assert _report(fmt, interrupted=True)[1] == 130
+
+
+class TestReporterBase:
+    """Test the writer interface"""
+
+    def test_incomplete_writer_refused(self):
+        """A writer missing a _write_* method fails when created, not mid-report"""
+
+        class NoSummary(Reporter):
+            def _write_warning(self, w):
+                pass
+
+            def _write_finding(self, f):
+                pass
+
+        with pytest.raises(TypeError):
+            NoSummary(io.StringIO())
+
+
+class TestNdjson:
+    """Test newline-delimited JSON output"""
+
+    def test_one_record_per_line(self):
+        """Each result and the summary should be its own JSON line"""
+        text, _ = _report("ndjson", findings=[FINDING, FINDING], warnings=[WARNING])
+        records = [json.loads(line) for line in text.splitlines()]
+        assert [r["kind"] for r in records] == ["warning", "finding", "finding", "summary"]
+        assert records[0]["type"] == "eks_version"
+        assert records[-1]["findings"] == 2
+        assert records[-1]["skipped"] == {"lockfile": 1}
+
+    def test_written_as_produced(self):
+        """A finding should be on the stream before the scan finishes"""
+        out = io.StringIO()
+        reporter = get_reporter("ndjson", out)
+        reporter.finding(FINDING)
+        assert json.loads(out.getvalue())["file"] == "app.py"
+
+
+class TestJson:
+    """Test the incremental single-document JSON output"""
+
+    @pytest.mark.parametrize("count", [0, 1, 3])
+    def test_valid_document(self, count):
+        """The document should parse whatever the number of results"""
+        text, _ = _report("json", findings=[FINDING] * count)
+        document = json.loads(text)
+        assert len(document["results"]) == count
+        assert document["summary"]["findings"] == count
+
+
+class TestSarif:
+    """Test SARIF 2.1.0 output"""
+
+    @pytest.mark.parametrize("count", [0, 1, 3])
+    def test_valid_document(self, count):
+        """The log should parse and hold one result per finding and warning"""
+        text, _ = _report("sarif", findings=[FINDING] * count, warnings=[WARNING])
+        log = json.loads(text)
+        assert log["version"] == "2.1.0"
+        run = log["runs"][0]
+        assert run["tool"]["driver"]["name"] == "ShieldCommit"
+        assert len(run["results"]) == count + 1
+        assert run["invocations"][0]["executionSuccessful"] is True
+
+    def test_result_fields(self):
+        """Results should carry rule, level and location"""
+        text, _ = _report("sarif", findings=[dict(FINDING, commit="abc123")])
+        result = json.loads(text)["runs"][0]["results"][0]
+        assert result["ruleId"] == "shieldcommit/secret"
+        assert result["level"] == "error"
+        location = result["locations"][0]["physicalLocation"]
+        assert location["artifactLocation"]["uri"] == "app.py"
+        assert location["region"]["startLine"] == 3
+        assert result["properties"]["commit"] == "abc123"
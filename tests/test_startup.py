@@ -0,0 +1,112 @@
+"""
+Tests for CLI startup cost
+The pre-commit hook starts a fresh process on every commit, so the detectors
+must only load when a file actually needs them
+"""
+
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+# Modules that load detectors, catalogs or scanning machinery
+HEAVY_MODULES = {
+    "shieldcommit.intelligent_detector",
+    "shieldcommit.eks_detector",
+    "shieldcommit.rds_detector",
+    "shieldcommit.aks_detector",
+    "shieldcommit.gcp_detector",
+    "shieldcommit.azure_db_detector",
+    "shieldcommit.gcp_db_detector",
+    "shieldcommit.scanner",
+    "shieldcommit.diffscan",
+    "shieldcommit.history",
+    "shieldcommit.pipeline",
+    "shieldcommit.parallel",
+}
+
+# Modules the CLI only needs once a command runs
+COMMAND_MODULES = {
+    "shieldcommit.lexer",
+    "shieldcommit.report",
+    "shieldcommit.cache",
+    "shieldcommit.classifier",
+    "shieldcommit.daemon",
+    "shieldcommit.git_objects",
+    "shieldcommit.prereceive",
+}
+
+LOADED = "import sys; print(' '.join(m for m in sys.modules if m.startswith('shieldcommit')))"
+
+RUN_SCAN = f"""
+from shieldcommit.__main__ import cli
+try:
+    cli(["scan", "--no-daemon", "--no-cache"])
+except SystemExit:
+    pass
+{LOADED}
+"""
+
+
+def _python(code, cwd=None):
+    res = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, check=True, capture_output=True, text=True
+    )
+    return res.stdout
+
+
+class TestImports:
+    """Test what importing and running the CLI loads"""
+
+    def test_cli_import_is_light(self):
+        """Importing the CLI should load no detector"""
+        loaded = set(_python(f"import shieldcommit.__main__; {LOADED}").split())
+        assert "shieldcommit.__main__" in loaded
+        assert not loaded & HEAVY_MODULES
+
+    def test_cli_import_loads_no_command_module(self):
+        """Importing the CLI should leave everything a command needs to that command"""
+        loaded = set(_python(f"import shieldcommit.__main__; {LOADED}").split())
+        assert not loaded & COMMAND_MODULES
+
+    def test_option_choices_match_modules(self):
+        """The CLI's copies of option values should match the modules that use them"""
+        from shieldcommit import __main__, lexer, prereceive, report
+
+        assert __main__.CANDIDATE_MODES == lexer.CANDIDATE_MODES
+        assert __main__.ASSIGNMENTS == lexer.ASSIGNMENTS
+        assert __main__.FORMATS == report.FORMATS
+        assert __main__.DEFAULT_BUDGET == prereceive.DEFAULT_BUDGET
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+class TestHookFastPath:
+    """Test staged scans that have nothing to scan"""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        return tmp_path
+
+    def test_nothing_staged(self, repo):
+        """With nothing staged no detector should load"""
+        output = _python(RUN_SCAN, cwd=repo)
+        assert "No staged files" in output
+        assert not set(output.split()) & HEAVY_MODULES
+
+    def test_nothing_relevant_staged(self, repo):
+        """Staged lockfiles and binaries are skipped without loading a detector"""
+        (repo / "package-lock.json").write_text('{"password": "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"}')
+        (repo / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+        subprocess.run(["git", "add", "-A"], cwd=repo, check=True)
+        output = _python(RUN_SCAN, cwd=repo)
+        assert "Skipped 2 file(s)" in output
+        assert not set(output.split()) & HEAVY_MODULES
+
+    def test_relevant_file_loads_detectors(self, repo):
+        """A file that needs scanning should still be scanned"""
+        (repo / "app.py").write_text("x = 1\n")
+        subprocess.run(["git", "add", "-A"], cwd=repo, check=True)
+        output = _python(RUN_SCAN, cwd=repo)
+        assert "shieldcommit.intelligent_detector" in output.split()
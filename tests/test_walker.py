@@ -0,0 +1,122 @@
+"""
+Tests for the pruning directory walker
+Vendored directories and ignored paths are never visited, and nothing is yielded twice
+"""
+
+import os
+
+import pytest
+from shieldcommit.walker import compile_rule, walk_files
+
+
+def _touch(root, *names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n")
+
+
+def _walk(root, **kwargs):
+    return sorted(os.path.relpath(p, root) for p in walk_files([root], **kwargs))
+
+
+class TestIgnorePatterns:
+    """Test gitignore pattern semantics"""
+
+    @pytest.mark.parametrize(
+        "pattern, path, is_dir, expected",
+        [
+            ("*.log", "a/b/debug.log", False, True),
+            ("/build", "build", True, True),
+            ("docs/*.md", "docs/a.md", False, True),
+            ("docs/*.md", "docs/sub/a.md", False, False),
+            ("**/secrets", "a/b/secrets", True, True),
+            ("a/**/z.txt", "a/z.txt", False, True),
+            ("a/**/z.txt", "a/b/c/z.txt", False, True),
+            ("out/", "out", False, False),
+            ("file[0-9].txt", "file7.txt", False, True),
+            ("\\#hash", "#hash", False, True),
+        ],
+    )
+    def test_pattern(self, pattern, path, is_dir, expected):
+        """Each pattern should match paths as git does"""
+        rule = compile_rule(pattern)
+        target = path if rule.anchored else path.rsplit("/", 1)[-1]
+        matched = bool(rule.regex.match(target)) and (is_dir or not rule.dir_only)
+        assert matched is expected
+
+    def test_comments_and_blanks(self):
+        """Comments and blank lines are not rules"""
+        assert compile_rule("# comment") is None
+        assert compile_rule("   ") is None
+
+
+class TestWalkFiles:
+    """Test walking directory trees"""
+
+    def test_prunes_vendored_dirs(self, tmp_path):
+        """Dependency trees, tool state and virtualenvs are never entered"""
+        _touch(
+            tmp_path,
+            "app.py",
+            "node_modules/pkg/index.js",
+            ".terraform/providers/p.tf",
+            ".git/config",
+            "env/pyvenv.cfg",
+            "env/lib/site.py",
+        )
+        assert _walk(tmp_path) == ["app.py"]
+
+    def test_honours_ignore_files(self, tmp_path):
+        """.gitignore and .shieldcommitignore rules apply per directory, deeper files win"""
+        _touch(tmp_path, "a.py", "debug.log", "build/out.py", "sub/keep.log", "sub/x.tmp")
+        (tmp_path / ".gitignore").write_text("*.log\nbuild/\n")
+        (tmp_path / "sub" / ".gitignore").write_text("!keep.log\n")
+        (tmp_path / ".shieldcommitignore").write_text("*.tmp\n")
+        assert _walk(tmp_path) == [
+            ".gitignore",
+            ".shieldcommitignore",
+            "a.py",
+            os.path.join("sub", ".gitignore"),
+            os.path.join("sub", "keep.log"),
+        ]
+
+    def test_no_ignore_option(self, tmp_path):
+        """ignore_files=False scans ignored files (but still prunes vendored dirs)"""
+        _touch(tmp_path, "a.log", "node_modules/x.js")
+        (tmp_path / ".gitignore").write_text("*.log\n")
+        assert _walk(tmp_path, ignore_files=False) == [".gitignore", "a.log"]
+
+    def test_repository_rules_apply_to_subdirectory(self, tmp_path):
+        """Scanning a subdirectory still honours the repository's ignore files"""
+        (tmp_path / ".git" / "info").mkdir(parents=True)
+        (tmp_path / ".git" / "info" / "exclude").write_text("*.bak\n")
+        (tmp_path / ".gitignore").write_text("src/gen/\n")
+        _touch(tmp_path, "src/a.py", "src/a.bak", "src/gen/b.py")
+        found = sorted(walk_files([tmp_path / "src"]))
+        assert found == [str(tmp_path / "src" / "a.py")]
+
+    def test_symlink_loop_and_hardlinks(self, tmp_path):
+        """Each directory and file is visited once, even through links"""
+        _touch(tmp_path, "d/a.py")
+        os.symlink(tmp_path, tmp_path / "d" / "loop")
+        os.link(tmp_path / "d" / "a.py", tmp_path / "d" / "b.py")
+        assert _walk(tmp_path) == [os.path.join("d", "a.py")]
+
+    def test_lazy(self, tmp_path):
+        """Files should be yielded before the whole tree has been walked"""
+        _touch(tmp_path, "a.py", "z/deep/b.py")
+        walker = walk_files([tmp_path])
+        assert os.path.basename(next(walker)) == "a.py"
+
+    def test_explicit_files_always_yielded(self, tmp_path):
+        """A file named on the command line is scanned even if ignored"""
+        _touch(tmp_path, "a.log")
+        (tmp_path / ".gitignore").write_text("*.log\n")
+        assert list(walk_files([tmp_path / "a.log"])) == [str(tmp_path / "a.log")]
+
+    def test_current_directory_paths(self, tmp_path, monkeypatch):
+        """Walking '.' reports paths without a './' prefix"""
+        _touch(tmp_path, "a.py")
+        monkeypatch.chdir(tmp_path)
+        assert list(walk_files(["."])) == ["a.py"]
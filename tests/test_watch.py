@@ -0,0 +1,180 @@
+"""
+Tests for watch mode
+Only files that changed are rescanned, and only new or resolved results are reported
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+from shieldcommit import scanner
+from shieldcommit.watch import (
+    NEW,
+    RESOLVED,
+    InotifyWaiter,
+    PollWaiter,
+    Watcher,
+    diff_snapshots,
+    format_change,
+    snapshot,
+)
+
+SECRET = 'api_key = "xK7mPqL9bJnR2tFhWdS4vE6cB8gA"\n'
+
+
+def bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestSnapshots:
+    """Test change detection between snapshots"""
+
+    def test_diff(self, tmp_path):
+        """Added, modified and removed files should be told apart"""
+        (tmp_path / "a.py").write_text("a = 1\n")
+        (tmp_path / "b.py").write_text("b = 1\n")
+        before = snapshot([tmp_path])
+        (tmp_path / "a.py").write_text("a = 22\n")
+        (tmp_path / "b.py").unlink()
+        (tmp_path / "c.py").write_text("c = 1\n")
+        changed, removed = diff_snapshots(before, snapshot([tmp_path]))
+        assert [os.path.basename(p) for p in changed] == ["a.py", "c.py"]
+        assert [os.path.basename(p) for p in removed] == ["b.py"]
+
+    def test_directories_collected(self, tmp_path):
+        """The directories walked are collected for watching"""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "x.py").write_text("x = 1\n")
+        dirs = []
+        snapshot([tmp_path], dirs=dirs)
+        assert str(tmp_path / "sub") in dirs
+
+
+class TestWatcher:
+    """Test incremental rescans"""
+
+    def test_new_and_resolved(self, tmp_path):
+        """Only changes since the last update should be reported"""
+        app = tmp_path / "app.py"
+        app.write_text("x = 1\n")
+        watcher = Watcher([tmp_path])
+        assert watcher.update() == []
+
+        app.write_text("x = 1\n" + SECRET)
+        changes = watcher.update()
+        assert [(c.status, c.kind) for c in changes] == [(NEW, "finding")]
+        assert watcher.findings == 1
+
+        # Moving the secret down a line is not a change
+        app.write_text("x = 1\ny = 2\n" + SECRET)
+        assert watcher.update() == []
+
+        app.write_text("x = 1\n")
+        assert [(c.status, c.kind) for c in watcher.update()] == [(RESOLVED, "finding")]
+        assert watcher.findings == 0
+
+    def test_deleted_file_resolves(self, tmp_path):
+        """Findings in a deleted file should be reported as resolved"""
+        (tmp_path / "leak.py").write_text(SECRET)
+        watcher = Watcher([tmp_path])
+        assert [c.status for c in watcher.update()] == [NEW]
+        (tmp_path / "leak.py").unlink()
+        assert [c.status for c in watcher.update()] == [RESOLVED]
+
+    def test_only_changed_files_rescanned(self, tmp_path):
+        """Untouched files should not be rescanned"""
+        for i in range(5):
+            (tmp_path / f"f{i}.py").write_text(f"x = {i}\n")
+        watcher = Watcher([tmp_path])
+        watcher.update()
+        assert watcher.rescanned == 5
+        (tmp_path / "f3.py").write_text("x = 33\n")
+        watcher.update()
+        assert watcher.rescanned == 1
+
+    def test_unchanged_content_not_rescanned(self, tmp_path, monkeypatch):
+        """A file saved without changes should be answered from the cache"""
+        app = tmp_path / "src" / "app.py"
+        app.parent.mkdir()
+        app.write_text(SECRET)
+        watcher = Watcher([tmp_path / "src"], cache_dir=tmp_path / "cache")
+        watcher.update()
+
+        calls = []
+        real = scanner.scan_content
+        monkeypatch.setattr(
+            scanner, "scan_content", lambda *a, **k: calls.append(1) or real(*a, **k)
+        )
+        bump_mtime(app)
+        assert watcher.update() == []
+        assert watcher.rescanned == 1
+        assert calls == []
+
+    def test_format(self, tmp_path):
+        """New and resolved changes should read differently"""
+        (tmp_path / "leak.py").write_text(SECRET)
+        watcher = Watcher([tmp_path])
+        new = format_change(watcher.update()[0])
+        (tmp_path / "leak.py").write_text("")
+        resolved = format_change(watcher.update()[0])
+        assert new.startswith("❌") and "leak.py (line 1)" in new
+        assert resolved.startswith("✓ Resolved")
+
+
+class TestRun:
+    """Test the watch loop"""
+
+    @pytest.mark.parametrize("inotify", [False, True])
+    def test_reports_changes(self, tmp_path, inotify):
+        """The loop should pick up a new secret and report it once"""
+        if inotify and not sys.platform.startswith("linux"):
+            pytest.skip("inotify is Linux-only")
+        (tmp_path / "app.py").write_text("x = 1\n")
+        waiter = InotifyWaiter() if inotify else PollWaiter()
+        watcher = Watcher([tmp_path], interval=0.05, debounce=0.05, waiter=waiter)
+
+        reported = []
+        seen = threading.Event()
+        stop = threading.Event()
+
+        def on_changes(changes):
+            reported.append(changes)
+            if changes:
+                seen.set()
+
+        thread = threading.Thread(target=watcher.run, args=(on_changes, stop.is_set))
+        thread.start()
+        try:
+            for _ in range(100):
+                if reported:
+                    break
+                threading.Event().wait(0.02)
+            (tmp_path / "app.py").write_text(SECRET)
+            assert seen.wait(5)
+        finally:
+            stop.set()
+            # Wake an inotify wait so the loop sees the stop flag
+            (tmp_path / "wake.txt").write_text("")
+            thread.join(5)
+        assert reported[0] == []
+        assert [c.status for c in reported[1]] == [NEW]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+class TestInotify:
+    """Test the inotify waiter"""
+
+    def test_wakes_on_write(self, tmp_path):
+        """A write in a watched directory should end the wait; quiet should time out"""
+        waiter = InotifyWaiter()
+        try:
+            waiter.watch([str(tmp_path)])
+            assert waiter.complete
+            assert waiter.wait(0.05) is False
+            (tmp_path / "x.py").write_text("x = 1\n")
+            assert waiter.wait(2) is True
+            assert waiter.wait(0.05) is False
+        finally:
+            waiter.close()